@@ -391,3 +391,60 @@ def test_description_delete():
         ("x", None, None, None, None, None, None),
         ("y", None, None, None, None, None, None),
     )
+
+
+@pypy_only
+def test_statement_cache_lru():
+    con = _sqlite3.connect(":memory:", cached_statements=2)
+    cache = con._statement_cache
+    con.execute("select 1")
+    con.execute("select 2")
+    con.execute("select 1")
+    con.execute("select 3")
+    # "select 2" was the least recently used
+    assert list(cache.cache) == ["select 1", "select 3"]
+
+def test_fetchmany_fetchall(con):
+    cur = con.cursor()
+    cur.execute("create table foo(x, y)")
+    cur.executemany("insert into foo values (?, ?)",
+                    [(i, u"%d" % i) for i in range(10)])
+    cur.execute("select x, y from foo order by x")
+    assert cur.fetchmany(3) == [(0, u"0"), (1, u"1"), (2, u"2")]
+    assert cur.fetchone() == (3, u"3")
+    assert cur.fetchmany(0) == [(i, u"%d" % i) for i in range(4, 10)]
+    assert cur.fetchmany(3) == []
+    cur.execute("select x from foo order by x")
+    cur.arraysize = 4
+    assert cur.fetchmany() == [(0,), (1,), (2,), (3,)]
+    cur.row_factory = lambda cursor, row: row[0]
+    assert cur.fetchall() == [4, 5, 6, 7, 8, 9]
+    assert cur.fetchall() == []
+
+def test_executemany_simple_types(con):
+    cur = con.cursor()
+    cur.execute("create table foo(a, b, c, d, e)")
+    rows = [(None, 1, 2**40, 1.5, u"x\xe9"), [True, -1, -2**40, 0.0, u""]]
+    cur.executemany("insert into foo values (?, ?, ?, ?, ?)", rows)
+    assert cur.rowcount == 2
+    cur.execute("select * from foo")
+    assert cur.fetchall() == [(None, 1, 2**40, 1.5, u"x\xe9"),
+                              (1, -1, -2**40, 0.0, u"")]
+    with pytest.raises(_sqlite3.ProgrammingError):
+        cur.executemany("insert into foo values (?, ?, ?, ?, ?)", [(1, 2)])
+    with pytest.raises(_sqlite3.InterfaceError):
+        cur.executemany("insert into foo values (?, ?, ?, ?, ?)",
+                        [(1, 2, 3, 4, object())])
+
+def test_executemany_adapted_base_type(con):
+    class MyInt(int):
+        pass
+    cur = con.cursor()
+    cur.execute("create table foo(x)")
+    _sqlite3.register_adapter(MyInt, lambda x: x * 10)
+    try:
+        cur.executemany("insert into foo values (?)", [(MyInt(4),), (5,)])
+    finally:
+        del _sqlite3.adapters[MyInt, _sqlite3.PrepareProtocol]
+    cur.execute("select x from foo")
+    assert cur.fetchall() == [(40,), (5,)]
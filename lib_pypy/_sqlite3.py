@@ -181,16 +181,17 @@ class _StatementCache(object):
 
     def get(self, sql):
         try:
-            stat = self.cache[sql]
+            stat = self.cache.pop(sql)
         except KeyError:
             stat = Statement(self.connection, sql)
-            self.cache[sql] = stat
-            if len(self.cache) > self.maxcount:
-                self.cache.popitem(0)
+            if len(self.cache) >= self.maxcount > 0:
+                self.cache.popitem(last=False)
         else:
             if stat._in_use:
                 stat = Statement(self.connection, sql)
-                self.cache[sql] = stat
+        # (re)insert it as the most recently used entry
+        if self.maxcount > 0:
+            self.cache[sql] = stat
         return stat
 
 
@@ -771,43 +772,77 @@ class Cursor(object):
             self.__row_cast_map.append(converter)
 
     def __fetch_one_row(self):
-        num_cols = _lib.sqlite3_data_count(self.__statement._statement)
+        statement = self.__statement._statement
+        detect_types = self.__connection._detect_types
+        num_cols = _lib.sqlite3_data_count(statement)
         row = newlist_hint(num_cols)
         for i in xrange(num_cols):
-            if self.__connection._detect_types:
+            if detect_types:
                 converter = self.__row_cast_map[i]
             else:
                 converter = None
 
             if converter is not None:
-                blob = _lib.sqlite3_column_blob(self.__statement._statement, i)
+                blob = _lib.sqlite3_column_blob(statement, i)
                 if not blob:
                     val = None
                 else:
-                    blob_len = _lib.sqlite3_column_bytes(self.__statement._statement, i)
+                    blob_len = _lib.sqlite3_column_bytes(statement, i)
                     val = _ffi.buffer(blob, blob_len)[:]
                     val = converter(val)
             else:
-                typ = _lib.sqlite3_column_type(self.__statement._statement, i)
+                typ = _lib.sqlite3_column_type(statement, i)
                 if typ == _lib.SQLITE_NULL:
                     val = None
                 elif typ == _lib.SQLITE_INTEGER:
-                    val = _lib.sqlite3_column_int64(self.__statement._statement, i)
+                    val = _lib.sqlite3_column_int64(statement, i)
                     val = int(val)
                 elif typ == _lib.SQLITE_FLOAT:
-                    val = _lib.sqlite3_column_double(self.__statement._statement, i)
+                    val = _lib.sqlite3_column_double(statement, i)
                 elif typ == _lib.SQLITE_TEXT:
-                    text = _lib.sqlite3_column_text(self.__statement._statement, i)
-                    text_len = _lib.sqlite3_column_bytes(self.__statement._statement, i)
+                    text = _lib.sqlite3_column_text(statement, i)
+                    text_len = _lib.sqlite3_column_bytes(statement, i)
                     val = _ffi.buffer(text, text_len)[:]
                     val = self.__connection.text_factory(val)
                 elif typ == _lib.SQLITE_BLOB:
-                    blob = _lib.sqlite3_column_blob(self.__statement._statement, i)
-                    blob_len = _lib.sqlite3_column_bytes(self.__statement._statement, i)
+                    blob = _lib.sqlite3_column_blob(statement, i)
+                    blob_len = _lib.sqlite3_column_bytes(statement, i)
                     val = _BLOB_TYPE(_ffi.buffer(blob, blob_len)[:])
             row.append(val)
         return tuple(row)
 
+    def __fetch_rows(self, size):
+        # Bulk version of __next__(): step the statement to collect at
+        # most 'size' rows (or all of them if 'size' is negative) into a
+        # preallocated list, doing the cursor checks only once.
+        self.__check_cursor()
+        self.__check_reset()
+        if not self.__statement:
+            return []
+        lst = newlist_hint(size if size >= 0 else 16)
+        row_factory = self.row_factory
+        statement = self.__statement._statement
+        while len(lst) != size:
+            try:
+                next_row = self.__next_row
+            except AttributeError:
+                break
+            del self.__next_row
+
+            if row_factory is not None:
+                next_row = row_factory(self, next_row)
+            lst.append(next_row)
+
+            ret = _lib.sqlite3_step(statement)
+            if ret == _lib.SQLITE_ROW:
+                self.__next_row = self.__fetch_one_row()
+            else:
+                self.__statement._reset()
+                if ret != _lib.SQLITE_DONE:
+                    raise self.__connection._get_exception(ret)
+                break
+        return lst
+
     def __execute(self, multiple, sql, many_params):
         self.__locked = True
         self._reset = False
@@ -842,6 +877,10 @@ class Cursor(object):
                         raise ProgrammingError("You cannot execute SELECT "
                                                "statements in executemany().")
 
+            if multiple:
+                self.__execute_many(many_params)
+                return self
+
             for params in many_params:
                 self.__statement._set_params(params)
 
@@ -859,13 +898,10 @@ class Cursor(object):
                     ret = _lib.sqlite3_step(self.__statement._statement)
 
                 if ret == _lib.SQLITE_ROW:
-                    if multiple:
-                        raise ProgrammingError("executemany() can only execute DML statements.")
                     self.__build_row_cast_map()
                     self.__next_row = self.__fetch_one_row()
                 elif ret == _lib.SQLITE_DONE:
-                    if not multiple:
-                        self.__statement._reset()
+                    self.__statement._reset()
                 else:
                     self.__statement._reset()
                     raise self.__connection._get_exception(ret)
@@ -880,19 +916,50 @@ class Cursor(object):
                         self.__rowcount = 0
                     self.__rowcount += _lib.sqlite3_changes(self.__connection._db)
 
-                if not multiple and self.__statement._type == _STMT_TYPE_INSERT:
+                if self.__statement._type == _STMT_TYPE_INSERT:
                     self.__lastrowid = _lib.sqlite3_last_insert_rowid(self.__connection._db)
                 else:
                     self.__lastrowid = None
-
-                if multiple:
-                    self.__statement._reset()
         finally:
             self.__connection._in_transaction = \
                 not _lib.sqlite3_get_autocommit(self.__connection._db)
             self.__locked = False
         return self
 
+    def __execute_many(self, many_params):
+        # the loop of executemany(): everything that does not depend on
+        # the row is looked up only once, and _set_params() binds tuples
+        # and lists of simple values without going through adapt()
+        statement = self.__statement
+        db = self.__connection._db
+        is_dml = statement._type in (
+            _STMT_TYPE_UPDATE,
+            _STMT_TYPE_DELETE,
+            _STMT_TYPE_INSERT,
+            _STMT_TYPE_REPLACE
+        )
+        for params in many_params:
+            statement._set_params(params)
+
+            ret = _lib.sqlite3_step(statement._statement)
+            if ret == _lib.SQLITE_LOCKED:
+                # see __execute()
+                self.__connection._reset_already_committed_statements()
+                ret = _lib.sqlite3_step(statement._statement)
+
+            if ret == _lib.SQLITE_ROW:
+                raise ProgrammingError("executemany() can only execute DML statements.")
+            elif ret != _lib.SQLITE_DONE:
+                statement._reset()
+                raise self.__connection._get_exception(ret)
+
+            if is_dml:
+                if self.__rowcount == -1:
+                    self.__rowcount = 0
+                self.__rowcount += _lib.sqlite3_changes(db)
+            self.__lastrowid = None
+            statement._reset()
+
     @__check_cursor_wrap
     def execute(self, sql, params=[]):
         return self.__execute(False, sql, [params])
@@ -979,15 +1046,12 @@ class Cursor(object):
     def fetchmany(self, size=None):
         if size is None:
             size = self.arraysize
-        lst = []
-        for row in self:
-            lst.append(row)
-            if len(lst) == size:
-                break
-        return lst
+        if size <= 0:
+            size = -1    # like CPython, fetch all the rows
+        return self.__fetch_rows(size)
 
     def fetchall(self):
-        return list(self)
+        return self.__fetch_rows(-1)
 
     def __get_connection(self):
         self.__check_cursor()
@@ -1089,6 +1153,7 @@ class Statement(object):
             raise self.__con._get_exception(ret)
 
         self.__con._remember_statement(self)
+        self._num_params = _lib.sqlite3_bind_parameter_count(self._statement)
 
         tail = _ffi.string(next_char[0]).decode('utf-8')
         if _check_remaining_sql(tail):
@@ -1156,8 +1221,29 @@ class Statement(object):
     def _set_params(self, params):
         self._in_use = True
 
-        num_params_needed = _lib.sqlite3_bind_parameter_count(self._statement)
-        if isinstance(params, (tuple, list)) or \
+        num_params_needed = self._num_params
+        if type(params) is tuple or type(params) is list:
+            # fast path, used for every row of executemany()
+            if len(params) != num_params_needed:
+                raise ProgrammingError("Incorrect number of bindings supplied. "
+                                       "The current statement uses %d, and "
+                                       "there are %d supplied." %
+                                       (num_params_needed, len(params)))
+            statement = self._statement
+            base_type_adapted = _base_type_adapted
+            for i in range(num_params_needed):
+                param = params[i]
+                binder = None
+                if not base_type_adapted:
+                    binder = _simple_binders.get(type(param), None)
+                if binder is not None:
+                    rc = binder(statement, i + 1, param)
+                else:
+                    rc = self.__set_param(i + 1, param)
+                if rc != _lib.SQLITE_OK:
+                    raise InterfaceError("Error binding parameter %d - "
+                                         "probably unsupported type." % i)
+        elif isinstance(params, (tuple, list)) or \
                 not isinstance(params, dict) and \
                 hasattr(params, '__getitem__'):
             try:
@@ -1339,7 +1425,47 @@ class PrepareProtocol(object):
     pass
 
 
+# Like CPython's _sqlite, parameters of these exact types are bound
+# directly, without looking for an adapter, unless register_adapter()
+# was called for one of them.
+def _bind_null(statement, idx, param):
+    return _lib.sqlite3_bind_null(statement, idx)
+
+def _bind_int(statement, idx, param):
+    if -2147483648 <= param <= 2147483647:
+        return _lib.sqlite3_bind_int(statement, idx, param)
+    return _lib.sqlite3_bind_int64(statement, idx, param)
+
+def _bind_double(statement, idx, param):
+    return _lib.sqlite3_bind_double(statement, idx, param)
+
+def _bind_unicode(statement, idx, param):
+    param = param.encode("utf-8")
+    return _lib.sqlite3_bind_text(statement, idx, param, len(param),
+                                  _SQLITE_TRANSIENT)
+
+def _bind_blob(statement, idx, param):
+    param = bytes(param)
+    return _lib.sqlite3_bind_blob(statement, idx, param, len(param),
+                                  _SQLITE_TRANSIENT)
+
+_simple_binders = {
+    type(None): _bind_null,
+    bool: _bind_int,
+    int: _bind_int,
+    long: _bind_int,
+    float: _bind_double,
+    unicode: _bind_unicode,
+    buffer: _bind_blob,
+    _BLOB_TYPE: _bind_blob,
+}
+_base_type_adapted = False
+
+
 def register_adapter(typ, callable):
+    global _base_type_adapted
+    if typ in _simple_binders:
+        _base_type_adapted = True
     adapters[typ, PrepareProtocol] = callable
 
 
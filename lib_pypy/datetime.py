@@ -21,8 +21,12 @@ import time as _timemodule
 import math as _math
 import struct as _struct
 
-# for cpyext, use these as base classes
+# for cpyext, use these as base classes; they also hold the fields
 from __pypy__._pypydatetime import dateinterop, deltainterop, timeinterop
+from __pypy__._pypydatetime import (ymd2ord as _ymd2ord,
+    ord2ymd as _ord2ymd, normalize_date as _normalize_date,
+    normalize_datetime as _normalize_datetime, new_delta as _new_delta,
+    timestamp_fields as _timestamp_fields, wrap_strftime as _wrap_strftime)
 
 _SENTINEL = object()
 
@@ -60,11 +64,6 @@ def _is_leap(year):
     "year -> 1 if leap year, else 0."
     return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
 
-def _days_before_year(year):
-    "year -> number of days before January 1st of year."
-    y = year - 1
-    return y*365 + y//4 - y//100 + y//400
-
 def _days_in_month(year, month):
     "year, month -> number of days in that month in that year."
     assert 1 <= month <= 12, month
@@ -77,31 +76,6 @@ def _days_before_month(year, month):
     assert 1 <= month <= 12, 'month must be in 1..12'
     return _DAYS_BEFORE_MONTH[month] + (month > 2 and _is_leap(year))
 
-def _ymd2ord(year, month, day):
-    "year, month, day -> ordinal, considering 01-Jan-0001 as day 1."
-    assert 1 <= month <= 12, 'month must be in 1..12'
-    dim = _days_in_month(year, month)
-    assert 1 <= day <= dim, ('day must be in 1..%d' % dim)
-    return (_days_before_year(year) +
-            _days_before_month(year, month) +
-            day)
-
-_DI400Y = _days_before_year(401)    # number of days in 400 years
-_DI100Y = _days_before_year(101)    #    "    "   "   " 100   "
-_DI4Y   = _days_before_year(5)      #    "    "   "   "   4   "
-
-# A 4-year cycle has an extra leap day over what we'd get from pasting
-# together 4 single years.
-assert _DI4Y == 4 * 365 + 1
-
-# Similarly, a 400-year cycle has an extra leap day over what we'd get from
-# pasting together 4 100-year cycles.
-assert _DI400Y == 4 * _DI100Y + 1
-
-# OTOH, a 100-year cycle has one fewer leap day than we'd get from
-# pasting together 25 4-year cycles.
-assert _DI100Y == 25 * _DI4Y - 1
-
 _US_PER_US = 1
 _US_PER_MS = 1000
 _US_PER_SECOND = 1000000
@@ -111,68 +85,6 @@ _US_PER_HOUR = 3600000000
 _US_PER_DAY = 86400000000
 _US_PER_WEEK = 604800000000
 
-def _ord2ymd(n):
-    "ordinal -> (year, month, day), considering 01-Jan-0001 as day 1."
-
-    # n is a 1-based index, starting at 1-Jan-1.  The pattern of leap years
-    # repeats exactly every 400 years.  The basic strategy is to find the
-    # closest 400-year boundary at or before n, then work with the offset
-    # from that boundary to n.  Life is much clearer if we subtract 1 from
-    # n first -- then the values of n at 400-year boundaries are exactly
-    # those divisible by _DI400Y:
-    #
-    #     D  M   Y            n              n-1
-    #     -- --- ----        ----------     ----------------
-    #     31 Dec -400        -_DI400Y       -_DI400Y -1
-    #      1 Jan -399         -_DI400Y +1   -_DI400Y      400-year boundary
-    #     ...
-    #     30 Dec  000        -1             -2
-    #     31 Dec  000         0             -1
-    #      1 Jan  001         1              0            400-year boundary
-    #      2 Jan  001         2              1
-    #      3 Jan  001         3              2
-    #     ...
-    #     31 Dec  400         _DI400Y        _DI400Y -1
-    #      1 Jan  401         _DI400Y +1     _DI400Y      400-year boundary
-    n -= 1
-    n400, n = divmod(n, _DI400Y)
-    year = n400 * 400 + 1   # ..., -399, 1, 401, ...
-
-    # Now n is the (non-negative) offset, in days, from January 1 of year, to
-    # the desired date.  Now compute how many 100-year cycles precede n.
-    # Note that it's possible for n100 to equal 4!  In that case 4 full
-    # 100-year cycles precede the desired day, which implies the desired
-    # day is December 31 at the end of a 400-year cycle.
-    n100, n = divmod(n, _DI100Y)
-
-    # Now compute how many 4-year cycles precede it.
-    n4, n = divmod(n, _DI4Y)
-
-    # And now how many single years.  Again n1 can be 4, and again meaning
-    # that the desired day is December 31 at the end of the 4-year cycle.
-    n1, n = divmod(n, 365)
-
-    year += n100 * 100 + n4 * 4 + n1
-    if n1 == 4 or n100 == 4:
-        assert n == 0
-        return year-1, 12, 31
-
-    # Now the year is correct, and n is the offset from January 1.  We find
-    # the month via an estimate that's either exact or one too large.
-    leapyear = n1 == 3 and (n4 != 24 or n100 == 3)
-    assert leapyear == _is_leap(year)
-    month = (n + 50) >> 5
-    preceding = _DAYS_BEFORE_MONTH[month] + (month > 2 and leapyear)
-    if preceding > n:  # estimate is too large
-        month -= 1
-        preceding -= _DAYS_IN_MONTH[month] + (month == 2 and leapyear)
-    n -= preceding
-    assert 0 <= n < _days_in_month(year, month)
-
-    # Now the year and month are correct, and n is the offset from the
-    # start of that month:  we're done!
-    return year, month, n+1
-
 # Month and day names.  For localized versions, see the calendar module.
 _MONTHNAMES = [None, "Jan", "Feb", "Mar", "Apr", "May", "Jun",
                      "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
@@ -184,74 +96,6 @@ def _build_struct_time(y, m, d, hh, mm, ss, dstflag):
     dnum = _days_before_month(y, m) + d
     return _timemodule.struct_time((y, m, d, hh, mm, ss, wday, dnum, dstflag))
 
-def _format_time(hh, mm, ss, us):
-    # Skip trailing microseconds when us==0.
-    result = "%02d:%02d:%02d" % (hh, mm, ss)
-    if us:
-        result += ".%06d" % us
-    return result
-
-# Correctly substitute for %z and %Z escapes in strftime formats.
-def _wrap_strftime(object, format, timetuple):
-    year = timetuple[0]
-    if year < _MINYEARFMT:
-        raise ValueError("year=%d is before %d; the datetime strftime() "
-                         "methods require year >= %d" %
-                         (year, _MINYEARFMT, _MINYEARFMT))
-    # Don't call utcoffset() or tzname() unless actually needed.
-    freplace = None  # the string to use for %f
-    zreplace = None  # the string to use for %z
-    Zreplace = None  # the string to use for %Z
-
-    # Scan format for %z and %Z escapes, replacing as needed.
-    newformat = []
-    push = newformat.append
-    i, n = 0, len(format)
-    while i < n:
-        ch = format[i]
-        i += 1
-        if ch == '%':
-            if i < n:
-                ch = format[i]
-                i += 1
-                if ch == 'f':
-                    if freplace is None:
-                        freplace = '%06d' % getattr(object,
-                                                    'microsecond', 0)
-                    newformat.append(freplace)
-                elif ch == 'z':
-                    if zreplace is None:
-                        zreplace = ""
-                        if hasattr(object, "_utcoffset"):
-                            offset = object._utcoffset()
-                            if offset is not None:
-                                sign = '+'
-                                if offset < 0:
-                                    offset = -offset
-                                    sign = '-'
-                                h, m = divmod(offset, 60)
-                                zreplace = '%c%02d%02d' % (sign, h, m)
-                    assert '%' not in zreplace
-                    newformat.append(zreplace)
-                elif ch == 'Z':
-                    if Zreplace is None:
-                        Zreplace = ""
-                        if hasattr(object, "tzname"):
-                            s = object.tzname()
-                            if s is not None:
-                                # strftime is going to have at this: escape %
-                                Zreplace = s.replace('%', '%%')
-                    newformat.append(Zreplace)
-                else:
-                    push('%')
-                    push(ch)
-            else:
-                push('%')
-        else:
-            push(ch)
-    newformat = "".join(newformat)
-    return _timemodule.strftime(newformat, timetuple)
-
 # Just raise TypeError if the arg isn't None or a string.
 def _check_tzname(name):
     if name is not None and not isinstance(name, str):
@@ -362,62 +206,6 @@ def _cmperror(x, y):
     raise TypeError("can't compare '%s' to '%s'" % (
                     type(x).__name__, type(y).__name__))
 
-def _normalize_pair(hi, lo, factor):
-    if not 0 <= lo <= factor-1:
-        inc, lo = divmod(lo, factor)
-        hi += inc
-    return hi, lo
-
-def _normalize_datetime(y, m, d, hh, mm, ss, us, ignore_overflow=False):
-    # Normalize all the inputs, and store the normalized values.
-    ss, us = _normalize_pair(ss, us, 1000000)
-    mm, ss = _normalize_pair(mm, ss, 60)
-    hh, mm = _normalize_pair(hh, mm, 60)
-    d, hh = _normalize_pair(d, hh, 24)
-    y, m, d = _normalize_date(y, m, d, ignore_overflow)
-    return y, m, d, hh, mm, ss, us
-
-def _normalize_date(year, month, day, ignore_overflow=False):
-    # That was easy.  Now it gets muddy:  the proper range for day
-    # can't be determined without knowing the correct month and year,
-    # but if day is, e.g., plus or minus a million, the current month
-    # and year values make no sense (and may also be out of bounds
-    # themselves).
-    # Saying 12 months == 1 year should be non-controversial.
-    if not 1 <= month <= 12:
-        year, month = _normalize_pair(year, month-1, 12)
-        month += 1
-        assert 1 <= month <= 12
-
-    # Now only day can be out of bounds (year may also be out of bounds
-    # for a datetime object, but we don't care about that here).
-    # If day is out of bounds, what to do is arguable, but at least the
-    # method here is principled and explainable.
-    dim = _days_in_month(year, month)
-    if not 1 <= day <= dim:
-        # Move day-1 days from the first of the month.  First try to
-        # get off cheap if we're only one day out of range (adjustments
-        # for timezone alone can't be worse than that).
-        if day == 0:    # move back a day
-            month -= 1
-            if month > 0:
-                day = _days_in_month(year, month)
-            else:
-                year, month, day = year-1, 12, 31
-        elif day == dim + 1:    # move forward a day
-            month += 1
-            day = 1
-            if month > 12:
-                month = 1
-                year += 1
-        else:
-            ordinal = _ymd2ord(year, month, 1) + (day - 1)
-            year, month, day = _ord2ymd(ordinal)
-
-    if not ignore_overflow and not MINYEAR <= year <= MAXYEAR:
-        raise OverflowError("date value out of range")
-    return year, month, day
-
 def _accum(tag, sofar, num, factor, leftover):
     if isinstance(num, (int, long)):
         prod = num * factor
@@ -453,7 +241,7 @@ class timedelta(deltainterop):
     Representation: (days, seconds, microseconds).  Why?  Because I
     felt like it.
     """
-    __slots__ = '_days', '_seconds', '_microseconds', '_hashcode'
+    __slots__ = ()
 
     def __new__(cls, days=_SENTINEL, seconds=_SENTINEL, microseconds=_SENTINEL,
                 milliseconds=_SENTINEL, minutes=_SENTINEL, hours=_SENTINEL, weeks=_SENTINEL):
@@ -488,19 +276,7 @@ class timedelta(deltainterop):
 
     @classmethod
     def _create(cls, d, s, us, normalize):
-        if normalize:
-            s, us = _normalize_pair(s, us, 1000000)
-            d, s = _normalize_pair(d, s, 24*3600)
-
-        if not -_MAX_DELTA_DAYS <= d <= _MAX_DELTA_DAYS:
-            raise OverflowError("days=%d; must have magnitude <= %d" % (d, _MAX_DELTA_DAYS))
-
-        self = deltainterop.__new__(cls)
-        self._days = d
-        self._seconds = s
-        self._microseconds = us
-        self._hashcode = -1
-        return self
+        return _new_delta(cls, d, s, us, normalize)
 
     def _to_microseconds(self):
         return ((self._days * _SECONDS_PER_DAY + self._seconds) * _US_PER_SECOND +
@@ -649,18 +425,13 @@ class timedelta(deltainterop):
 
     def _cmp(self, other):
         assert isinstance(other, timedelta)
-        return _cmp(self._getstate(), other._getstate())
+        return self._cmp_delta(other)
 
     def __hash__(self):
         if self._hashcode == -1:
             self._hashcode = hash(self._getstate())
         return self._hashcode
 
-    def __nonzero__(self):
-        return (self._days != 0 or
-                self._seconds != 0 or
-                self._microseconds != 0)
-
     # Pickle support.
 
     def _getstate(self):
@@ -701,7 +472,7 @@ class date(dateinterop):
     Properties (readonly):
     year, month, day
     """
-    __slots__ = '_year', '_month', '_day', '_hashcode'
+    __slots__ = ()
 
     def __new__(cls, year, month=None, day=None):
         """Constructor.
@@ -718,12 +489,7 @@ class date(dateinterop):
             self._hashcode = -1
             return self
         year, month, day = _check_date_fields(year, month, day)
-        self = dateinterop.__new__(cls)
-        self._year = year
-        self._month = month
-        self._day = day
-        self._hashcode = -1
-        return self
+        return dateinterop.__new__(cls, year, month, day)
 
     # Additional constructors
 
@@ -802,7 +568,7 @@ class date(dateinterop):
         - http://www.w3.org/TR/NOTE-datetime
         - http://www.cl.cam.ac.uk/~mgk25/iso-time.html
         """
-        return "%04d-%02d-%02d" % (self._year, self._month, self._day)
+        return self._isoformat_date()
 
     __str__ = isoformat
 
@@ -829,13 +595,7 @@ class date(dateinterop):
         return _build_struct_time(self._year, self._month, self._day,
                                   0, 0, 0, -1)
 
-    def toordinal(self):
-        """Return proleptic Gregorian ordinal for the year, month and day.
-
-        January 1 of year 1 is day 1.  Only the year, month and day values
-        contribute to the result.
-        """
-        return _ymd2ord(self._year, self._month, self._day)
+    # toordinal(), weekday() and isoweekday() are inherited from dateinterop
 
     def replace(self, year=None, month=None, day=None):
         """Return a new date with new values for the specified fields."""
@@ -899,9 +659,7 @@ class date(dateinterop):
 
     def _cmp(self, other):
         assert isinstance(other, date)
-        y, m, d = self._year, self._month, self._day
-        y2, m2, d2 = other._year, other._month, other._day
-        return _cmp((y, m, d), (y2, m2, d2))
+        return self._cmp_date(other)
 
     def __hash__(self):
         "Hash."
@@ -936,16 +694,7 @@ class date(dateinterop):
             return self._add_timedelta(other, -1)
         return NotImplemented
 
-    def weekday(self):
-        "Return day of the week, where Monday == 0 ... Sunday == 6."
-        return (self.toordinal() + 6) % 7
-
-    # Day-of-the-week and week-of-the-year, according to ISO
-
-    def isoweekday(self):
-        "Return day of the week, where Monday == 1 ... Sunday == 7."
-        # 1-Jan-0001 is a Monday
-        return self.toordinal() % 7 or 7
+    # Week-of-the-year, according to ISO
 
     def isocalendar(self):
         """Return a 3-tuple containing ISO year, week number, and weekday.
@@ -1090,7 +839,7 @@ class time(timeinterop):
     Properties (readonly):
     hour, minute, second, microsecond, tzinfo
     """
-    __slots__ = '_hour', '_minute', '_second', '_microsecond', '_tzinfo', '_hashcode'
+    __slots__ = ()
 
     def __new__(cls, hour=0, minute=0, second=0, microsecond=0, tzinfo=None):
         """Constructor.
@@ -1110,14 +859,8 @@ class time(timeinterop):
         hour, minute, second, microsecond = _check_time_fields(
             hour, minute, second, microsecond)
         _check_tzinfo_arg(tzinfo)
-        self = timeinterop.__new__(cls)
-        self._hour = hour
-        self._minute = minute
-        self._second = second
-        self._microsecond = microsecond
-        self._tzinfo = tzinfo
-        self._hashcode = -1
-        return self
+        return timeinterop.__new__(cls, hour, minute, second, microsecond,
+                                   tzinfo)
 
     # Read-only field accessors
     @property
@@ -1199,10 +942,7 @@ class time(timeinterop):
             base_compare = myoff == otoff
 
         if base_compare:
-            return _cmp((self._hour, self._minute, self._second,
-                         self._microsecond),
-                        (other._hour, other._minute, other._second,
-                         other._microsecond))
+            return self._cmp_time(other)
         if myoff is None or otoff is None:
             raise TypeError("can't compare offset-naive and offset-aware times")
         myhhmm = self._hour * 60 + self._minute - myoff
@@ -1262,8 +1002,7 @@ class time(timeinterop):
         This is 'HH:MM:SS.mmmmmm+zz:zz', or 'HH:MM:SS+zz:zz' if
         self.microsecond == 0.
         """
-        s = _format_time(self._hour, self._minute, self._second,
-                         self._microsecond)
+        s = self._isoformat_time()
         tz = self._tzstr()
         if tz:
             s += tz
@@ -1407,7 +1146,7 @@ class datetime(date):
     The year, month and day arguments are required. tzinfo may be None, or an
     instance of a tzinfo subclass. The remaining arguments may be ints or longs.
     """
-    __slots__ = date.__slots__ + time.__slots__
+    __slots__ = ()
 
     def __new__(cls, year, month=None, day=None, hour=0, minute=0, second=0,
                 microsecond=0, tzinfo=None):
@@ -1427,17 +1166,8 @@ class datetime(date):
             hour, minute, second, microsecond = _check_time_fields(
                 hour, minute, second, microsecond)
         _check_tzinfo_arg(tzinfo)
-        self = dateinterop.__new__(cls)
-        self._year = year
-        self._month = month
-        self._day = day
-        self._hour = hour
-        self._minute = minute
-        self._second = second
-        self._microsecond = microsecond
-        self._tzinfo = tzinfo
-        self._hashcode = -1
-        return self
+        return dateinterop.__new__(cls, year, month, day, hour, minute, second,
+                                   microsecond, tzinfo)
 
     # Read-only field accessors
     @property
@@ -1472,8 +1202,7 @@ class datetime(date):
         A timezone info object may be passed in as well.
         """
         _check_tzinfo_arg(tz)
-        converter = _timemodule.localtime if tz is None else _timemodule.gmtime
-        self = cls._from_timestamp(converter, timestamp, tz)
+        self = cls._from_timestamp(tz is not None, timestamp, tz)
         if tz is not None:
             self = tz.fromutc(self)
         return self
@@ -1481,25 +1210,11 @@ class datetime(date):
     @classmethod
     def utcfromtimestamp(cls, t):
         "Construct a UTC datetime from a POSIX timestamp (like time.time())."
-        return cls._from_timestamp(_timemodule.gmtime, t, None)
+        return cls._from_timestamp(True, t, None)
 
     @classmethod
-    def _from_timestamp(cls, converter, timestamp, tzinfo):
-        t_full = timestamp
-        timestamp = int(_math.floor(timestamp))
-        frac = t_full - timestamp
-        us = _round(frac * 1e6)
-
-        # If timestamp is less than one microsecond smaller than a
-        # full second, us can be rounded up to 1000000.  In this case,
-        # roll over to seconds, otherwise, ValueError is raised
-        # by the constructor.
-        if us == 1000000:
-            timestamp += 1
-            us = 0
-        y, m, d, hh, mm, ss, weekday, jday, dst = converter(timestamp)
-        ss = min(ss, 59)    # clamp out leap seconds if the platform has them
-        return cls((y, m, d, hh, mm, ss, us), tzinfo=tzinfo)
+    def _from_timestamp(cls, utc, timestamp, tzinfo):
+        return cls(_timestamp_fields(timestamp, utc), tzinfo=tzinfo)
 
     @classmethod
     def now(cls, tz=None):
@@ -1626,9 +1341,7 @@ class datetime(date):
         Optional argument sep specifies the separator between date and
         time, default 'T'.
         """
-        s = ("%04d-%02d-%02d%c" % (self._year, self._month, self._day, sep) +
-             _format_time(self._hour, self._minute, self._second,
-                          self._microsecond))
+        s = self._isoformat_datetime(sep)
         off = self._utcoffset()
         if off is not None:
             if off < 0:
@@ -1793,12 +1506,7 @@ class datetime(date):
             base_compare = myoff == otoff
 
         if base_compare:
-            return _cmp((self._year, self._month, self._day,
-                         self._hour, self._minute, self._second,
-                         self._microsecond),
-                        (other._year, other._month, other._day,
-                         other._hour, other._minute, other._second,
-                         other._microsecond))
+            return self._cmp_datetime(other)
         if myoff is None or otoff is None:
             raise TypeError("can't compare offset-naive and offset-aware datetimes")
         # XXX What follows could be done more efficiently...
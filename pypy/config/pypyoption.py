@@ -166,6 +166,11 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                "make sure that all calls go through space.call_args",
                default=False),
 
+    BoolOption("opcodecounter",
+               "count the bytecodes executed by the interpreter, per code"
+               " object and opcode, see __pypy__.opcode_counts()",
+               default=False),
+
     BoolOption("disable_entrypoints",
                "Disable external entry points, notably the"
                " cpyext module and cffi's embedding mode.",
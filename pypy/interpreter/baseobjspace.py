@@ -767,6 +767,12 @@ class ObjSpace(object):
 
     def createframe(self, code, w_globals, outer_func=None):
         "Create an empty PyFrame suitable for this code object."
+        if not jit.we_are_jitted():
+            frame = code.recycled_frame
+            if frame is not None and not code.frame_stores_global(w_globals):
+                code.recycled_frame = None
+                frame.reinit_recycled(w_globals, outer_func)
+                return frame
         return self.FrameClass(self, code, w_globals, outer_func)
 
     def allocate_lock(self):
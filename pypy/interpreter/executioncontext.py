@@ -382,6 +382,7 @@ class ExecutionContext(object):
                 event = 'return'
 
             assert self.is_tracing == 0
+            frame.mark_as_escaped()
             self.is_tracing += 1
             try:
                 try:
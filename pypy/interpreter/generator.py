@@ -34,6 +34,7 @@ class GeneratorIterator(W_Root):
         mod      = space.interp_w(MixedModule, w_mod)
         new_inst = mod.get('generator_new')
         if self.frame:
+            self.frame.mark_as_escaped()
             w_frame = self.frame._reduce_state(space)
         else:
             w_frame = space.w_None
@@ -109,6 +110,7 @@ return next yielded value or raise StopIteration."""
             # if the frame is now marked as finished, it was RETURNed from
             if frame.frame_finished_execution:
                 self.frame_is_finished()
+                self._recycle_frame(frame)
                 raise OperationError(space.w_StopIteration, space.w_None)
             else:
                 return w_result     # YIELDed
@@ -159,6 +161,7 @@ return next yielded value or raise StopIteration."""
 
     def descr_gi_frame(self, space):
         if self.frame is not None and not self.frame.frame_finished_execution:
+            self.frame.mark_as_escaped()
             return self.frame
         else:
             return space.w_None
@@ -205,6 +208,7 @@ return next yielded value or raise StopIteration."""
                         break
                     # if the frame is now marked as finished, it was RETURNed from
                     if frame.frame_finished_execution:
+                        self._recycle_frame(frame)
                         break
                     results.append(w_result)     # YIELDed
             finally:
@@ -233,6 +237,22 @@ return next yielded value or raise StopIteration."""
         self.frame = None
         rgc.may_ignore_finalizer(self)
 
+    def _recycle_frame(self, frame):
+        # Called when the generator RETURNed.  Most generators are small
+        # and short-lived, so the next generator of the same code object
+        # reuses the frame instead of allocating a new one (see
+        # space.createframe()).  This is only done if nothing else can
+        # still see the frame: app-level code gets frames with
+        # sys._getframe(), gi_frame, f_back or tracebacks, which all mark
+        # them as escaped, and tracing or locals() give them a debugdata.
+        # Not done in JITted code, where the frame is often virtual.
+        if jit.we_are_jitted():
+            return
+        if frame.escaped or frame.debugdata is not None:
+            return
+        frame.clear_for_recycling()
+        self.pycode.recycled_frame = frame
+
     def iterator_greenkey(self, space):
         return self.pycode
 
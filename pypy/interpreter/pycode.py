@@ -4,7 +4,7 @@ PyCode instances have the same co_xxx arguments as CPython code objects.
 The bytecode interpreter itself is implemented by the PyFrame class.
 """
 
-import dis, imp, struct, types, new, sys, os
+import dis, imp, struct, types, new, sys, os, weakref
 
 from pypy.interpreter import eval
 from pypy.interpreter.signature import Signature
@@ -53,6 +53,91 @@ class CodeHookCache(object):
     def __init__(self, space):
         self._code_hook = None
 
+class CoverageVersion(object):
+    """Replaced in PyCode.coverage_version whenever the coverage_map of the
+    code object changes; see is_line_recorded()."""
+
+NO_COVERAGE = CoverageVersion()
+
+class LineCoverage(object):
+    """The code objects whose bytecodes were executed while the line
+    coverage mode of __pypy__.start_line_coverage() was active.  Unlike
+    sys.settrace(), it does not prevent JIT compilation: see
+    is_line_recorded()."""
+    _immutable_fields_ = ['active?']
+
+    def __init__(self, space):
+        self.active = False
+        self.pycodes = []     # weakrefs to the PyCodes with a coverage map
+
+    def get_pycodes(self):
+        result = []
+        for ref in self.pycodes:
+            pycode = ref()
+            if pycode is not None:
+                result.append(pycode)
+        return result
+
+    def reset(self):
+        # the new versions invalidate the JITted code that was compiled
+        # after recording these lines, so that they are recorded again
+        for pycode in self.get_pycodes():
+            pycode.coverage_map = None
+            pycode.coverage_version = CoverageVersion()
+        self.pycodes = []
+
+class OpcodeCounters(object):
+    """The code objects whose opcodes were counted by the interpreter; only
+    with the objspace.opcodecounter option.  See count_opcode()."""
+
+    def __init__(self, space):
+        self.pycodes = []     # weakrefs to the PyCodes with opcode_counts
+
+    def get_pycodes(self):
+        result = []
+        for ref in self.pycodes:
+            pycode = ref()
+            if pycode is not None:
+                result.append(pycode)
+        return result
+
+    def reset(self):
+        for pycode in self.get_pycodes():
+            pycode.opcode_counts = None
+        self.pycodes = []
+
+def count_opcode(space, pycode, opcode):
+    # Called by the interpreter for each bytecode, not in JITted code.
+    # Only the first execution of a code object allocates its counters.
+    counts = pycode.opcode_counts
+    if counts is None:
+        counts = [0] * 256
+        pycode.opcode_counts = counts
+        space.fromcache(OpcodeCounters).pycodes.append(weakref.ref(pycode))
+    counts[opcode] += 1
+
+@jit.elidable
+def is_line_recorded(pycode, offset, version):
+    # The coverage_map of 'pycode' only changes together with its
+    # coverage_version, which is quasi-immutable.  In JITted code the
+    # call is constant-folded, and the loop only depends on the version:
+    # once all its bytecodes are recorded, it contains no coverage code.
+    coverage_map = pycode.coverage_map
+    return coverage_map is not None and coverage_map[offset]
+
+@jit.dont_look_inside
+def record_line_coverage(coverage, pycode, offset):
+    # Called before a bytecode that is not recorded yet.  Changing the
+    # version invalidates the loops that were compiled without the mark.
+    coverage_map = pycode.coverage_map
+    if coverage_map is None:
+        coverage_map = [False] * len(pycode.co_code)
+        pycode.coverage_map = coverage_map
+        coverage.pycodes.append(weakref.ref(pycode))
+    coverage_map[offset] = True
+    pycode.coverage_version = CoverageVersion()
+
+
 class PyCode(eval.Code):
     "CPython-style code objects."
     _immutable_fields_ = ["_signature", "co_argcount", "co_cellvars[*]",
@@ -61,9 +146,18 @@ class PyCode(eval.Code):
                           "co_lnotab", "co_names_w[*]", "co_nlocals",
                           "co_stacksize", "co_varnames[*]",
                           "_args_as_cellvars[*]",
-                          "w_globals?",
+                          "w_globals?", "coverage_version?",
                           "cell_families[*]"]
 
+    # the frame of a finished generator of this code, kept for reuse by
+    # the next generator; see GeneratorIterator._recycle_frame()
+    recycled_frame = None
+    # list of flags, True for the bytecodes executed in line coverage
+    # mode; see LineCoverage
+    coverage_map = None
+    # number of executions of each opcode, with objspace.opcodecounter
+    opcode_counts = None
+
     def __init__(self, space,  argcount, nlocals, stacksize, flags,
                      code, consts, names, varnames, filename,
                      name, firstlineno, lnotab, freevars, cellvars,
@@ -91,6 +185,7 @@ class PyCode(eval.Code):
         # here. if a frame is run in that globals object, it does not need to
         # store it at all
         self.w_globals = None
+        self.coverage_version = NO_COVERAGE
         self.hidden_applevel = hidden_applevel
         self.magic = magic
         self._signature = make_signature(self)
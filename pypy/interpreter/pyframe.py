@@ -114,6 +114,27 @@ class PyFrame(W_Root):
         # class bodies only have CO_NEWLOCALS.
         self.initialize_frame_scopes(outer_func, code)
 
+    def clear_for_recycling(self):
+        """Forget the content of the frame of a generator that finished,
+        before it is kept for reuse; see reinit_recycled()."""
+        for i in range(len(self.locals_cells_stack_w)):
+            self.locals_cells_stack_w[i] = None
+        self.last_exception = None
+        self.lastblock = None
+
+    def reinit_recycled(self, w_globals, outer_func):
+        """Make a frame cleared by clear_for_recycling() ready to run its
+        code from the start, like a new frame."""
+        code = self.pycode
+        self.frame_finished_execution = False
+        self.last_instr = -1
+        self.f_backref = jit.vref_None
+        self.valuestackdepth = (code.co_nlocals + len(code.co_cellvars) +
+                                len(code.co_freevars))
+        if self.space.config.objspace.honor__builtins__:
+            self.builtin = self.space.builtin.pick_builtin(w_globals)
+        self.initialize_frame_scopes(outer_func, code)
+
     def getdebug(self):
         return self.debugdata
 
@@ -869,7 +890,10 @@ class PyFrame(W_Root):
         return ExecutionContext.getnextframe_nohidden(self)
 
     def fget_f_back(self, space):
-        return self.get_f_back()
+        f_back = self.get_f_back()
+        if f_back is not None:
+            f_back.mark_as_escaped()
+        return f_back
 
     def fget_f_lasti(self, space):
         return self.space.newint(self.last_instr)
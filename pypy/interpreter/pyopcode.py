@@ -17,7 +17,9 @@ from pypy.interpreter import (
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.nestedscope import Cell
-from pypy.interpreter.pycode import PyCode, BytecodeCorruption
+from pypy.interpreter.pycode import (
+    PyCode, BytecodeCorruption, LineCoverage, is_line_recorded,
+    record_line_coverage, count_opcode)
 from pypy.tool.stdlib_opcode import bytecode_spec
 
 @not_rpython
@@ -153,6 +155,13 @@ class __extend__(pyframe.PyFrame):
             else:
                 ec.bytecode_trace(self)
                 next_instr = r_uint(self.last_instr)
+            coverage = self.space.fromcache(LineCoverage)
+            if coverage.active:
+                pycode = self.getcode()
+                offset = intmask(next_instr)
+                if not is_line_recorded(pycode, offset,
+                                        pycode.coverage_version):
+                    record_line_coverage(coverage, pycode, offset)
             opcode = ord(co_code[next_instr])
             next_instr += 1
 
@@ -164,6 +173,10 @@ class __extend__(pyframe.PyFrame):
             else:
                 oparg = 0
 
+            if (self.space.config.objspace.opcodecounter and
+                    not jit.we_are_jitted()):
+                count_opcode(self.space, self.pycode, opcode)
+
             # note: the structure of the code here is such that it makes
             # (after translation) a big "if/elif" chain, which is then
             # turned into a switch().
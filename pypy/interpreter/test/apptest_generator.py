@@ -309,3 +309,31 @@ def test_multiple_invalid_sends():
         g.send(2)
     with raises(TypeError):
         g.send(2)
+
+def test_reused_frame():
+    def f(n):
+        if n:
+            x = n
+        yield n
+        yield x
+    assert list(f(5)) == [5, 5]
+    g = f(0)
+    assert g.next() == 0
+    with raises(UnboundLocalError):
+        g.next()
+    g1 = f(1)
+    g2 = f(2)
+    assert list(g1) == [1, 1]
+    assert list(f(3)) == [3, 3]
+    assert list(g2) == [2, 2]
+
+def test_reused_frame_gi_frame():
+    def f():
+        yield 1
+    g = f()
+    frame = g.gi_frame
+    assert list(g) == [1]
+    g = f()
+    assert g.gi_frame is not frame
+    assert frame.f_code is f.__code__
+    assert list(g) == [1]
@@ -13,3 +13,46 @@ def test_should_not_inline(space):
         return g.__code__
     ''')
     assert should_not_inline(w_co) == True
+
+def test_recycle_frame(space):
+    w_f = space.appexec([], '''():
+        def f(n):
+            for i in range(n):
+                yield i
+        return f
+    ''')
+    pycode = w_f.code
+    assert pycode.recycled_frame is None
+    w_gen = space.call_function(w_f, space.newint(3))
+    frame = w_gen.frame
+    assert space.unwrap(space.newlist(space.unpackiterable(w_gen))) == [0, 1, 2]
+    assert pycode.recycled_frame is frame
+    assert frame.locals_cells_stack_w == [None] * len(
+        frame.locals_cells_stack_w)
+    # the next generator of the same code reuses it
+    w_gen2 = space.call_function(w_f, space.newint(2))
+    assert w_gen2.frame is frame
+    assert pycode.recycled_frame is None
+    assert frame.last_instr == -1
+    assert not frame.frame_finished_execution
+    assert space.unwrap(space.call_method(w_gen2, 'next')) == 0
+    assert space.unwrap(space.call_method(w_gen2, 'next')) == 1
+    space.raises_w(space.w_StopIteration, space.call_method, w_gen2, 'next')
+    assert pycode.recycled_frame is frame
+
+def test_recycle_frame_escaped(space):
+    w_f, w_g = space.unpackiterable(space.appexec([], '''():
+        import sys
+        def f():
+            yield sys._getframe()
+        def g(x):
+            try:
+                1 / x
+            except ZeroDivisionError:
+                yield sys.exc_info()[2]
+        return f, g
+    '''))
+    for w_func, args_w in [(w_f, []), (w_g, [space.newint(0)])]:
+        w_gen = space.call_function(w_func, *args_w)
+        space.unpackiterable(w_gen)
+        assert w_func.code.recycled_frame is None
@@ -0,0 +1,72 @@
+""" Tests that the line coverage mode of __pypy__.start_line_coverage()
+leaves no code in the JITted loops once their lines are recorded, and that
+reset_line_coverage() makes them record the lines again.
+"""
+
+from rpython.jit.metainterp.test.support import LLJitMixin
+from rpython.rlib import jit
+from pypy.interpreter.pycode import (
+    LineCoverage, NO_COVERAGE, is_line_recorded, record_line_coverage)
+
+
+class FakeCode(object):
+    _immutable_fields_ = ['co_code', 'coverage_version?']
+
+    def __init__(self, co_code):
+        self.co_code = co_code
+        self.coverage_map = None
+        self.coverage_version = NO_COVERAGE
+
+
+class TestLineCoverageJit(LLJitMixin):
+    def run_loop(self, reset_at):
+        # a bytecode loop of 'len(co_code)' instructions that runs the
+        # coverage recording of dispatch_bytecode() before each of them
+        driver = jit.JitDriver(greens=['pc', 'pycode'],
+                               reds=['i', 'n', 'coverage'])
+
+        def interp(n):
+            pycode = FakeCode('abcdef')
+            coverage = LineCoverage(None)
+            coverage.active = True
+            i = 0
+            pc = 0
+            while i < n:
+                driver.jit_merge_point(pc=pc, pycode=pycode, i=i, n=n,
+                                       coverage=coverage)
+                if coverage.active:
+                    if not is_line_recorded(pycode, pc,
+                                            pycode.coverage_version):
+                        record_line_coverage(coverage, pycode, pc)
+                if i == reset_at:
+                    coverage.reset()
+                i += 1
+                pc += 1
+                if pc == len(pycode.co_code):
+                    pc = 0
+                    driver.can_enter_jit(pc=pc, pycode=pycode, i=i, n=n,
+                                         coverage=coverage)
+            # the number of recorded bytecodes
+            result = 0
+            if pycode.coverage_map is not None:
+                for flag in pycode.coverage_map:
+                    if flag:
+                        result += 1
+            return result
+
+        return self.meta_interp(interp, [600], listops=True)
+
+    def test_no_call_in_loop(self):
+        assert self.run_loop(-1) == 6
+        self.check_trace_count(1)
+        # no residual call: the elidable check is constant-folded
+        self.check_resops(call_n=0, call_i=0, call_pure_i=0,
+                          cond_call=0)
+
+    def test_recorded_again_after_reset(self):
+        # reset while the compiled loop runs: the loop is invalidated, the
+        # lines are recorded again and a new loop is compiled
+        assert self.run_loop(400) == 6
+        self.check_trace_count(2)
+        self.check_resops(call_n=0, call_i=0, call_pure_i=0,
+                          cond_call=0)
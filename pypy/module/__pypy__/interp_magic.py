@@ -1,6 +1,7 @@
 from pypy.interpreter.error import oefmt, wrap_oserror
 from pypy.interpreter.gateway import unwrap_spec
-from pypy.interpreter.pycode import CodeHookCache
+from pypy.interpreter.pycode import (
+    CodeHookCache, LineCoverage, OpcodeCounters)
 from pypy.interpreter.pyframe import PyFrame
 from pypy.interpreter.mixedmodule import MixedModule
 from rpython.rlib.objectmodel import we_are_translated
@@ -8,8 +9,9 @@ from pypy.objspace.std.dictmultiobject import W_DictMultiObject
 from pypy.objspace.std.listobject import W_ListObject
 from pypy.objspace.std.setobject import W_BaseSetObject
 from pypy.objspace.std.typeobject import MethodCache
-from pypy.objspace.std.mapdict import MapAttrCache
+from pypy.objspace.std.mapdict import MapAttrCache, CacheSites
 from rpython.rlib import rposix, rgc, rstack
+from rpython.rlib.listsort import make_timsort_class
 from rpython.rtyper.lltypesystem import rffi
 
 
@@ -51,6 +53,114 @@ def mapdict_cache_counter(space, name):
     return space.newtuple2(space.newint(cache.hits.get(name, 0)),
                            space.newint(cache.misses.get(name, 0)))
 
+CacheSiteBaseTimSort = make_timsort_class()
+class CacheSiteSort(CacheSiteBaseTimSort):
+    def lt(self, a, b):
+        return a[2].misses > b[2].misses     # most misses first
+
+@unwrap_spec(limit=int)
+def mapdict_cache_report(space, limit=20):
+    """Return a list of the attribute lookups and stores whose cache saw
+    instances of more than one layout (or class), as tuples (filename,
+    firstlineno, funcname, attrname, hits, misses, layouts).  The list is
+    sorted by number of cache misses, and contains at most 'limit' items.
+    The accesses to the same attribute name in a function are counted
+    together.  'layouts' is the number of different layouts seen, but it
+    stops counting at 8.  Only the interpreter uses these caches: the
+    numbers do not include what runs in JIT-compiled code."""
+    entries = space.fromcache(CacheSites).get_entries()
+    CacheSiteSort(entries).sort()
+    result_w = []
+    for pycode, nameindex, entry in entries:
+        if len(result_w) >= limit:
+            break
+        result_w.append(space.newtuple([
+            space.newtext(pycode.co_filename),
+            space.newint(pycode.co_firstlineno),
+            space.newtext(pycode.co_name),
+            pycode.co_names_w[nameindex],
+            space.newint(entry.hits),
+            space.newint(entry.misses),
+            space.newint(entry.num_seen_maps())]))
+    return space.newlist(result_w)
+
+def reset_mapdict_cache_report(space):
+    """Reset the statistics returned by mapdict_cache_report()."""
+    space.fromcache(CacheSites).reset()
+
+def start_line_coverage(space):
+    """Start recording which lines of Python code are executed, until
+    stop_line_coverage().  Unlike with sys.settrace(), the code is still
+    JIT-compiled: a line is recorded when it is first traced, and the
+    compiled code runs at full speed."""
+    space.fromcache(LineCoverage).active = True
+
+def stop_line_coverage(space):
+    """Stop recording the executed lines; see start_line_coverage()."""
+    space.fromcache(LineCoverage).active = False
+
+def _covered_lines(pycode, coverage_map, lines):
+    # like offset2lineno() for all the recorded bytecodes, in one pass
+    tab = pycode.co_lnotab
+    line = pycode.co_firstlineno
+    addr = 0
+    i = 0
+    for offset in range(len(coverage_map)):
+        if not coverage_map[offset]:
+            continue
+        while i < len(tab) and addr + ord(tab[i]) <= offset:
+            addr += ord(tab[i])
+            line += ord(tab[i + 1])
+            i += 2
+        lines[line] = None
+
+def get_line_coverage(space):
+    """Return a dict {filename: sorted list of line numbers} with the lines
+    executed while the line coverage was active."""
+    files = {}
+    for pycode in space.fromcache(LineCoverage).get_pycodes():
+        coverage_map = pycode.coverage_map
+        if coverage_map is None:
+            continue
+        filename = pycode.co_filename
+        if filename not in files:
+            files[filename] = {}
+        _covered_lines(pycode, coverage_map, files[filename])
+    w_result = space.newdict()
+    for filename, lines in files.items():
+        linenos = lines.keys()
+        linenos.sort()
+        space.setitem(w_result, space.newtext(filename),
+                      space.newlist([space.newint(line) for line in linenos]))
+    return w_result
+
+def reset_line_coverage(space):
+    """Forget the lines recorded so far by start_line_coverage()."""
+    space.fromcache(LineCoverage).reset()
+
+def opcode_counts(space):
+    """Return a dict {code object: {opcode name: count}} with the number of
+    times that the interpreter executed each opcode of each code object.
+    The bytecodes run by JIT-compiled machine code are not counted."""
+    from pypy.tool.stdlib_opcode import opcode_method_names
+    w_result = space.newdict()
+    for pycode in space.fromcache(OpcodeCounters).get_pycodes():
+        counts = pycode.opcode_counts
+        if counts is None:
+            continue
+        w_counts = space.newdict()
+        for opcode in range(len(counts)):
+            if counts[opcode]:
+                space.setitem(w_counts,
+                              space.newtext(opcode_method_names[opcode]),
+                              space.newint(counts[opcode]))
+        space.setitem(w_result, pycode, w_counts)
+    return w_result
+
+def reset_opcode_counts(space):
+    """Reset the counters returned by opcode_counts()."""
+    space.fromcache(OpcodeCounters).reset()
+
 def builtinify(space, w_func):
     """To implement at app-level modules that are, in CPython,
     implemented in C: this decorator protects a function from being ever
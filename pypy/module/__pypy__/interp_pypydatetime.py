@@ -1,24 +1,590 @@
+"""
+Interp-level support for lib_pypy/datetime.py.
+
+The classes date, datetime, time and timedelta of lib_pypy/datetime.py
+inherit from the W_DateTime_* classes below, which hold the fields as
+unboxed integers; cpyext's cdatetime.py reads them directly.  The
+functions at the end implement the hot paths of the calendar
+arithmetic and of the formatting.
+"""
+
+import math
+
+from rpython.rlib.rfloat import isfinite
+from rpython.rlib.rstring import StringBuilder
+from rpython.rtyper.lltypesystem import lltype, rffi
 from pypy.interpreter.baseobjspace import W_Root
-from pypy.interpreter.typedef import TypeDef
-from pypy.interpreter.gateway import interp2app
+from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.typedef import TypeDef, GetSetProperty
+from pypy.interpreter.gateway import interp2app, unwrap_spec
 from rpython.tool.sourcetools import func_with_new_name
 
-def create_class(name):
-    class W_Class(W_Root):
-        'builtin base clasee for datetime.%s to allow interop with cpyext' % name
-        def descr_new__(space, w_type):
-            return space.allocate_instance(W_Class, w_type)
 
-    W_Class.typedef = TypeDef(name,
-        __new__ = interp2app(func_with_new_name(
-                                    W_Class.descr_new__.im_func,
-                                    '%s_new' % (name,))),
-        )
-    W_Class.typedef.acceptable_as_base_class = True
-    return W_Class
+MINYEAR = 1
+MAXYEAR = 9999
+MAX_DELTA_DAYS = 999999999
+
+DAYS_IN_MONTH = [-1, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+DAYS_BEFORE_MONTH = [-1, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304,
+                     334]
+
+def is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+def days_before_year(year):
+    y = year - 1
+    return y * 365 + y // 4 - y // 100 + y // 400
+
+def days_in_month(year, month):
+    assert 1 <= month <= 12
+    if month == 2 and is_leap(year):
+        return 29
+    return DAYS_IN_MONTH[month]
+
+def days_before_month(year, month):
+    assert 1 <= month <= 12
+    result = DAYS_BEFORE_MONTH[month]
+    if month > 2 and is_leap(year):
+        result += 1
+    return result
+
+def ymd_to_ord(year, month, day):
+    "year, month, day -> ordinal, considering 01-Jan-0001 as day 1."
+    return days_before_year(year) + days_before_month(year, month) + day
+
+DI400Y = days_before_year(401)    # number of days in 400 years
+DI100Y = days_before_year(101)    #    "    "   "   " 100   "
+DI4Y = days_before_year(5)        #    "    "   "   "   4   "
+
+def ord_to_ymd(n):
+    "ordinal -> (year, month, day), considering 01-Jan-0001 as day 1."
+    # See the comments in CPython's Lib/datetime.py for the details.
+    n -= 1
+    n400 = n // DI400Y
+    n = n % DI400Y
+    year = n400 * 400 + 1
+    n100 = n // DI100Y
+    n = n % DI100Y
+    n4 = n // DI4Y
+    n = n % DI4Y
+    n1 = n // 365
+    n = n % 365
+    year += n100 * 100 + n4 * 4 + n1
+    if n1 == 4 or n100 == 4:
+        return year - 1, 12, 31
+    leapyear = n1 == 3 and (n4 != 24 or n100 == 3)
+    month = (n + 50) >> 5
+    preceding = DAYS_BEFORE_MONTH[month]
+    if month > 2 and leapyear:
+        preceding += 1
+    if preceding > n:     # estimate is too large
+        month -= 1
+        preceding -= DAYS_IN_MONTH[month]
+        if month == 2 and leapyear:
+            preceding -= 1
+    return year, month, n - preceding + 1
+
+def normalize_ymd(space, year, month, day, ignore_overflow):
+    if not 1 <= month <= 12:
+        year += (month - 1) // 12
+        month = (month - 1) % 12 + 1
+    dim = days_in_month(year, month)
+    if not 1 <= day <= dim:
+        if day == 0:    # move back a day
+            month -= 1
+            if month > 0:
+                day = days_in_month(year, month)
+            else:
+                year, month, day = year - 1, 12, 31
+        elif day == dim + 1:    # move forward a day
+            month += 1
+            day = 1
+            if month > 12:
+                month = 1
+                year += 1
+        else:
+            year, month, day = ord_to_ymd(ymd_to_ord(year, month, 1) +
+                                          (day - 1))
+    if not ignore_overflow and not MINYEAR <= year <= MAXYEAR:
+        raise oefmt(space.w_OverflowError, "date value out of range")
+    return year, month, day
+
+def cmp_int(a, b):
+    if a < b:
+        return -1
+    if a > b:
+        return 1
+    return 0
+
+def format_int(builder, value, width):
+    s = str(value)
+    for i in range(width - len(s)):
+        builder.append('0')
+    builder.append(s)
+
+def format_date(builder, year, month, day):
+    format_int(builder, year, 4)
+    builder.append('-')
+    format_int(builder, month, 2)
+    builder.append('-')
+    format_int(builder, day, 2)
+
+def format_time(builder, hour, minute, second, microsecond):
+    # Skip trailing microseconds when microsecond == 0.
+    format_int(builder, hour, 2)
+    builder.append(':')
+    format_int(builder, minute, 2)
+    builder.append(':')
+    format_int(builder, second, 2)
+    if microsecond:
+        builder.append('.')
+        format_int(builder, microsecond, 6)
+
+
+def make_int_field(cls, name):
+    def fget(space, w_self):
+        return space.newint(getattr(w_self, name))
+    def fset(space, w_self, w_value):
+        setattr(w_self, name, space.int_w(w_value))
+    return GetSetProperty(
+        func_with_new_name(fget, 'fget_%s_%s' % (cls.__name__, name)),
+        func_with_new_name(fset, 'fset_%s_%s' % (cls.__name__, name)),
+        cls=cls)
+
+def make_tzinfo_field(cls):
+    def fget(space, w_self):
+        if w_self.w_tzinfo is None:
+            return space.w_None
+        return w_self.w_tzinfo
+    def fset(space, w_self, w_value):
+        if space.is_none(w_value):
+            w_value = None
+        w_self.w_tzinfo = w_value
+    return GetSetProperty(
+        func_with_new_name(fget, 'fget_%s_tzinfo' % (cls.__name__,)),
+        func_with_new_name(fset, 'fset_%s_tzinfo' % (cls.__name__,)),
+        cls=cls)
+
+
+class W_DateTime_Date(W_Root):
+    'builtin base class for datetime.date and datetime.datetime'
+    # the time fields are only used by datetime.datetime
+    year = 1
+    month = 1
+    day = 1
+    hour = 0
+    minute = 0
+    second = 0
+    microsecond = 0
+    w_tzinfo = None
+    hashcode = -1
+
+    def toordinal_w(self, space):
+        return space.newint(ymd_to_ord(self.year, self.month, self.day))
+
+    def weekday_w(self, space):
+        return space.newint((ymd_to_ord(self.year, self.month, self.day)
+                             + 6) % 7)
+
+    def isoweekday_w(self, space):
+        return space.newint((ymd_to_ord(self.year, self.month, self.day)
+                             + 6) % 7 + 1)
+
+    def cmp_date_w(self, space, w_other):
+        other = space.interp_w(W_DateTime_Date, w_other)
+        c = cmp_int(self.year, other.year)
+        if c == 0:
+            c = cmp_int(self.month, other.month)
+            if c == 0:
+                c = cmp_int(self.day, other.day)
+        return space.newint(c)
+
+    def cmp_datetime_w(self, space, w_other):
+        """Compare the fields of two datetimes, ignoring the tzinfo."""
+        other = space.interp_w(W_DateTime_Date, w_other)
+        c = cmp_int(self.year, other.year)
+        if c == 0:
+            c = cmp_int(self.month, other.month)
+            if c == 0:
+                c = cmp_int(self.day, other.day)
+                if c == 0:
+                    c = cmp_int(self.hour, other.hour)
+                    if c == 0:
+                        c = cmp_int(self.minute, other.minute)
+                        if c == 0:
+                            c = cmp_int(self.second, other.second)
+                            if c == 0:
+                                c = cmp_int(self.microsecond,
+                                            other.microsecond)
+        return space.newint(c)
+
+    def isoformat_date_w(self, space):
+        builder = StringBuilder(10)
+        format_date(builder, self.year, self.month, self.day)
+        return space.newtext(builder.build())
+
+    def isoformat_datetime_w(self, space, w_sep):
+        """The ISO format of a datetime, without the UTC offset."""
+        builder = StringBuilder(26)
+        format_date(builder, self.year, self.month, self.day)
+        date_part = builder.build()
+        builder = StringBuilder(15)
+        format_time(builder, self.hour, self.minute, self.second,
+                    self.microsecond)
+        time_part = builder.build()
+        if space.isinstance_w(w_sep, space.w_bytes):
+            sep = space.bytes_w(w_sep)
+            if len(sep) == 1:
+                return space.newtext(date_part + sep + time_part)
+        # same result as "%c" % sep, including the errors
+        w_sep = space.mod(space.newtext("%c"), w_sep)
+        return space.add(space.add(space.newtext(date_part), w_sep),
+                         space.newtext(time_part))
+
+
+class W_DateTime_Time(W_Root):
+    'builtin base class for datetime.time'
+    hour = 0
+    minute = 0
+    second = 0
+    microsecond = 0
+    w_tzinfo = None
+    hashcode = -1
+
+    def cmp_time_w(self, space, w_other):
+        """Compare the fields of two times, ignoring the tzinfo."""
+        other = space.interp_w(W_DateTime_Time, w_other)
+        c = cmp_int(self.hour, other.hour)
+        if c == 0:
+            c = cmp_int(self.minute, other.minute)
+            if c == 0:
+                c = cmp_int(self.second, other.second)
+                if c == 0:
+                    c = cmp_int(self.microsecond, other.microsecond)
+        return space.newint(c)
+
+    def isoformat_time_w(self, space):
+        """The ISO format of a time, without the UTC offset."""
+        builder = StringBuilder(15)
+        format_time(builder, self.hour, self.minute, self.second,
+                    self.microsecond)
+        return space.newtext(builder.build())
+
+
+class W_DateTime_Delta(W_Root):
+    'builtin base class for datetime.timedelta'
+    days = 0
+    seconds = 0
+    microseconds = 0
+    hashcode = -1
+
+    def cmp_delta_w(self, space, w_other):
+        other = space.interp_w(W_DateTime_Delta, w_other)
+        c = cmp_int(self.days, other.days)
+        if c == 0:
+            c = cmp_int(self.seconds, other.seconds)
+            if c == 0:
+                c = cmp_int(self.microseconds, other.microseconds)
+        return space.newint(c)
+
+    def nonzero_w(self, space):
+        return space.newbool(self.days != 0 or self.seconds != 0 or
+                             self.microseconds != 0)
+
+
+@unwrap_spec(year=int, month=int, day=int, hour=int, minute=int, second=int,
+             microsecond=int)
+def date_new(space, w_type, year=1, month=1, day=1, hour=0, minute=0,
+             second=0, microsecond=0, w_tzinfo=None):
+    """Allocate a date or a datetime.  The fields are not checked: this
+    is done by the __new__ of the subclasses."""
+    self = space.allocate_instance(W_DateTime_Date, w_type)
+    self.year = year
+    self.month = month
+    self.day = day
+    self.hour = hour
+    self.minute = minute
+    self.second = second
+    self.microsecond = microsecond
+    if w_tzinfo is not None and space.is_none(w_tzinfo):
+        w_tzinfo = None
+    self.w_tzinfo = w_tzinfo
+    self.hashcode = -1
+    return self
+
+@unwrap_spec(hour=int, minute=int, second=int, microsecond=int)
+def time_new(space, w_type, hour=0, minute=0, second=0, microsecond=0,
+             w_tzinfo=None):
+    """Allocate a time.  The fields are not checked: this is done by the
+    __new__ of the subclasses."""
+    self = space.allocate_instance(W_DateTime_Time, w_type)
+    self.hour = hour
+    self.minute = minute
+    self.second = second
+    self.microsecond = microsecond
+    if w_tzinfo is not None and space.is_none(w_tzinfo):
+        w_tzinfo = None
+    self.w_tzinfo = w_tzinfo
+    self.hashcode = -1
+    return self
+
+@unwrap_spec(days=int, seconds=int, microseconds=int)
+def delta_new(space, w_type, days=0, seconds=0, microseconds=0):
+    """Allocate a timedelta.  The fields are not checked: this is done
+    by the __new__ of the subclasses."""
+    self = space.allocate_instance(W_DateTime_Delta, w_type)
+    self.days = days
+    self.seconds = seconds
+    self.microseconds = microseconds
+    self.hashcode = -1
+    return self
+
+
+W_DateTime_Date.typedef = TypeDef('pypydatetime_date',
+    __new__ = interp2app(date_new),
+    _year = make_int_field(W_DateTime_Date, 'year'),
+    _month = make_int_field(W_DateTime_Date, 'month'),
+    _day = make_int_field(W_DateTime_Date, 'day'),
+    _hour = make_int_field(W_DateTime_Date, 'hour'),
+    _minute = make_int_field(W_DateTime_Date, 'minute'),
+    _second = make_int_field(W_DateTime_Date, 'second'),
+    _microsecond = make_int_field(W_DateTime_Date, 'microsecond'),
+    _tzinfo = make_tzinfo_field(W_DateTime_Date),
+    _hashcode = make_int_field(W_DateTime_Date, 'hashcode'),
+    toordinal = interp2app(W_DateTime_Date.toordinal_w),
+    weekday = interp2app(W_DateTime_Date.weekday_w),
+    isoweekday = interp2app(W_DateTime_Date.isoweekday_w),
+    _cmp_date = interp2app(W_DateTime_Date.cmp_date_w),
+    _cmp_datetime = interp2app(W_DateTime_Date.cmp_datetime_w),
+    _isoformat_date = interp2app(W_DateTime_Date.isoformat_date_w),
+    _isoformat_datetime = interp2app(W_DateTime_Date.isoformat_datetime_w),
+    )
+W_DateTime_Date.typedef.acceptable_as_base_class = True
+
+W_DateTime_Time.typedef = TypeDef('pypydatetime_time',
+    __new__ = interp2app(time_new),
+    _hour = make_int_field(W_DateTime_Time, 'hour'),
+    _minute = make_int_field(W_DateTime_Time, 'minute'),
+    _second = make_int_field(W_DateTime_Time, 'second'),
+    _microsecond = make_int_field(W_DateTime_Time, 'microsecond'),
+    _tzinfo = make_tzinfo_field(W_DateTime_Time),
+    _hashcode = make_int_field(W_DateTime_Time, 'hashcode'),
+    _cmp_time = interp2app(W_DateTime_Time.cmp_time_w),
+    _isoformat_time = interp2app(W_DateTime_Time.isoformat_time_w),
+    )
+W_DateTime_Time.typedef.acceptable_as_base_class = True
+
+W_DateTime_Delta.typedef = TypeDef('pypydatetime_delta',
+    __new__ = interp2app(delta_new),
+    _days = make_int_field(W_DateTime_Delta, 'days'),
+    _seconds = make_int_field(W_DateTime_Delta, 'seconds'),
+    _microseconds = make_int_field(W_DateTime_Delta, 'microseconds'),
+    _hashcode = make_int_field(W_DateTime_Delta, 'hashcode'),
+    _cmp_delta = interp2app(W_DateTime_Delta.cmp_delta_w),
+    __nonzero__ = interp2app(W_DateTime_Delta.nonzero_w),
+    )
+W_DateTime_Delta.typedef.acceptable_as_base_class = True
+
+# ____________________________________________________________
+
+@unwrap_spec(year=int, month=int, day=int)
+def ymd2ord(space, year, month, day):
+    "year, month, day -> ordinal, considering 01-Jan-0001 as day 1."
+    if not 1 <= month <= 12:
+        raise oefmt(space.w_ValueError, "month must be in 1..12")
+    dim = days_in_month(year, month)
+    if not 1 <= day <= dim:
+        raise oefmt(space.w_ValueError, "day must be in 1..%d", dim)
+    return space.newint(ymd_to_ord(year, month, day))
+
+@unwrap_spec(n=int)
+def ord2ymd(space, n):
+    "ordinal -> (year, month, day), considering 01-Jan-0001 as day 1."
+    year, month, day = ord_to_ymd(n)
+    return space.newtuple([space.newint(year), space.newint(month),
+                           space.newint(day)])
+
+@unwrap_spec(year=int, month=int, day=int)
+def normalize_date(space, year, month, day, w_ignore_overflow=None):
+    """Normalize the day and month, raising OverflowError if the year
+    is out of range (unless 'ignore_overflow' is true)."""
+    ignore_overflow = (w_ignore_overflow is not None and
+                       space.is_true(w_ignore_overflow))
+    year, month, day = normalize_ymd(space, year, month, day,
+                                     ignore_overflow)
+    return space.newtuple([space.newint(year), space.newint(month),
+                           space.newint(day)])
+
+@unwrap_spec(year=int, month=int, day=int, hour=int, minute=int, second=int,
+             microsecond=int)
+def normalize_datetime(space, year, month, day, hour, minute, second,
+                       microsecond, w_ignore_overflow=None):
+    """Normalize all the fields, raising OverflowError if the year is out
+    of range (unless 'ignore_overflow' is true)."""
+    ignore_overflow = (w_ignore_overflow is not None and
+                       space.is_true(w_ignore_overflow))
+    second += microsecond // 1000000
+    microsecond = microsecond % 1000000
+    minute += second // 60
+    second = second % 60
+    hour += minute // 60
+    minute = minute % 60
+    day += hour // 24
+    hour = hour % 24
+    year, month, day = normalize_ymd(space, year, month, day,
+                                     ignore_overflow)
+    return space.newtuple([space.newint(year), space.newint(month),
+                           space.newint(day), space.newint(hour),
+                           space.newint(minute), space.newint(second),
+                           space.newint(microsecond)])
 
-W_DateTime_Time = create_class('pypydatetime_time')
-W_DateTime_Date = create_class('pypydatetime_date')
-W_DateTime_Delta = create_class('pypydatetime_delta')
+def new_delta(space, w_type, w_days, w_seconds, w_microseconds, w_normalize):
+    """Build a timedelta of the given type, after normalizing the
+    seconds and microseconds if 'normalize' is true."""
+    try:
+        d = space.int_w(w_days)
+        s = space.int_w(w_seconds)
+        us = space.int_w(w_microseconds)
+    except OperationError as e:
+        if not e.match(space, space.w_OverflowError):
+            raise
+        raise oefmt(space.w_OverflowError,
+                    "days=%s; must have magnitude <= %d",
+                    space.text_w(space.str(w_days)), MAX_DELTA_DAYS)
+    if space.is_true(w_normalize):
+        s += us // 1000000
+        us = us % 1000000
+        d += s // (24 * 3600)
+        s = s % (24 * 3600)
+    if not -MAX_DELTA_DAYS <= d <= MAX_DELTA_DAYS:
+        raise oefmt(space.w_OverflowError,
+                    "days=%d; must have magnitude <= %d",
+                    d, MAX_DELTA_DAYS)
+    self = space.allocate_instance(W_DateTime_Delta, w_type)
+    self.days = d
+    self.seconds = s
+    self.microseconds = us
+    self.hashcode = -1
+    return self
 
+def timestamp_fields(space, w_timestamp, w_utc):
+    """Convert a POSIX timestamp to the tuple (year, month, day, hour,
+    minute, second, microsecond), in local time or in UTC."""
+    from pypy.module.time.interp_time import (c_localtime, c_gmtime,
+                                              _get_error_msg)
+    t_full = space.float_w(w_timestamp)
+    if not isfinite(t_full):
+        raise oefmt(space.w_ValueError,
+                    "timestamp out of range for platform time_t")
+    t_floor = math.floor(t_full)
+    us = int(math.floor((t_full - t_floor) * 1e6 + 0.5))
+    t = rffi.cast(rffi.TIME_T, t_floor)
+    diff = t_floor - rffi.cast(lltype.Float, t)
+    if diff <= -1.0 or diff >= 1.0:
+        raise oefmt(space.w_ValueError,
+                    "timestamp out of range for platform time_t")
+    # If timestamp is less than one microsecond smaller than a full
+    # second, us can be rounded up to 1000000.  In this case, roll
+    # over to seconds.
+    if us == 1000000:
+        t = rffi.cast(rffi.TIME_T, t_floor + 1.0)
+        us = 0
+    t_ref = lltype.malloc(rffi.TIME_TP.TO, 1, flavor='raw')
+    t_ref[0] = t
+    if space.is_true(w_utc):
+        p = c_gmtime(t_ref)
+    else:
+        p = c_localtime(t_ref)
+    lltype.free(t_ref, flavor='raw')
+    if not p:
+        raise OperationError(space.w_ValueError,
+                             space.newtext(_get_error_msg()))
+    second = rffi.getintfield(p, 'c_tm_sec')
+    if second > 59:
+        second = 59     # clamp out leap seconds if the platform has them
+    return space.newtuple([
+        space.newint(rffi.getintfield(p, 'c_tm_year') + 1900),
+        space.newint(rffi.getintfield(p, 'c_tm_mon') + 1),
+        space.newint(rffi.getintfield(p, 'c_tm_mday')),
+        space.newint(rffi.getintfield(p, 'c_tm_hour')),
+        space.newint(rffi.getintfield(p, 'c_tm_min')),
+        space.newint(second),
+        space.newint(us)])
 
+@unwrap_spec(format='text')
+def wrap_strftime(space, w_object, format, w_timetuple):
+    """Call time.strftime() after substituting the %f, %z and %Z escapes
+    of 'format' with the values from 'w_object'."""
+    from pypy.module.time.interp_time import strftime
+    year = space.int_w(space.getitem(w_timetuple, space.newint(0)))
+    if year < 1900:
+        raise oefmt(space.w_ValueError,
+                    "year=%d is before 1900; the datetime strftime() "
+                    "methods require year >= 1900", year)
+    # Don't call utcoffset() or tzname() unless actually needed.
+    freplace = None  # the string to use for %f
+    zreplace = None  # the string to use for %z
+    Zreplace = None  # the string to use for %Z
+    builder = StringBuilder(len(format))
+    i = 0
+    n = len(format)
+    while i < n:
+        ch = format[i]
+        i += 1
+        if ch != '%':
+            builder.append(ch)
+        elif i >= n:
+            builder.append('%')
+        else:
+            ch = format[i]
+            i += 1
+            if ch == 'f':
+                if freplace is None:
+                    w_us = space.findattr(w_object,
+                                          space.newtext('microsecond'))
+                    b = StringBuilder(6)
+                    format_int(b, 0 if w_us is None else space.int_w(w_us),
+                               6)
+                    freplace = b.build()
+                builder.append(freplace)
+            elif ch == 'z':
+                if zreplace is None:
+                    zreplace = ""
+                    w_meth = space.findattr(w_object,
+                                            space.newtext('_utcoffset'))
+                    if w_meth is not None:
+                        w_offset = space.call_function(w_meth)
+                        if not space.is_none(w_offset):
+                            offset = space.int_w(w_offset)
+                            b = StringBuilder(5)
+                            if offset < 0:
+                                offset = -offset
+                                b.append('-')
+                            else:
+                                b.append('+')
+                            format_int(b, offset // 60, 2)
+                            format_int(b, offset % 60, 2)
+                            zreplace = b.build()
+                builder.append(zreplace)
+            elif ch == 'Z':
+                if Zreplace is None:
+                    Zreplace = ""
+                    w_meth = space.findattr(w_object, space.newtext('tzname'))
+                    if w_meth is not None:
+                        w_s = space.call_function(w_meth)
+                        if not space.is_none(w_s):
+                            # strftime is going to have at this: escape %
+                            w_s = space.call_method(w_s, 'replace',
+                                                    space.newtext('%'),
+                                                    space.newtext('%%'))
+                            if not (space.isinstance_w(w_s, space.w_bytes) or
+                                    space.isinstance_w(w_s, space.w_unicode)):
+                                raise oefmt(space.w_TypeError,
+                                            "tzinfo.tzname() must return "
+                                            "None or a string, not '%T'", w_s)
+                            Zreplace = space.text_w(w_s)
+                builder.append(Zreplace)
+            else:
+                builder.append('%')
+                builder.append(ch)
+    return strftime(space, builder.build(), w_timetuple)
@@ -66,6 +66,13 @@ class PyPyDateTime(MixedModule):
         'dateinterop'  : 'interp_pypydatetime.W_DateTime_Date',
         'timeinterop'  : 'interp_pypydatetime.W_DateTime_Time',
         'deltainterop' : 'interp_pypydatetime.W_DateTime_Delta',
+        'ymd2ord'      : 'interp_pypydatetime.ymd2ord',
+        'ord2ymd'      : 'interp_pypydatetime.ord2ymd',
+        'normalize_date'     : 'interp_pypydatetime.normalize_date',
+        'normalize_datetime' : 'interp_pypydatetime.normalize_datetime',
+        'new_delta'          : 'interp_pypydatetime.new_delta',
+        'timestamp_fields'   : 'interp_pypydatetime.timestamp_fields',
+        'wrap_strftime'      : 'interp_pypydatetime.wrap_strftime',
     }
 
 class PyPyBufferable(MixedModule):
@@ -122,6 +129,12 @@ class Module(MixedModule):
         'newmemoryview'             : 'interp_buffer.newmemoryview',
         'utf8content'               : 'interp_magic.utf8content',
         'list_get_physical_size'    : 'interp_magic.list_get_physical_size',
+        'mapdict_cache_report'      : 'interp_magic.mapdict_cache_report',
+        'reset_mapdict_cache_report': 'interp_magic.reset_mapdict_cache_report',
+        'start_line_coverage'       : 'interp_magic.start_line_coverage',
+        'stop_line_coverage'        : 'interp_magic.stop_line_coverage',
+        'get_line_coverage'         : 'interp_magic.get_line_coverage',
+        'reset_line_coverage'       : 'interp_magic.reset_line_coverage',
     }
     if sys.platform == 'win32':
         interpleveldefs['get_console_cp'] = 'interp_magic.get_console_cp'
@@ -146,6 +159,11 @@ class Module(MixedModule):
                                  'interp_magic.reset_method_cache_counter')
             self.extra_interpdef('mapdict_cache_counter',
                                  'interp_magic.mapdict_cache_counter')
+        if self.space.config.objspace.opcodecounter:
+            self.extra_interpdef('opcode_counts',
+                                 'interp_magic.opcode_counts')
+            self.extra_interpdef('reset_opcode_counts',
+                                 'interp_magic.reset_opcode_counts')
         PYC_MAGIC = get_pyc_magic(self.space)
         self.extra_interpdef('PYC_MAGIC', 'space.wrap(%d)' % PYC_MAGIC)
         try:
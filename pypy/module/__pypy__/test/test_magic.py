@@ -84,3 +84,55 @@ def f():
         l = [1, 2]
         l.append(3)
         assert list_get_physical_size(l) >= 3 # should be 6, but untranslated 3
+
+    def test_line_coverage(self):
+        import __pypy__
+        def f(x):
+            if x:
+                y = 1
+            else:
+                y = 2
+            return y
+        f(0)      # not recorded
+        __pypy__.reset_line_coverage()
+        __pypy__.start_line_coverage()
+        try:
+            for i in range(3):
+                f(1)
+        finally:
+            __pypy__.stop_line_coverage()
+        f(0)      # not recorded either
+        coverage = __pypy__.get_line_coverage()
+        lines = coverage[f.__code__.co_filename]
+        first = f.__code__.co_firstlineno
+        for i in [1, 2, 5]:
+            assert first + i in lines
+        assert first + 4 not in lines
+        assert lines == sorted(set(lines))
+        __pypy__.reset_line_coverage()
+        assert __pypy__.get_line_coverage() == {}
+
+
+class AppTestOpcodeCounts:
+    spaceconfig = {"usemodules": ['__pypy__'],
+                   "objspace.opcodecounter": True}
+
+    def test_opcode_counts(self):
+        import __pypy__
+        def f(n):
+            total = 0
+            for i in range(n):
+                total += i
+            return total
+        __pypy__.reset_opcode_counts()
+        f(10)
+        counts = __pypy__.opcode_counts()
+        assert counts[f.__code__]['INPLACE_ADD'] == 10
+        assert counts[f.__code__]['FOR_ITER'] == 11
+        assert counts[f.__code__]['RETURN_VALUE'] == 1
+        f(5)
+        counts = __pypy__.opcode_counts()
+        assert counts[f.__code__]['INPLACE_ADD'] == 15
+        __pypy__.reset_opcode_counts()
+        counts = __pypy__.opcode_counts()
+        assert f.__code__ not in counts
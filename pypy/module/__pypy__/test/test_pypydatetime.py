@@ -0,0 +1,66 @@
+
+class AppTestPyPyDateTime(object):
+    spaceconfig = dict(usemodules=['__pypy__', 'time', 'struct'])
+
+    def test_ordinals(self):
+        from __pypy__._pypydatetime import ymd2ord, ord2ymd
+        assert ymd2ord(1, 1, 1) == 1
+        assert ymd2ord(2000, 3, 1) == 730180
+        for n in [1, 59, 60, 365, 366, 730180, 730179, 3652059]:
+            assert ymd2ord(*ord2ymd(n)) == n
+        assert ord2ymd(0) == (0, 12, 31)
+        raises(ValueError, ymd2ord, 2001, 2, 29)
+        raises(ValueError, ymd2ord, 2001, 13, 1)
+
+    def test_normalize(self):
+        from __pypy__._pypydatetime import normalize_date, normalize_datetime
+        assert normalize_date(2000, 2, 30) == (2000, 3, 1)
+        assert normalize_date(2000, 13, 0) == (2000, 12, 31)
+        assert normalize_date(2000, 1, 400) == (2001, 2, 3)
+        raises(OverflowError, normalize_date, 9999, 12, 32)
+        assert normalize_date(9999, 12, 32, True) == (10000, 1, 1)
+        assert normalize_datetime(2000, 1, 1, 0, 0, -1, 0) == (
+            1999, 12, 31, 23, 59, 59, 0)
+        assert normalize_datetime(2000, 1, 1, 23, 59, 59, 1000000) == (
+            2000, 1, 2, 0, 0, 0, 0)
+
+    def test_fields(self):
+        from __pypy__._pypydatetime import dateinterop, deltainterop
+        class D(dateinterop):
+            __slots__ = ()
+        d = dateinterop.__new__(D, 2017, 5, 6, 7, 8, 9, 10)
+        assert (d._year, d._month, d._day, d._hour, d._minute, d._second,
+                d._microsecond, d._tzinfo, d._hashcode) == (
+                    2017, 5, 6, 7, 8, 9, 10, None, -1)
+        d._hashcode = 42
+        assert d._hashcode == 42
+        assert not hasattr(d, '__dict__')
+        assert d.toordinal() == 736455
+        assert d.weekday() == 5
+        assert d.isoweekday() == 6
+        assert d._isoformat_date() == '2017-05-06'
+        assert d._isoformat_datetime('T') == '2017-05-06T07:08:09.000010'
+        assert d._isoformat_datetime(u' ') == u'2017-05-06 07:08:09.000010'
+        raises(TypeError, d._isoformat_datetime, 'ab')
+        class T(deltainterop):
+            __slots__ = ()
+        assert not T()
+        assert T.__new__(T, 0, 0, 1)
+
+    def test_datetime(self):
+        import datetime
+        d = datetime.datetime(2017, 5, 6, 7, 8, 9, 10)
+        assert d.isoformat() == '2017-05-06T07:08:09.000010'
+        assert str(d) == '2017-05-06 07:08:09.000010'
+        assert d.date().isoformat() == '2017-05-06'
+        assert str(d.time()) == '07:08:09.000010'
+        assert d < d + datetime.timedelta(microseconds=1)
+        assert d.date() > datetime.date(2017, 5, 5)
+        assert (d - datetime.datetime(2017, 5, 5)).seconds == 25689
+        assert d + datetime.timedelta(days=365) == datetime.datetime(
+            2018, 5, 6, 7, 8, 9, 10)
+        assert d.strftime('%Y %f %z%Z|') == '2017 000010 |'
+        t = datetime.datetime.utcfromtimestamp(1000000000.9999996)
+        assert t == datetime.datetime(2001, 9, 9, 1, 46, 41)
+        raises(OverflowError, datetime.timedelta, 10**10)
+        assert datetime.timedelta(0, 86401) == datetime.timedelta(1, 1)
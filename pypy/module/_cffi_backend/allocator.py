@@ -7,17 +7,81 @@ from rpython.rtyper.lltypesystem import lltype, rffi
 from rpython.rlib import rgc
 
 
+# Pooled allocation, used by ffi.new_allocator(pool=True).  The blocks of
+# up to POOL_MAX_SIZE bytes are cut out of chunks of POOL_CHUNK_SIZE bytes,
+# with one size class per multiple of POOL_ALIGN.  A freed block goes into
+# the free list of its size class, linked via its first word.  The chunks
+# are never returned to the system; the memory pressure is added once per
+# chunk instead of once per block.
+
+POOL_ALIGN = 16
+POOL_MAX_SIZE = 512
+POOL_CHUNK_SIZE = 16384
+POOL_NUM_CLASSES = POOL_MAX_SIZE // POOL_ALIGN
+
+def pool_sizeclass(datasize):
+    if datasize <= 0:
+        return 0
+    return (datasize - 1) // POOL_ALIGN
+
+
+class BlockPool(object):
+
+    def __init__(self):
+        self.free_lists = ([lltype.nullptr(rffi.CCHARP.TO)] *
+                           POOL_NUM_CLASSES)
+
+    def malloc(self, sizeclass):
+        block = self.free_lists[sizeclass]
+        if not block:
+            block = self._fill_free_list(sizeclass)
+        self.free_lists[sizeclass] = rffi.cast(rffi.CCHARPP, block)[0]
+        return block
+
+    def free(self, block, sizeclass):
+        # called from light finalizers: must not allocate
+        rffi.cast(rffi.CCHARPP, block)[0] = self.free_lists[sizeclass]
+        self.free_lists[sizeclass] = block
+
+    def _fill_free_list(self, sizeclass):
+        blocksize = (sizeclass + 1) * POOL_ALIGN
+        count = POOL_CHUNK_SIZE // blocksize
+        chunk = lltype.malloc(rffi.CCHARP.TO, count * blocksize,
+                              flavor='raw', track_allocation=False)
+        rgc.add_memory_pressure(count * blocksize)
+        block = lltype.nullptr(rffi.CCHARP.TO)
+        i = count
+        while i > 0:
+            i -= 1
+            nextblock = block
+            block = rffi.ptradd(chunk, i * blocksize)
+            rffi.cast(rffi.CCHARPP, block)[0] = nextblock
+        return block
+
+block_pool = BlockPool()
+
+
 class W_Allocator(W_Root):
     _immutable_ = True
 
-    def __init__(self, ffi, w_alloc, w_free, should_clear_after_alloc):
+    def __init__(self, ffi, w_alloc, w_free, should_clear_after_alloc,
+                 pool=False):
         self.ffi = ffi    # may be None
         self.w_alloc = w_alloc
         self.w_free = w_free
         self.should_clear_after_alloc = should_clear_after_alloc
+        self.pool = pool
 
     def allocate(self, space, datasize, ctype, length=-1):
         from pypy.module._cffi_backend import cdataobj, ctypeptr
+        if self.pool and datasize <= POOL_MAX_SIZE:
+            sizeclass = pool_sizeclass(datasize)
+            ptr = block_pool.malloc(sizeclass)
+            if self.should_clear_after_alloc:
+                rffi.c_memset(rffi.cast(rffi.VOIDP, ptr), 0,
+                              rffi.cast(rffi.SIZE_T, datasize))
+            return cdataobj.W_CDataNewPooled(space, ptr, ctype, length,
+                                             datasize, sizeclass)
         if self.w_alloc is None:
             if self.should_clear_after_alloc:
                 ptr = lltype.malloc(rffi.CCHARP.TO, datasize,
@@ -71,7 +135,8 @@ W_Allocator.typedef = TypeDef(
 W_Allocator.typedef.acceptable_as_base_class = False
 
 
-def new_allocator(ffi, w_alloc, w_free, should_clear_after_alloc):
+def new_allocator(ffi, w_alloc, w_free, should_clear_after_alloc,
+                  pool=False):
     space = ffi.space
     if space.is_none(w_alloc):
         w_alloc = None
@@ -79,7 +144,10 @@ def new_allocator(ffi, w_alloc, w_free, should_clear_after_alloc):
         w_free = None
     if w_alloc is None and w_free is not None:
         raise oefmt(space.w_TypeError, "cannot pass 'free' without 'alloc'")
-    alloc = W_Allocator(ffi, w_alloc, w_free, bool(should_clear_after_alloc))
+    if pool and w_alloc is not None:
+        raise oefmt(space.w_TypeError, "cannot pass 'alloc' with 'pool=True'")
+    alloc = W_Allocator(ffi, w_alloc, w_free, bool(should_clear_after_alloc),
+                        bool(pool))
     return alloc
 
 
@@ -10,7 +10,7 @@ from rpython.rlib.objectmodel import keepalive_until_here, specialize
 from rpython.rtyper.lltypesystem import lltype, rffi
 from rpython.tool.sourcetools import func_with_new_name
 
-from pypy.module._cffi_backend import misc
+from pypy.module._cffi_backend import misc, allocator
 
 
 class W_CData(W_Root):
@@ -587,6 +587,34 @@ class W_CDataNewStd(W_CDataNewOwning):
         return self.datasize
 
 
+class W_CDataNewPooled(W_CDataNewOwning):
+    """Subclass using the pooled allocator, ffi.new_allocator(pool=True)"""
+    _attrs_ = ['datasize', 'sizeclass']
+    # both changed to -1 after being explicitly freed
+
+    def __init__(self, space, cdata, ctype, length, datasize, sizeclass):
+        W_CDataNewOwning.__init__(self, space, cdata, ctype, length)
+        assert datasize >= 0
+        self.datasize = datasize
+        self.sizeclass = sizeclass
+
+    @rgc.must_be_light_finalizer
+    def __del__(self):
+        if self.sizeclass >= 0:
+            allocator.block_pool.free(self._ptr, self.sizeclass)
+
+    def _do_exit(self):
+        if self.sizeclass >= 0:
+            sizeclass = self.sizeclass
+            self.sizeclass = -1
+            self.datasize = -1
+            rgc.may_ignore_finalizer(self)
+            allocator.block_pool.free(self._ptr, sizeclass)
+
+    def get_maximum_buffer_size(self):
+        return self.datasize
+
+
 class W_CDataNewNonStd(W_CDataNewOwning):
     """Subclass using a non-standard allocator"""
     _attrs_ = ['w_raw_cdata', 'w_free']
@@ -456,9 +456,10 @@ pointer to the memory somewhere else, e.g. into another structure."""
 
     @unwrap_spec(w_alloc=WrappedDefault(None),
                  w_free=WrappedDefault(None),
-                 should_clear_after_alloc=int)
+                 should_clear_after_alloc=int,
+                 pool=int)
     def descr_new_allocator(self, w_alloc, w_free,
-                            should_clear_after_alloc=1):
+                            should_clear_after_alloc=1, pool=0):
         """\
 Return a new allocator, i.e. a function that behaves like ffi.new()
 but uses the provided low-level 'alloc' and 'free' functions.
@@ -472,10 +473,15 @@ If both 'alloc' and 'free' are None, the default is used.
 If 'should_clear_after_alloc' is set to False, then the memory
 returned by 'alloc' is assumed to be already cleared (or you are
 fine with garbage); otherwise CFFI will clear it.
+
+If 'pool' is set to True, small objects are allocated from free lists
+of blocks of the same size, which is faster when many short-lived
+objects are created; the blocks are reused, but never returned to the
+system.  'alloc' and 'free' must be None in this case.
         """
         #
         return allocator.new_allocator(self, w_alloc, w_free,
-                                       should_clear_after_alloc)
+                                       should_clear_after_alloc, pool)
 
 
     def descr_new_handle(self, w_arg):
@@ -508,6 +508,46 @@ class AppTestFFIObj:
         alloc5 = ffi.new_allocator(myalloc5)
         raises(MemoryError, alloc5, "int[5]")
 
+    def test_ffi_new_allocator_pool(self):
+        import _cffi_backend as _cffi1_backend
+        ffi = _cffi1_backend.FFI()
+        alloc = ffi.new_allocator(pool=True)
+        p = alloc("int[4]")
+        assert list(p) == [0] * 4
+        p[3] = 42
+        addr = int(ffi.cast("intptr_t", p))
+        ffi.release(p)
+        # the block is reused for an object of the same size class,
+        # and cleared again
+        q = alloc("short[5]", [5])
+        assert int(ffi.cast("intptr_t", q)) == addr
+        assert list(q) == [5, 0, 0, 0, 0]
+        # objects of other size classes come from other blocks
+        r = alloc("char[300]")
+        assert len(r) == 300
+        assert int(ffi.cast("intptr_t", r)) != addr
+        with alloc("char[1000]") as s:     # too big for the pool
+            assert len(s) == 1000
+        #
+        alloc2 = ffi.new_allocator(pool=True, should_clear_after_alloc=False)
+        t = alloc2("int *", 42)
+        assert t[0] == 42
+        raises(TypeError, ffi.new_allocator, lambda n: None, pool=True)
+
+    def test_ffi_new_allocator_pool_release(self):
+        import _cffi_backend as _cffi1_backend
+        import warnings
+        ffi = _cffi1_backend.FFI()
+        alloc = ffi.new_allocator(pool=True)
+        p = alloc("int[4]")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            ffi.buffer(p, 20)       # warns: p owns only 16 bytes
+            assert len(w) == 1
+            ffi.release(p)
+            ffi.buffer(p, 20)       # p gave its block back to the pool
+            assert len(w) == 1
+
     def test_bool_issue228(self):
         import _cffi_backend as _cffi1_backend
         ffi = _cffi1_backend.FFI()
@@ -132,7 +132,8 @@ udir.join('pypy_macros.h').write("/* Will be filled later */\n")
 constant_names = """
 Py_TPFLAGS_READY Py_TPFLAGS_READYING Py_TPFLAGS_HAVE_GETCHARBUFFER
 METH_COEXIST METH_STATIC METH_CLASS Py_TPFLAGS_BASETYPE
-METH_NOARGS METH_VARARGS METH_KEYWORDS METH_O Py_TPFLAGS_HAVE_INPLACEOPS
+METH_NOARGS METH_VARARGS METH_KEYWORDS METH_O METH_FASTCALL
+Py_TPFLAGS_HAVE_INPLACEOPS
 Py_TPFLAGS_HEAPTYPE Py_TPFLAGS_HAVE_CLASS Py_TPFLAGS_HAVE_NEWBUFFER
 Py_LT Py_LE Py_EQ Py_NE Py_GT Py_GE Py_TPFLAGS_CHECKTYPES PyBUF_MAX_NDIM
 PyBUF_FORMAT PyBUF_ND PyBUF_STRIDES PyBUF_WRITABLE PyBUF_READ PyBUF_WRITE
@@ -1168,6 +1169,14 @@ def attach_c_functions(space, eci, prefix):
     state.C._PyPy_int_dealloc = rffi.llexternal(
         mangle_name(prefix, '_Py_int_dealloc'), [PyObject], lltype.Void,
         compilation_info=eci, _nowrapper=True)
+    state.C._PyPy_float_alloc = rffi.llexternal(
+        mangle_name(prefix, '_Py_float_alloc'),
+        [rffi.DOUBLE], PyObject,
+        compilation_info=eci,
+        _nowrapper=True)
+    state.C._PyPy_float_dealloc = rffi.llexternal(
+        mangle_name(prefix, '_Py_float_dealloc'), [PyObject], lltype.Void,
+        compilation_info=eci, _nowrapper=True)
     state.C.PyTuple_New = rffi.llexternal(
         mangle_name(prefix, 'PyTuple_New'),
         [Py_ssize_t], PyObject,
@@ -1546,6 +1555,7 @@ separate_module_files = [source_dir / "varargwrapper.c",
                          source_dir / "object.c",
                          source_dir / "typeobject.c",
                          source_dir / "intobject.c",
+                         source_dir / "floatobject.c",
                          source_dir / "tupleobject.c",
                          ]
 if WIN32:
@@ -1796,6 +1806,7 @@ def make_generic_cpy_call(FT, expect_null):
     from pypy.module.cpyext.pyobject import is_pyobj, make_ref, decref
     from pypy.module.cpyext.pyobject import get_w_obj_and_decref
     from pypy.module.cpyext.pyerrors import PyErr_Occurred
+    from pypy.module.cpyext.listobject import release_list_views
     unrolling_arg_types = unrolling_iterable(enumerate(FT.ARGS))
     RESULT_TYPE = FT.RESULT
 
@@ -1837,10 +1848,15 @@ def make_generic_cpy_call(FT, expect_null):
             preexist_error = PyErr_Occurred(space)
         else:
             preexist_error = "this is not used"
+        ec = space.getexecutioncontext()
+        ec.cpyext_call_depth += 1
         try:
             # Call the function
             result = call_external_function(func, *boxed_args)
         finally:
+            ec.cpyext_call_depth -= 1
+            if ec.cpyext_call_depth == 0:
+                release_list_views(ec)
             for i, ARG in unrolling_arg_types:
                 # note that this loop is nicely unrolled statically by RPython
                 _pyobj = to_decref[i]
@@ -0,0 +1,143 @@
+/* Extension module used by callbench.py to measure the cost of calling
+   C code through cpyext.  All the functions are as trivial as possible,
+   so that what is measured is the call and conversion overhead. */
+
+#include "Python.h"
+
+#ifndef METH_FASTCALL
+#  define METH_FASTCALL 0    /* not supported, e.g. on CPython 2 */
+#endif
+
+/* per-call cost */
+
+static PyObject *
+noargs(PyObject *self, PyObject *args)
+{
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+onearg(PyObject *self, PyObject *arg)
+{
+    Py_RETURN_NONE;
+}
+
+/* per-argument cost */
+
+static PyObject *
+varargs(PyObject *self, PyObject *args)
+{
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+varargs_kw(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    Py_RETURN_NONE;
+}
+
+#if METH_FASTCALL
+static PyObject *
+fastcall(PyObject *self, PyObject **args, Py_ssize_t nargs)
+{
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+fastcall_kw(PyObject *self, PyObject **args, Py_ssize_t nargs,
+            PyObject *kwnames)
+{
+    Py_RETURN_NONE;
+}
+#endif
+
+/* per-conversion cost */
+
+static PyObject *
+identity(PyObject *self, PyObject *arg)
+{
+    Py_INCREF(arg);
+    return arg;
+}
+
+static PyObject *
+int_roundtrip(PyObject *self, PyObject *arg)
+{
+    long x = PyInt_AsLong(arg);
+    if (x == -1 && PyErr_Occurred())
+        return NULL;
+    return PyInt_FromLong(x + 1);
+}
+
+static PyObject *
+float_roundtrip(PyObject *self, PyObject *arg)
+{
+    double x = PyFloat_AsDouble(arg);
+    if (x == -1.0 && PyErr_Occurred())
+        return NULL;
+    return PyFloat_FromDouble(x + 1.0);
+}
+
+static PyObject *
+str_roundtrip(PyObject *self, PyObject *arg)
+{
+    char *s;
+    Py_ssize_t size;
+    if (PyString_AsStringAndSize(arg, &s, &size) < 0)
+        return NULL;
+    return PyString_FromStringAndSize(s, size);
+}
+
+static PyObject *
+tuple_items(PyObject *self, PyObject *arg)
+{
+    Py_ssize_t i, n;
+    if (!PyTuple_Check(arg)) {
+        PyErr_SetString(PyExc_TypeError, "expected a tuple");
+        return NULL;
+    }
+    n = PyTuple_GET_SIZE(arg);
+    for (i = 0; i < n; i++)
+        (void)PyTuple_GET_ITEM(arg, i);
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+list_items(PyObject *self, PyObject *arg)
+{
+    Py_ssize_t i, n;
+    if (!PyList_Check(arg)) {
+        PyErr_SetString(PyExc_TypeError, "expected a list");
+        return NULL;
+    }
+    n = PyList_GET_SIZE(arg);
+    for (i = 0; i < n; i++)
+        (void)PyList_GET_ITEM(arg, i);
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef methods[] = {
+    {"noargs", noargs, METH_NOARGS, NULL},
+    {"onearg", onearg, METH_O, NULL},
+    {"varargs", varargs, METH_VARARGS, NULL},
+    {"varargs_kw", (PyCFunction)varargs_kw, METH_VARARGS | METH_KEYWORDS,
+     NULL},
+#if METH_FASTCALL
+    {"fastcall", (PyCFunction)fastcall, METH_FASTCALL, NULL},
+    {"fastcall_kw", (PyCFunction)fastcall_kw, METH_FASTCALL | METH_KEYWORDS,
+     NULL},
+#endif
+    {"identity", identity, METH_O, NULL},
+    {"int_roundtrip", int_roundtrip, METH_O, NULL},
+    {"float_roundtrip", float_roundtrip, METH_O, NULL},
+    {"str_roundtrip", str_roundtrip, METH_O, NULL},
+    {"tuple_items", tuple_items, METH_O, NULL},
+    {"list_items", list_items, METH_O, NULL},
+    {NULL, NULL, 0, NULL}
+};
+
+PyMODINIT_FUNC
+init_callbench(void)
+{
+    Py_InitModule("_callbench", methods);
+}
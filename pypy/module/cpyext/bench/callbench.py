@@ -0,0 +1,143 @@
+"""
+Micro-benchmarks of the cost of calling C extension functions: per call,
+per argument, per calling convention and per object conversion.
+
+Usage:
+
+    pypy callbench.py [-n LOOPS] [--save FILE] [--compare FILE]
+
+The _callbench extension is compiled from callbench.c on first use.
+Each benchmark prints the time per call in nanoseconds.  With --save, the
+results are written to FILE as JSON; with --compare, they are compared
+with the ones from a previous run and the benchmarks that became slower
+by more than 10% are reported, and make the script exit with status 1.
+It also runs on CPython, which gives a baseline to compare against.
+"""
+
+import sys
+import os
+import json
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+THRESHOLD = 1.10
+
+
+def build_extension():
+    from distutils.core import Distribution, Extension
+    from distutils.command.build_ext import build_ext
+    import platform, tempfile
+    build_dir = os.path.join(tempfile.gettempdir(), 'callbench-%s' % (
+        platform.python_implementation(),))
+    dist = Distribution({'ext_modules': [
+        Extension('_callbench', [os.path.join(HERE, 'callbench.c')])]})
+    cmd = build_ext(dist)
+    cmd.build_lib = build_dir
+    cmd.build_temp = build_dir
+    cmd.ensure_finalized()
+    cmd.run()
+    sys.path.insert(0, build_dir)
+
+
+def get_benchmarks(mod):
+    """Return a list of (name, function, args, kwargs)."""
+    obj = object()
+    args3 = (1, 2.5, 'x')
+    benchmarks = [
+        # per call
+        ('noargs', mod.noargs, (), {}),
+        ('METH_O', mod.onearg, (obj,), {}),
+        # per argument
+        ('varargs-0', mod.varargs, (), {}),
+        ('varargs-1', mod.varargs, (obj,), {}),
+        ('varargs-3', mod.varargs, args3, {}),
+        ('varargs-8', mod.varargs, args3 + args3 + (obj, obj), {}),
+        ('keywords-1+2', mod.varargs_kw, (obj,), {'a': 1, 'b': 2}),
+    ]
+    if hasattr(mod, 'fastcall'):
+        benchmarks += [
+            ('fastcall-0', mod.fastcall, (), {}),
+            ('fastcall-1', mod.fastcall, (obj,), {}),
+            ('fastcall-3', mod.fastcall, args3, {}),
+            ('fastcall-8', mod.fastcall, args3 + args3 + (obj, obj), {}),
+            ('fastcall-keywords-1+2', mod.fastcall_kw, (obj,),
+             {'a': 1, 'b': 2}),
+        ]
+    benchmarks += [
+        # per conversion
+        ('identity-object', mod.identity, (obj,), {}),
+        ('identity-int', mod.identity, (42,), {}),
+        ('identity-float', mod.identity, (4.2,), {}),
+        ('int-roundtrip', mod.int_roundtrip, (42,), {}),
+        ('int-roundtrip-large', mod.int_roundtrip, (1 << 40,), {}),
+        ('float-roundtrip', mod.float_roundtrip, (4.2,), {}),
+        ('str-roundtrip', mod.str_roundtrip, ('hello world',), {}),
+        ('tuple-10-items', mod.tuple_items, (tuple(range(10)),), {}),
+        ('list-10-ints', mod.list_items, (list(range(10)),), {}),
+        ('list-10-objects', mod.list_items, ([obj] * 10,), {}),
+    ]
+    return benchmarks
+
+
+def run_one(func, args, kwargs, loops):
+    # the arguments are given the shape of a call site with a constant
+    # number of arguments, as in real code
+    if kwargs:
+        def loop(n):
+            for i in xrange(n):
+                func(*args, **kwargs)
+    else:
+        def loop(n):
+            for i in xrange(n):
+                func(*args)
+    loop(loops // 10)     # warm-up, e.g. for the JIT
+    best = None
+    for repeat in range(3):
+        t0 = time.time()
+        loop(loops)
+        t1 = time.time()
+        if best is None or t1 - t0 < best:
+            best = t1 - t0
+    return best * 1e9 / loops
+
+
+def main(argv):
+    import getopt
+    options, args = getopt.getopt(argv, 'n:', ['save=', 'compare='])
+    loops = 1000000
+    save = compare = None
+    for key, value in options:
+        if key == '-n':
+            loops = int(value)
+        elif key == '--save':
+            save = value
+        elif key == '--compare':
+            compare = value
+    try:
+        import _callbench
+    except ImportError:
+        build_extension()
+        import _callbench
+    results = {}
+    for name, func, fargs, fkwargs in get_benchmarks(_callbench):
+        results[name] = run_one(func, fargs, fkwargs, loops)
+        print '%-24s %10.1f ns' % (name, results[name])
+    if save:
+        with open(save, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+    if compare:
+        with open(compare) as f:
+            old = json.load(f)
+        slower = []
+        for name in sorted(results):
+            if name in old and results[name] > old[name] * THRESHOLD:
+                slower.append(name)
+                print 'SLOWER: %-24s %10.1f ns -> %10.1f ns' % (
+                    name, old[name], results[name])
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -62,6 +62,8 @@ def PyEval_GetGlobals(space):
 @cpython_api([], PyFrameObject, error=CANNOT_FAIL, result_borrowed=True)
 def PyEval_GetFrame(space):
     caller = space.getexecutioncontext().gettopframe_nohidden()
+    if caller is not None:
+        caller.mark_as_escaped()
     return caller    # borrowed ref, may be null
 
 @cpython_api([PyObject, PyObject, PyObject], PyObject)
@@ -35,6 +35,9 @@ typedef struct {
 		 _PyPy_Type_FastSubclass(Py_TYPE(op), Py_TPPYPYFLAGS_FLOAT_SUBCLASS)
 #define PyFloat_CheckExact(op) (Py_TYPE(op) == &PyFloat_Type)
 
+PyAPI_FUNC(PyObject *) _PyPy_float_alloc(double);
+PyAPI_FUNC(void) _PyPy_float_dealloc(PyObject *);
+
 
 #ifdef __cplusplus
 }
@@ -28,6 +28,15 @@ extern "C" {
 
 #define METH_COEXIST   0x0040
 
+/* PyPy extension, with the same value and calling convention as in
+   CPython 3.7: the function receives the arguments as a C array of
+   borrowed references, without building a tuple.  It has the
+   signature of _PyCFunctionFast, or _PyCFunctionFastWithKeywords if
+   combined with METH_KEYWORDS; in the latter case, the values of the
+   keyword arguments follow the positional ones in the array and their
+   names are passed as a tuple (or NULL if there are none). */
+#define METH_FASTCALL  0x0080
+
 #define PyCFunction_New(ml, self) PyCFunction_NewEx((ml), (self), NULL)
 
 /* Macros for direct access to these values. Type checks are *not*
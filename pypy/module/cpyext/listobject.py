@@ -4,8 +4,10 @@ from rpython.rtyper.lltypesystem import rffi, lltype
 from pypy.module.cpyext.api import (cpython_api, CANNOT_FAIL, Py_ssize_t,
                                     build_type_checkers_flags)
 from pypy.module.cpyext.pyerrors import PyErr_BadInternalCall
-from pypy.module.cpyext.pyobject import decref, incref, PyObject, make_ref
-from pypy.objspace.std.listobject import W_ListObject
+from pypy.module.cpyext.pyobject import (
+    decref, incref, PyObject, make_ref, as_pyobj)
+from pypy.objspace.std.listobject import (
+    W_ListObject, ObjectListStrategy, EmptyListStrategy)
 from pypy.interpreter.error import oefmt
 
 
@@ -30,6 +32,104 @@ def get_list_storage(space, w_list):
     w_list.convert_to_cpy_strategy(space)
     return CPyListStrategy.unerase(w_list.lstorage)
 
+
+class BorrowedListView(object):
+    """A read-only view, as an array of PyObject*, of a list whose
+    strategy stores the items unboxed (ints, floats, strings...).  It lets
+    C code read such a list without switching it for good to the
+    CPyListStrategy.  The PyObject* are created lazily; they are borrowed
+    references to the W_Roots kept alive by the view, and they stay valid
+    until the end of the outermost call into C, which releases the view.
+    """
+    def __init__(self, w_list):
+        from pypy.module.cpyext.sequence import PyObjectList
+        self.w_list = w_list
+        self.length = w_list.length()
+        self.items_w = [None] * self.length
+        self.elems = lltype.malloc(PyObjectList.TO, self.length,
+                                   flavor='raw', zero=True)
+
+    def getitem(self, space, index, views):
+        w_item = self.w_list.getitem(index)
+        w_old = self.items_w[index]
+        if w_old is None or not space.is_w(w_old, w_item):
+            # the list was changed in the meantime: the PyObject* given
+            # out for the old item must stay valid until the release
+            if w_old is not None:
+                views.retired_w.append(w_old)
+            self.items_w[index] = w_item
+            self.elems[index] = as_pyobj(space, w_item)
+        return self.elems[index]
+
+    def getitems(self, space, views):
+        for i in range(self.length):
+            self.getitem(space, i, views)
+        return self.elems
+
+    def release(self):
+        lltype.free(self.elems, flavor='raw')
+        self.items_w = []
+
+
+class BorrowedListViews(object):
+    """The BorrowedListViews of an ExecutionContext."""
+    def __init__(self):
+        self.views = {}
+        self.retired = []
+        self.retired_w = []
+
+    def get(self, w_list):
+        view = self.views.get(w_list, None)
+        if view is None or view.length != w_list.length():
+            if view is not None:
+                self.retired.append(view)
+            view = BorrowedListView(w_list)
+            self.views[w_list] = view
+        return view
+
+    def release(self):
+        for view in self.views.values():
+            view.release()
+        for view in self.retired:
+            view.release()
+        self.views.clear()
+        self.retired = []
+        self.retired_w = []
+
+def get_list_view(space, w_list):
+    """Return the BorrowedListView to use to read the items of w_list
+    from C, or None if the list should be switched to the CPyListStrategy
+    instead: if its items are already W_Roots, or if we are not inside a
+    call to C code, which would release the view."""
+    from pypy.module.cpyext.sequence import CPyListStrategy
+    strategy = w_list.strategy
+    if (strategy is space.fromcache(CPyListStrategy) or
+            strategy is space.fromcache(ObjectListStrategy) or
+            isinstance(strategy, EmptyListStrategy)):
+        return None
+    ec = space.getexecutioncontext()
+    if ec.cpyext_call_depth == 0:
+        return None
+    views = ec.cpyext_list_views
+    if views is None:
+        views = BorrowedListViews()
+        ec.cpyext_list_views = views
+    return views
+
+def release_list_views(ec):
+    """Called at the end of the outermost call to C code."""
+    views = ec.cpyext_list_views
+    if views is not None:
+        ec.cpyext_list_views = None
+        views.release()
+
+def list_getitem_borrowed(space, w_list, index):
+    views = get_list_view(space, w_list)
+    if views is None:
+        storage = get_list_storage(space, w_list)
+        return storage._elems[index]
+    return views.get(w_list).getitem(space, index, views)
+
 @cpython_api([rffi.VOIDP, Py_ssize_t, PyObject], lltype.Void, error=CANNOT_FAIL)
 def PyList_SET_ITEM(space, w_list, index, py_item):
     """Form of PyList_SetItem() without error checking. This is normally
@@ -67,9 +167,8 @@ def PyList_SetItem(space, w_list, index, py_item):
 @cpython_api([rffi.VOIDP, Py_ssize_t], PyObject, result_is_ll=True)
 def PyList_GET_ITEM(space, w_list, index):
     assert isinstance(w_list, W_ListObject)
-    storage = get_list_storage(space, w_list)
     assert 0 <= index < w_list.length()
-    return storage._elems[index]     # borrowed ref
+    return list_getitem_borrowed(space, w_list, index)     # borrowed ref
 
 @cpython_api([PyObject, Py_ssize_t], PyObject, result_is_ll=True)
 def PyList_GetItem(space, w_list, index):
@@ -81,8 +180,7 @@ def PyList_GetItem(space, w_list, index):
         PyErr_BadInternalCall(space)
     if index < 0 or index >= w_list.length():
         raise oefmt(space.w_IndexError, "list index out of range")
-    storage = get_list_storage(space, w_list)
-    return storage._elems[index]     # borrowed ref
+    return list_getitem_borrowed(space, w_list, index)     # borrowed ref
 
 
 @cpython_api([PyObject, PyObject], rffi.INT_real, error=-1)
@@ -1,5 +1,6 @@
 from rpython.rtyper.lltypesystem import lltype, rffi
 from rpython.rlib import jit
+from rpython.rlib.objectmodel import keepalive_until_here
 
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
@@ -9,8 +10,9 @@ from pypy.interpreter.typedef import (
     GetSetProperty, TypeDef, interp_attrproperty, interp_attrproperty_w)
 from pypy.objspace.std.typeobject import W_TypeObject
 from pypy.module.cpyext.api import (
-    CONST_STRING, METH_CLASS, METH_COEXIST, METH_KEYWORDS, METH_NOARGS, METH_O,
-    METH_STATIC, METH_VARARGS, PyObject, bootstrap_function,
+    CONST_STRING, METH_CLASS, METH_COEXIST, METH_FASTCALL, METH_KEYWORDS,
+    METH_NOARGS, METH_O, METH_STATIC, METH_VARARGS, PyObject, PyObjectP,
+    bootstrap_function,
     cpython_api, generic_cpy_call, CANNOT_FAIL, slot_function, cts,
     build_type_checkers)
 from pypy.module.cpyext.pyobject import (
@@ -21,6 +23,8 @@ from pypy.module.cpyext.tupleobject import tuple_from_args_w
 PyMethodDef = cts.gettype('PyMethodDef')
 PyCFunction = cts.gettype('PyCFunction')
 PyCFunctionKwArgs = cts.gettype('PyCFunctionWithKeywords')
+PyCFunctionFast = cts.gettype('_PyCFunctionFast')
+PyCFunctionFastKwArgs = cts.gettype('_PyCFunctionFastWithKeywords')
 PyCFunctionObject = cts.gettype('PyCFunctionObject*')
 
 @bootstrap_function
@@ -76,7 +80,11 @@ class W_PyCFunctionObject(W_Root):
         if not flags & METH_KEYWORDS and __args__.keywords:
             raise oefmt(space.w_TypeError,
                         "%s() takes no keyword arguments", self.name)
-        if flags & METH_KEYWORDS:
+        if flags & METH_FASTCALL:
+            if flags & METH_KEYWORDS:
+                return self.call_fastcall_keywords(space, w_self, __args__)
+            return self.call_fastcall(space, w_self, __args__)
+        elif flags & METH_KEYWORDS:
             return self.call_keywords(space, w_self, __args__)
         elif flags & METH_NOARGS:
             if length == 0:
@@ -121,6 +129,47 @@ class W_PyCFunctionObject(W_Root):
         finally:
             decref(space, py_args)
 
+    def call_fastcall(self, space, w_self, __args__):
+        func = rffi.cast(PyCFunctionFast, self.ml.c_ml_meth)
+        args_w = __args__.arguments_w
+        length = len(args_w)
+        # the arguments are passed as borrowed references: unlike
+        # call_varargs(), this builds no tuple and does no incref/decref
+        py_args = lltype.malloc(PyObjectP.TO, length, flavor='raw')
+        try:
+            for i in range(length):
+                py_args[i] = as_pyobj(space, args_w[i])
+            return generic_cpy_call(space, func, w_self, py_args, length)
+        finally:
+            lltype.free(py_args, flavor='raw')
+            keepalive_until_here(args_w)
+
+    def call_fastcall_keywords(self, space, w_self, __args__):
+        func = rffi.cast(PyCFunctionFastKwArgs, self.ml.c_ml_meth)
+        args_w = __args__.arguments_w
+        length = len(args_w)
+        keywords = __args__.keywords
+        keywords_w = __args__.keywords_w
+        w_kwnames = None
+        nkeywords = 0
+        if keywords:
+            nkeywords = len(keywords)
+            names_w = [space.newtext(key) for key in keywords]
+            w_kwnames = space.newtuple(names_w)
+        py_args = lltype.malloc(PyObjectP.TO, length + nkeywords,
+                                flavor='raw')
+        try:
+            for i in range(length):
+                py_args[i] = as_pyobj(space, args_w[i])
+            for i in range(nkeywords):
+                py_args[length + i] = as_pyobj(space, keywords_w[i])
+            return generic_cpy_call(space, func, w_self, py_args, length,
+                                    w_kwnames)
+        finally:
+            lltype.free(py_args, flavor='raw')
+            keepalive_until_here(args_w)
+            keepalive_until_here(keywords_w)
+
     def call_oldargs(self, space, w_self, __args__):
         func = self.ml.c_ml_meth
         length = len(__args__.arguments_w)
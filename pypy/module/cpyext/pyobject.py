@@ -12,6 +12,7 @@ from pypy.module.cpyext.state import State
 from pypy.objspace.std.typeobject import W_TypeObject
 from pypy.objspace.std.noneobject import W_NoneObject
 from pypy.objspace.std.boolobject import W_BoolObject
+from pypy.objspace.std.intobject import W_IntObject
 from pypy.objspace.std.objectobject import W_ObjectObject
 from rpython.rlib.objectmodel import specialize, we_are_translated
 from rpython.rlib.objectmodel import keepalive_until_here
@@ -301,6 +302,9 @@ def as_pyobj(space, w_obj, w_userdata=None, immortal=False):
     if w_obj is not None:
         py_obj = w_obj._cpyext_as_pyobj(space)
         if not py_obj:
+            if type(w_obj) is W_IntObject and is_small_int(w_obj.intval):
+                return space.fromcache(SmallIntMirrors).get(space,
+                                                            w_obj.intval)
             py_obj = create_ref(space, w_obj, w_userdata, immortal=immortal)
         #
         # Try to crash here, instead of randomly, if we don't keep w_obj alive
@@ -312,6 +316,33 @@ def as_pyobj(space, w_obj, w_userdata=None, immortal=False):
         return lltype.nullptr(PyObject.TO)
 as_pyobj._always_inline_ = 'try'
 
+NSMALLNEGINTS = 5
+NSMALLPOSINTS = 257
+
+def is_small_int(intval):
+    return -NSMALLNEGINTS <= intval < NSMALLPOSINTS
+
+class SmallIntMirrors(object):
+    """The PyIntObjects of the small ints, like CPython's small_ints array.
+    They are created on demand and then shared by all the W_IntObjects with
+    the same value, instead of allocating a new PyIntObject for each of
+    them.  They are never freed.
+    """
+    def __init__(self, space):
+        self.mirrors = [lltype.nullptr(PyObject.TO)] * (
+            NSMALLNEGINTS + NSMALLPOSINTS)
+
+    def get(self, space, intval):
+        index = intval + NSMALLNEGINTS
+        py_obj = self.mirrors[index]
+        if not py_obj:
+            py_obj = create_ref(space, W_IntObject(intval))
+            # this reference is never released: it keeps the W_IntObject
+            # alive, and so the PyIntObject too
+            py_obj.c_ob_refcnt += 1
+            self.mirrors[index] = py_obj
+        return py_obj
+
 def pyobj_has_w_obj(pyobj):
     w_obj = rawrefcount.to_obj(W_Root, pyobj)
     return w_obj is not None and w_obj is not w_marker_deallocating
@@ -359,8 +390,12 @@ def make_ref(space, w_obj, w_userdata=None, immortal=False):
     """
     assert not is_pyobj(w_obj)
     if w_obj is not None and space.type(w_obj) is space.w_int:
-        state = space.fromcache(State)
         intval = space.int_w(w_obj)
+        if is_small_int(intval):
+            py_obj = space.fromcache(SmallIntMirrors).get(space, intval)
+            incref(space, py_obj)
+            return py_obj
+        state = space.fromcache(State)
         return state.ccall("PyInt_FromLong", intval)
     return get_pyobj_and_incref(space, w_obj, w_userdata, immortal=False)
 
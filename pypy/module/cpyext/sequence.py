@@ -113,9 +113,14 @@ def PySequence_Fast_ITEMS(space, py_obj):
         py_tuple = rffi.cast(PyTupleObject, py_obj)
         return rffi.cast(PyObjectP, py_tuple.c_ob_item)
     else:
-        from pypy.module.cpyext.listobject import get_list_storage
+        from pypy.module.cpyext.listobject import (
+            get_list_storage, get_list_view)
         w_obj = from_ref(space, py_obj)
         assert isinstance(w_obj, W_ListObject)
+        views = get_list_view(space, w_obj)
+        if views is not None:
+            elems = views.get(w_obj).getitems(space, views)
+            return rffi.cast(PyObjectP, elems)
         storage = get_list_storage(space, w_obj)
         return rffi.cast(PyObjectP, storage._elems)
 
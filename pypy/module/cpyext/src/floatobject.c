@@ -0,0 +1,99 @@
+
+/* Float object allocation -- copied&adapted from CPython
+
+   The PyFloatObjects that mirror the W_FloatObjects passed to C code are
+   allocated from a dedicated free list, like the ints in intobject.c:
+   a program that passes many floats to an extension would otherwise
+   malloc() and free() a small block for each of them.
+
+   block_list is a singly-linked list of all PyFloatBlocks ever allocated,
+   linked via their next members.  PyFloatBlocks are never returned to the
+   system.
+
+   free_list is a singly-linked list of available PyFloatObjects, linked
+   via abuse of their ob_type members.
+*/
+
+#include "Python.h"
+
+#define BLOCK_SIZE      1000    /* 1K less typical malloc overhead */
+#define BHEAD_SIZE      8       /* Enough for a 64-bit pointer */
+#define N_FLOATOBJECTS  ((BLOCK_SIZE - BHEAD_SIZE) / sizeof(PyFloatObject))
+
+struct _floatblock {
+    struct _floatblock *next;
+    PyFloatObject objects[N_FLOATOBJECTS];
+};
+
+typedef struct _floatblock PyFloatBlock;
+
+static PyFloatBlock *block_list = NULL;
+static PyFloatObject *free_list = NULL;
+
+static PyFloatObject *
+fill_free_list(void)
+{
+    PyFloatObject *p, *q;
+    /* Python's object allocator isn't appropriate for large blocks. */
+    p = (PyFloatObject *) PyMem_MALLOC(sizeof(PyFloatBlock));
+    if (p == NULL)
+        return (PyFloatObject *) PyErr_NoMemory();
+    ((PyFloatBlock *)p)->next = block_list;
+    block_list = (PyFloatBlock *)p;
+    p = &((PyFloatBlock *)p)->objects[0];
+    q = p + N_FLOATOBJECTS;
+    while (--q > p)
+        Py_TYPE(q) = (struct _typeobject *)(q-1);
+    Py_TYPE(q) = NULL;
+    return p + N_FLOATOBJECTS - 1;
+}
+
+/* this is the allocation part of CPython's PyFloat_FromDouble */
+#ifdef CPYEXT_TESTS
+#define _Py_float_alloc _cpyexttest_float_alloc
+#ifdef __GNUC__
+__attribute__((visibility("default")))
+#else
+__declspec(dllexport)
+#endif
+#else  /* CPYEXT_TESTS */
+#define _Py_float_alloc _PyPy_float_alloc
+#endif  /* CPYEXT_TESTS */
+PyObject *
+_Py_float_alloc(double fval)
+{
+    register PyFloatObject *op;
+    if (free_list == NULL) {
+        if ((free_list = fill_free_list()) == NULL)
+            return NULL;
+    }
+    /* Inline PyObject_New */
+    op = free_list;
+    free_list = (PyFloatObject *)Py_TYPE(op);
+    (void)PyObject_INIT(op, &PyFloat_Type);
+    op->ob_fval = fval;
+    return (PyObject *) op;
+}
+
+/* this is CPython's float_dealloc */
+#ifdef CPYEXT_TESTS
+#define _Py_float_dealloc _cpyexttest_float_dealloc
+#ifdef __GNUC__
+__attribute__((visibility("default")))
+#else
+__declspec(dllexport)
+#endif
+#else  /* CPYEXT_TESTS */
+#define _Py_float_dealloc _PyPy_float_dealloc
+#endif  /* CPYEXT_TESTS */
+void
+_Py_float_dealloc(PyObject *obj)
+{
+    PyFloatObject *op = (PyFloatObject *)obj;
+    if (PyFloat_CheckExact(op)) {
+        Py_TYPE(op) = (struct _typeobject *)free_list;
+        free_list = op;
+    }
+    else
+        Py_TYPE(op)->tp_free((PyObject *)op);
+}
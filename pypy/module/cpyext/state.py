@@ -12,6 +12,10 @@ import sys
 # Keep track of exceptions raised in cpyext for a particular execution
 # context.
 ExecutionContext.cpyext_operror = None
+# The number of nested calls to C code, and the BorrowedListViews to
+# release when the outermost one returns: see listobject.py.
+ExecutionContext.cpyext_call_depth = 0
+ExecutionContext.cpyext_list_views = None
 
 
 class State:
@@ -5,7 +5,9 @@ from pypy.module.cpyext.test.test_cpyext import AppTestCpythonExtensionBase
 from rpython.rtyper.lltypesystem import rffi
 from pypy.module.cpyext.floatobject import (
     PyFloat_FromDouble, PyFloat_AsDouble, PyFloat_AS_DOUBLE, PyNumber_Float,
-    _PyFloat_Unpack4, _PyFloat_Unpack8)
+    _PyFloat_Unpack4, _PyFloat_Unpack8, PyFloatObject)
+from pypy.module.cpyext.pyobject import decref, as_pyobj
+from pypy.module.cpyext.state import State
 
 class TestFloatObject(BaseApiTest):
     def test_floatobject(self, space):
@@ -15,6 +17,20 @@ class TestFloatObject(BaseApiTest):
         with pytest.raises(OperationError):
             PyFloat_AsDouble(space, space.w_None)
 
+    def test_freelist_direct(self, space):
+        state = space.fromcache(State)
+        p_x = state.C._PyPy_float_alloc(1.5)
+        decref(space, p_x)
+        p_y = state.C._PyPy_float_alloc(2.5)
+        # check that the address is the same, i.e. that the freelist did its
+        # job
+        assert p_x == p_y
+        decref(space, p_y)
+
+    def test_as_pyobj(self, space):
+        p_x = as_pyobj(space, space.newfloat(3.25))
+        assert rffi.cast(PyFloatObject, p_x).c_ob_fval == 3.25
+
     def test_coerce(self, space):
         assert space.type(PyNumber_Float(space, space.wrap(3))) is space.w_float
         assert space.type(PyNumber_Float(space, space.wrap("3"))) is space.w_float
@@ -4,8 +4,8 @@ from pypy.module.cpyext.intobject import (
     PyInt_Check, PyInt_AsLong, PyInt_AS_LONG,
     PyInt_AsUnsignedLong, PyInt_AsUnsignedLongMask,
     PyInt_AsUnsignedLongLongMask)
-from pypy.module.cpyext.pyobject import (decref, make_ref,
-                                         get_w_obj_and_decref)
+from pypy.module.cpyext.pyobject import (decref, make_ref, as_pyobj,
+                                         from_ref, get_w_obj_and_decref)
 from pypy.module.cpyext.state import State
 import sys
 
@@ -81,6 +81,20 @@ class TestIntObject(BaseApiTest):
         assert p_x != p_y
         decref(space, p_y)
 
+    def test_small_int_mirrors(self, space):
+        p_x = as_pyobj(space, space.newint(42))
+        p_y = make_ref(space, space.newint(42))
+        # all the small ints with the same value share the same PyObject
+        assert p_x == p_y
+        decref(space, p_y)
+        assert as_pyobj(space, space.newint(42)) == p_x
+        assert space.int_w(from_ref(space, p_x)) == 42
+        assert as_pyobj(space, space.newint(-5)) != p_x
+        # but not the other ints
+        w_x = space.newint(12345678)
+        w_y = space.newint(12345678)
+        assert as_pyobj(space, w_x) != as_pyobj(space, w_y)
+
     def test_coerce(self, space):
         w_obj = space.appexec([], """():
             class Coerce(object):
@@ -292,3 +292,57 @@ class AppTestListObject(AppTestCpythonExtensionBase):
                 return PyLong_FromSsize_t(0);
              """)])
         assert module.test_refcount_diff(["first"], ["second"]) == 0
+
+    def test_read_unboxed_list(self):
+        module = self.import_extension('foo', [
+             ("sum_items", "METH_O",
+             """
+                Py_ssize_t i, n = PyList_GET_SIZE(args);
+                PyObject **items = PySequence_Fast_ITEMS(args);
+                double x, total = 0.0;
+                for (i = 0; i < n; i++) {
+                    PyObject *item = PyList_GET_ITEM(args, i);
+                    if (item != PyList_GetItem(args, i) || item != items[i]) {
+                        PyErr_SetString(PyExc_AssertionError,
+                                        "different PyObject* for an item");
+                        return NULL;
+                    }
+                    x = PyFloat_AsDouble(item);
+                    if (x == -1.0 && PyErr_Occurred())
+                        return NULL;
+                    total += x;
+                }
+                return PyFloat_FromDouble(total);
+             """),
+             ("set_first", "METH_VARARGS",
+             """
+                PyObject *lst = PyTuple_GetItem(args, 0);
+                PyObject *item = PyTuple_GetItem(args, 1);
+                PyObject *old = PyList_GET_ITEM(lst, 0);
+                Py_INCREF(old);
+                Py_INCREF(item);
+                PyList_SetItem(lst, 0, item);
+                if (PyList_GET_ITEM(lst, 0) != item) {
+                    PyErr_SetString(PyExc_AssertionError, "SetItem() error?");
+                    return NULL;
+                }
+                return old;
+             """)])
+        import sys
+        for l, expected in [([1, 2, 3], 6.0), ([1.5, 2.5], 4.0),
+                            (['a'], None), (range(5), 10.0)]:
+            if expected is None:
+                raises(TypeError, module.sum_items, l)
+            else:
+                assert module.sum_items(l) == expected
+        if '__pypy__' in sys.builtin_module_names:
+            from __pypy__ import strategy
+            l = [1, 2, 3]
+            module.sum_items(l)
+            assert strategy(l) == "IntegerListStrategy"
+            l = [1.5, 2.5]
+            module.sum_items(l)
+            assert strategy(l) == "FloatListStrategy"
+        l = [1, 2, 3]
+        assert module.set_first(l, 42) == 1
+        assert l == [42, 2, 3]
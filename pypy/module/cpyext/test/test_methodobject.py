@@ -110,6 +110,48 @@ class AppTestMethodObject(AppTestCpythonExtensionBase):
         assert mod.getarg_KW.__name__ == "getarg_KW"
         assert mod.getarg_KW(*(), **{}) == ((), {})
 
+    def test_call_METH_FASTCALL(self):
+        mod = self.import_extension('MyModule', [
+            ('getarg_FAST', 'METH_FASTCALL',
+             '''
+             PyObject *res = PyList_New(nargs);
+             Py_ssize_t i;
+             for (i = 0; i < nargs; i++) {
+                 Py_INCREF(args[i]);
+                 PyList_SET_ITEM(res, i, args[i]);
+             }
+             return res;
+             '''
+             ),
+            ('getarg_FASTKW', 'METH_FASTCALL | METH_KEYWORDS',
+             '''
+             Py_ssize_t i, nkw = kwnames ? PyTuple_GET_SIZE(kwnames) : 0;
+             PyObject *pos = PyTuple_New(nargs);
+             PyObject *kw = PyDict_New();
+             for (i = 0; i < nargs; i++) {
+                 Py_INCREF(args[i]);
+                 PyTuple_SET_ITEM(pos, i, args[i]);
+             }
+             for (i = 0; i < nkw; i++)
+                 PyDict_SetItem(kw, PyTuple_GET_ITEM(kwnames, i),
+                                args[nargs + i]);
+             return Py_BuildValue("NNO", pos, kw,
+                                  kwnames ? kwnames : Py_None);
+             '''
+             ),
+            ])
+        assert mod.getarg_FAST() == []
+        assert mod.getarg_FAST(1) == [1]
+        assert mod.getarg_FAST(1, 'a', None) == [1, 'a', None]
+        raises(TypeError, mod.getarg_FAST, k=1)
+        assert mod.getarg_FASTKW() == ((), {}, None)
+        assert mod.getarg_FASTKW(1, 2) == ((1, 2), {}, None)
+        pos, kw, kwnames = mod.getarg_FASTKW(1, a=3, b=4)
+        assert pos == (1,)
+        assert kw == {'a': 3, 'b': 4}
+        assert sorted(kwnames) == ['a', 'b']
+        assert mod.getarg_FASTKW(*(), **{}) == ((), {}, None)
+
     def test_func_attributes(self):
         mod = self.import_extension('MyModule', [
             ('isCFunction', 'METH_O',
@@ -0,0 +1,143 @@
+"""
+Sampling of the nursery allocations, driven by the GC hooks: see
+get_alloc_sample_interval() and on_gc_alloc_sample*() in
+rpython/memory/gc/hook.py.
+"""
+
+from rpython.rlib.rvmprof import traceback
+from rpython.rlib.rvmprof.rvmprof import VMPROF_CODE_TAG, VMPROF_JITTED_TAG
+from rpython.rtyper.lltypesystem import lltype, rffi
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.error import oefmt
+
+# Each sample is stored as a record of words in a raw buffer:
+#
+#     [size] [typeindex] [survived] [n] [entry1]..[entryn]
+#
+# where the entries are the vmprof traceback of the allocation, as
+# pairs (tag, value).  The type and fate of the object are only known
+# after the next minor collection; until then, 'typeindex' is -1.
+HEADER = 4
+
+
+class AllocSampler(object):
+
+    def __init__(self, space):
+        self.space = space
+        self.interval = 0
+        self.max_depth = 0
+        self.buf = lltype.nullptr(rffi.SIGNEDP.TO)
+        self.buf_size = 0
+        self.buf_used = 0
+        # the records before 'buf_done' are complete
+        self.buf_done = 0
+
+    def _grow(self, needed):
+        newsize = max(self.buf_size * 2, self.buf_used + needed, 1024)
+        newbuf = lltype.malloc(rffi.SIGNEDP.TO, newsize, flavor='raw',
+                               track_allocation=False)
+        i = 0
+        while i < self.buf_used:
+            newbuf[i] = self.buf[i]
+            i += 1
+        if self.buf:
+            lltype.free(self.buf, flavor='raw', track_allocation=False)
+        self.buf = newbuf
+        self.buf_size = newsize
+
+    def on_sample(self, size):
+        maxlength = self.max_depth * 2
+        if self.buf_used + HEADER + maxlength > self.buf_size:
+            self._grow(HEADER + maxlength)
+        p = self.buf_used
+        self.buf[p] = size
+        self.buf[p + 1] = -1
+        self.buf[p + 2] = 0
+        n = 0
+        if self.space.config.objspace.usemodules._vmprof and maxlength > 0:
+            n = traceback.traceback_into(rffi.ptradd(self.buf, p + HEADER),
+                                         maxlength)
+        self.buf[p + 3] = n
+        self.buf_used = p + HEADER + n
+
+    def on_sample_done(self, typeindex, size, survived):
+        p = self.buf_done
+        if p >= self.buf_used:
+            return      # the samples were discarded in the meantime
+        self.buf[p] = size
+        self.buf[p + 1] = typeindex
+        self.buf[p + 2] = int(survived)
+        self.buf_done = p + HEADER + self.buf[p + 3]
+
+    def _get_code_map(self):
+        code_map = {}
+        if self.space.config.objspace.usemodules._vmprof:
+            from pypy.interpreter.pycode import PyCode
+            for wref in PyCode._vmprof_weak_list.get_all_handles():
+                code = wref()
+                if code is not None:
+                    code_map[code._vmprof_unique_id] = code
+        return code_map
+
+    def fetch(self):
+        """Return the wrapped list of the complete samples, and remove
+        them from the buffer."""
+        space = self.space
+        code_map = self._get_code_map()
+        samples_w = []
+        p = 0
+        while p < self.buf_done:
+            n = self.buf[p + 3]
+            stack_w = []
+            i = p + HEADER
+            while i < p + HEADER + n - 1:
+                tag = self.buf[i]
+                if tag == VMPROF_CODE_TAG or tag == VMPROF_JITTED_TAG:
+                    code = code_map.get(self.buf[i + 1], None)
+                    if code is not None:
+                        stack_w.append(code)
+                i += 2
+            samples_w.append(space.newtuple([
+                space.newint(self.buf[p + 1]),
+                space.newint(self.buf[p]),
+                space.newbool(bool(self.buf[p + 2])),
+                space.newtuple(stack_w)]))
+            p += HEADER + n
+        #
+        # move the incomplete samples to the start of the buffer
+        i = 0
+        while p + i < self.buf_used:
+            self.buf[i] = self.buf[p + i]
+            i += 1
+        self.buf_used = i
+        self.buf_done = 0
+        return space.newlist(samples_w)
+
+
+@unwrap_spec(interval=int, max_depth=int)
+def start_alloc_sampling(space, interval=512*1024, max_depth=64):
+    """Start sampling the allocations: about every 'interval' bytes
+    allocated, the next allocation is recorded together with at most
+    'max_depth' frames of the Python stack (only if the _vmprof module
+    is available).  Sampling starts at the next minor collection."""
+    if interval <= 0:
+        raise oefmt(space.w_ValueError, "interval must be positive")
+    if max_depth < 0:
+        raise oefmt(space.w_ValueError, "max_depth must not be negative")
+    sampler = space.fromcache(AllocSampler)
+    sampler.interval = interval
+    sampler.max_depth = max_depth
+
+def stop_alloc_sampling(space):
+    """Stop sampling the allocations.  The samples already taken can
+    still be read with get_alloc_samples()."""
+    space.fromcache(AllocSampler).interval = 0
+
+def get_alloc_samples(space):
+    """Return and forget the allocation samples that are complete, i.e.
+    that a minor collection has seen since they were taken.  Each sample
+    is a tuple (typeindex, size, survived, stack), where 'typeindex' is
+    as returned by get_rpy_type_index(), 'survived' tells if the object
+    survived its first minor collection, and 'stack' is a tuple of code
+    objects, innermost first."""
+    return space.fromcache(AllocSampler).fetch()
@@ -121,3 +121,48 @@ class GcStats(object):
 
 def get_stats(memory_pressure=False):
     return GcStats(gc._get_stats(memory_pressure=memory_pressure))
+
+
+def _load_typenames():
+    import zlib
+    names = []
+    for line in zlib.decompress(gc.get_typeids_z()).splitlines():
+        words = line.split()
+        if words and words[0].startswith('member'):
+            del words[0]
+        if words and words[0] == 'GcStruct':
+            del words[0]
+        names.append(' '.join(words))
+    return names
+
+def dump_alloc_samples(file, survived_only=False, typenames=None):
+    """Write the samples returned by get_alloc_samples() to the given
+    file, in the "collapsed stacks" format read by flamegraph.pl and
+    speedscope: one line per distinct stack and type, with the frames
+    from the outermost to the innermost separated by ';', followed by
+    the type name and the number of samples.  Each sample stands for
+    about 'interval' bytes of allocation (see start_alloc_sampling()).
+    With 'survived_only', ignore the objects that died young.
+    """
+    if typenames is None:
+        typenames = _load_typenames()
+    counts = {}
+    for typeindex, size, survived, stack in gc.get_alloc_samples():
+        if survived_only and not survived:
+            continue
+        if 0 <= typeindex < len(typenames):
+            typename = typenames[typeindex]
+        else:
+            typename = '<typenum %d>' % (typeindex,)
+        frames = ['%s (%s:%d)' % (code.co_name, code.co_filename,
+                                  code.co_firstlineno)
+                  for code in reversed(stack)]
+        frames.append(typename)
+        key = ';'.join([frame.replace(';', ',') for frame in frames])
+        counts[key] = counts.get(key, 0) + 1
+    lines = ['%s %d\n' % item for item in sorted(counts.items())]
+    if isinstance(file, str):
+        with open(file, 'w') as f:
+            f.writelines(lines)
+    else:
+        file.writelines(lines)
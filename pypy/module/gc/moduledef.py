@@ -20,6 +20,7 @@ class Module(MixedModule):
             self.appleveldefs.update({
                 'dump_rpy_heap': 'app_referents.dump_rpy_heap',
                 'get_stats': 'app_referents.get_stats',
+                'dump_alloc_samples': 'app_referents.dump_alloc_samples',
                 })
             self.interpleveldefs.update({
                 'collect_step': 'interp_gc.collect_step',
@@ -37,5 +38,8 @@ class Module(MixedModule):
                 'GcRef': 'referents.W_GcRef',
                 'hooks': 'space.fromcache(hook.W_AppLevelHooks)',
                 'GcCollectStepStats': 'hook.W_GcCollectStepStats',
+                'start_alloc_sampling': 'allocsampler.start_alloc_sampling',
+                'stop_alloc_sampling': 'allocsampler.stop_alloc_sampling',
+                'get_alloc_samples': 'allocsampler.get_alloc_samples',
                 })
         MixedModule.__init__(self, space, w_name)
@@ -33,6 +33,24 @@ class AppTestGcHooks(object):
             gchooks.fire_gc_collect_step(22.0, 0, 0)
             gchooks.fire_gc_collect(1, 2, 3, 4, 5, 6, 7)
 
+        @unwrap_spec(ObjSpace, int)
+        def fire_gc_alloc_sample(space, size):
+            gchooks.fire_gc_alloc_sample(size)
+
+        @unwrap_spec(ObjSpace, int, int, bool)
+        def fire_gc_alloc_sample_done(space, typeindex, size, survived):
+            gchooks.fire_gc_alloc_sample_done(typeindex, size, survived)
+
+        @unwrap_spec(ObjSpace)
+        def get_alloc_sample_interval(space):
+            return space.newint(gchooks.get_alloc_sample_interval())
+
+        cls.w_fire_gc_alloc_sample = space.wrap(
+            interp2app(fire_gc_alloc_sample))
+        cls.w_fire_gc_alloc_sample_done = space.wrap(
+            interp2app(fire_gc_alloc_sample_done))
+        cls.w_get_alloc_sample_interval = space.wrap(
+            interp2app(get_alloc_sample_interval))
         cls.w_fire_gc_minor = space.wrap(interp2app(fire_gc_minor))
         cls.w_fire_gc_collect_step = space.wrap(interp2app(fire_gc_collect_step))
         cls.w_fire_gc_collect = space.wrap(interp2app(fire_gc_collect))
@@ -120,6 +138,47 @@ class AppTestGcHooks(object):
             (1, 7, 8, 9, 10, 11, 12, 21),
             ]
 
+    def test_alloc_samples(self):
+        import gc
+        assert self.get_alloc_sample_interval() == 0
+        gc.start_alloc_sampling(1000)
+        assert self.get_alloc_sample_interval() == 1000
+        self.fire_gc_alloc_sample(32)
+        self.fire_gc_alloc_sample(48)
+        assert gc.get_alloc_samples() == []
+        self.fire_gc_alloc_sample_done(5, 32, True)
+        assert gc.get_alloc_samples() == [(5, 32, True, ())]
+        self.fire_gc_alloc_sample_done(7, 56, False)
+        self.fire_gc_alloc_sample(16)
+        gc.stop_alloc_sampling()
+        assert self.get_alloc_sample_interval() == 0
+        self.fire_gc_alloc_sample_done(5, 16, False)
+        assert gc.get_alloc_samples() == [(7, 56, False, ()),
+                                          (5, 16, False, ())]
+        assert gc.get_alloc_samples() == []
+        raises(ValueError, gc.start_alloc_sampling, 0)
+
+    def test_dump_alloc_samples(self):
+        import gc
+        class F(object):
+            def writelines(self, lines):
+                self.lines = lines
+        gc.start_alloc_sampling(1000)
+        for typeindex, survived in [(1, True), (2, False), (1, False)]:
+            self.fire_gc_alloc_sample(32)
+            self.fire_gc_alloc_sample_done(typeindex, 32, survived)
+        gc.stop_alloc_sampling()
+        f = F()
+        gc.dump_alloc_samples(f, typenames=['', 'W_Foo', 'W_Bar'])
+        assert f.lines == ['W_Bar 1\n', 'W_Foo 2\n']
+        #
+        self.fire_gc_alloc_sample(32)
+        self.fire_gc_alloc_sample_done(1, 32, True)
+        self.fire_gc_alloc_sample(32)
+        self.fire_gc_alloc_sample_done(3, 32, True)
+        gc.dump_alloc_samples(f, survived_only=True, typenames=['', 'W_Foo'])
+        assert f.lines == ['<typenum 3> 1\n', 'W_Foo 1\n']
+
     def test_consts(self):
         import gc
         S = gc.GcCollectStepStats
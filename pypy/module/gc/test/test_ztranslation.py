@@ -1,6 +1,7 @@
 from pypy.objspace.fake.checkmodule import checkmodule
 
 def test_checkmodule():
+    import pypy.module._vmprof.interp_vmprof   # register_code_object_class()
     # we need to ignore GcCollectStepStats, else checkmodule fails. I think
     # this happens because W_GcCollectStepStats.__init__ is only called from
     # GcCollectStepHookAction.perform() and the fake objspace doesn't know
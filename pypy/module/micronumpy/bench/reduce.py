@@ -0,0 +1,39 @@
+""" Reductions and element-wise arithmetic on large float64 arrays.
+
+Compare the timings with and without the vectorizer:
+
+    pypy reduce.py [n] [repeat]
+    pypy --jit vec=1 reduce.py [n] [repeat]
+"""
+import sys
+import time
+
+try:
+    import numpypy as numpy
+except ImportError:
+    import numpy
+
+def bench(name, func, repeat):
+    func()       # warm up the JIT
+    t0 = time.time()
+    for _ in xrange(repeat):
+        func()
+    t1 = time.time()
+    print '%-10s %8.2f ms' % (name, (t1 - t0) * 1000.0 / repeat)
+
+def main(n, repeat):
+    a = numpy.arange(n, dtype=numpy.float64)
+    b = numpy.ones(n, dtype=numpy.float64)
+    bench('sum', lambda: a.sum(), repeat)
+    bench('add.reduce', lambda: numpy.add.reduce(a), repeat)
+    bench('dot', lambda: numpy.dot(a, b), repeat)
+    bench('a + b', lambda: a + b, repeat)
+    bench('a * b', lambda: a * b, repeat)
+
+n = 10000000
+repeat = 10
+if len(sys.argv) > 1:
+    n = int(sys.argv[1])
+if len(sys.argv) > 2:
+    repeat = int(sys.argv[2])
+main(n, repeat)
@@ -0,0 +1,56 @@
+""" Sorting and partitioning large int64 and float64 arrays.
+
+The 'stable' kind of arrays smaller than the radix sort threshold and
+complex arrays of any size use the timsort path; compare it with the
+introsort ('quicksort'), heapsort and radix sort ('stable') paths:
+
+    pypy sort.py [n] [repeat]
+"""
+import sys
+import time
+
+try:
+    import numpypy as numpy
+except ImportError:
+    import numpy
+
+def bench(name, a, func, repeat):
+    func(a.copy())       # warm up the JIT
+    total = 0.0
+    for _ in xrange(repeat):
+        b = a.copy()
+        t0 = time.time()
+        func(b)
+        total += time.time() - t0
+    print '%-28s %8.2f ms' % (name, total * 1000.0 / repeat)
+
+def main(n, repeat):
+    import random
+    rnd = random.Random(42)
+    data = [rnd.random() for _ in xrange(n)]
+    arrays = [('int64', numpy.array([int(x * n) for x in data])),
+              ('float64', numpy.array(data))]
+    for name, a in arrays:
+        for kind in ['quicksort', 'heapsort', 'stable']:
+            bench('%s sort %s' % (name, kind), a,
+                  lambda b: b.sort(kind=kind), repeat)
+            bench('%s argsort %s' % (name, kind), a,
+                  lambda b: b.argsort(kind=kind), repeat)
+        bench('%s partition' % name, a,
+              lambda b: b.partition(n // 2), repeat)
+        bench('%s argpartition' % name, a,
+              lambda b: b.argpartition(n // 2), repeat)
+    # timsort on arrays split into chunks below the radix sort threshold
+    a = numpy.array(data[:n // 1000 * 1000]).reshape(-1, 1000)
+    bench('float64 sort timsort chunks', a,
+          lambda b: b.sort(kind='stable'), repeat)
+    bench('float64 sort quicksort chunks', a,
+          lambda b: b.sort(kind='quicksort'), repeat)
+
+n = 1000000
+repeat = 5
+if len(sys.argv) > 1:
+    n = int(sys.argv[1])
+if len(sys.argv) > 2:
+    repeat = int(sys.argv[2])
+main(n, repeat)
@@ -509,13 +509,17 @@ class ConcreteArrayNotOwning(BaseConcreteArray):
         assert dtype.elsize == self.dtype.elsize
         self.dtype = dtype
 
-    def argsort(self, space, w_axis):
+    def argsort(self, space, w_axis, kind):
         from .selection import argsort_array
-        return argsort_array(self, space, w_axis)
+        return argsort_array(self, space, w_axis, kind)
 
-    def sort(self, space, w_axis, w_order):
+    def sort(self, space, w_axis, w_order, kind):
         from .selection import sort_array
-        return sort_array(self, space, w_axis, w_order)
+        return sort_array(self, space, w_axis, w_order, kind)
+
+    def partition(self, space, w_kth, w_axis, arg):
+        from .selection import partition_array
+        return partition_array(self, space, w_kth, w_axis, arg)
 
     def base(self):
         return None
@@ -675,9 +679,13 @@ class SliceArray(BaseConcreteArray):
         return self.__class__(self.start, new_strides, new_backstrides, new_shape,
                           self, orig_array)
 
-    def sort(self, space, w_axis, w_order):
+    def sort(self, space, w_axis, w_order, kind):
         from .selection import sort_array
-        return sort_array(self, space, w_axis, w_order)
+        return sort_array(self, space, w_axis, w_order, kind)
+
+    def partition(self, space, w_kth, w_axis, arg):
+        from .selection import partition_array
+        return partition_array(self, space, w_kth, w_axis, arg)
 
 class NonWritableSliceArray(SliceArray):
     def __init__(self, start, strides, backstrides, shape, parent, orig_arr,
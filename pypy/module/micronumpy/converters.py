@@ -57,6 +57,27 @@ def searchside_converter(space, w_obj):
                     "'%s' is an invalid value for keyword 'side'", s)
 
 
+def sortkind_converter(space, w_obj):
+    if space.is_none(w_obj):
+        return NPY.QUICKSORT
+    try:
+        s = space.text_w(w_obj)
+    except OperationError:
+        s = None
+    if not s:
+        raise oefmt(space.w_ValueError,
+                    "expected nonempty string for keyword 'kind'")
+    if s[0] == 'q' or s[0] == 'Q':
+        return NPY.QUICKSORT
+    elif s[0] == 'h' or s[0] == 'H':
+        return NPY.HEAPSORT
+    elif s[0] == 'm' or s[0] == 'M' or s[0] == 's' or s[0] == 'S':
+        return NPY.STABLESORT
+    else:
+        raise oefmt(space.w_ValueError,
+                    "'%s' is an invalid value for keyword 'kind'", s)
+
+
 def order_converter(space, w_order, default):
     if space.is_none(w_order):
         return default
@@ -1,7 +1,7 @@
 from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.baseobjspace import BufferInterfaceNotFound
 from pypy.interpreter.gateway import unwrap_spec, WrappedDefault
-from rpython.rlib.buffer import SubBuffer
+from rpython.rlib.buffer import SubBuffer, LLBuffer
 from rpython.rlib.rstring import strip_spaces
 from rpython.rlib.rawstorage import RAW_STORAGE_PTR
 from rpython.rtyper.lltypesystem import lltype, rffi
@@ -12,6 +12,9 @@ from pypy.module.micronumpy.base import (wrap_impl,
 from pypy.module.micronumpy.converters import shape_converter, order_converter
 import pypy.module.micronumpy.constants as NPY
 from .casting import scalar2dtype
+from pypy.module._cffi_backend.cdataobj import W_CData
+from pypy.module._cffi_backend.ctypeptr import W_CTypePtrOrArray
+from pypy.module._cffi_backend.ctypearray import W_CTypeArray
 
 
 def build_scalar(space, w_dtype, w_state):
@@ -539,21 +542,48 @@ def _getbuffer(space, w_buffer):
         return space.readbuf_w(w_buffer)
 
 
+def _getbuffer_cdata(space, w_cdata):
+    # the memory of a cffi pointer or array, without copying it: all the
+    # items of an array, or the single item a pointer points to
+    ctype = w_cdata.ctype
+    if not isinstance(ctype, W_CTypePtrOrArray):
+        raise oefmt(space.w_TypeError,
+                    "expected a cdata pointer or array, got '%s'", ctype.name)
+    itemsize = ctype.ctitem.size
+    if itemsize < 0:
+        raise oefmt(space.w_TypeError,
+                    "cdata '%s' points to items of unknown size", ctype.name)
+    if isinstance(ctype, W_CTypeArray):
+        length = w_cdata.get_array_length()
+    else:
+        length = 1
+    return LLBuffer(w_cdata.unsafe_escaping_ptr(), length * itemsize)
+
+
 @unwrap_spec(count=int, offset=int)
 def frombuffer(space, w_buffer, w_dtype=None, count=-1, offset=0):
+    if isinstance(w_buffer, W_CData):
+        buf = _getbuffer_cdata(space, w_buffer)
+        if w_dtype is None or space.is_none(w_dtype):
+            w_ctype = w_buffer.ctype
+            assert isinstance(w_ctype, W_CTypePtrOrArray)
+            w_dtype = descriptor.dtype_from_ctype(space, w_ctype.ctitem)
+    else:
+        buf = None
     dtype = space.interp_w(descriptor.W_Dtype,
         space.call_function(space.gettypefor(descriptor.W_Dtype), w_dtype))
     if dtype.elsize == 0:
         raise oefmt(space.w_ValueError, "itemsize cannot be zero in type")
 
-    try:
-        buf = _getbuffer(space, w_buffer)
-    except OperationError as e:
-        if not e.match(space, space.w_TypeError):
-            raise
-        w_buffer = space.call_method(w_buffer, '__buffer__',
-                                    space.newint(space.BUF_FULL_RO))
-        buf = _getbuffer(space, w_buffer)
+    if buf is None:
+        try:
+            buf = _getbuffer(space, w_buffer)
+        except OperationError as e:
+            if not e.match(space, space.w_TypeError):
+                raise
+            w_buffer = space.call_method(w_buffer, '__buffer__',
+                                        space.newint(space.BUF_FULL_RO))
+            buf = _getbuffer(space, w_buffer)
 
     ts = buf.getlength()
     if offset < 0 or offset > ts:
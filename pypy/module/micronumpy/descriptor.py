@@ -15,6 +15,7 @@ from .base import W_NDimArray
 from pypy.module.micronumpy.appbridge import get_appbridge_cache
 from pypy.module.micronumpy.converters import byteorder_converter
 from pypy.module.micronumpy.hashdescr import _array_descr_walk
+from pypy.module._cffi_backend.ctypeobj import W_CType
 
 
 def decode_w_dtype(space, w_dtype):
@@ -905,6 +906,66 @@ def dtype_from_dict(space, w_dict, alignment):
     retval.flags |= NPY.NEEDS_PYAPI
     return retval 
 
+def dtype_from_ctype(space, ctype):
+    """Make a dtype with the memory layout of the given cffi ctype: a
+    record dtype for a struct or union, with the same field offsets and
+    total size; a subarray dtype for an array of fixed length; or the
+    builtin dtype of a primitive type.
+    """
+    from pypy.module._cffi_backend import ctypeprim, ctypearray, ctypestruct
+    w_subtype = space.gettypefor(W_Dtype)
+    if isinstance(ctype, ctypestruct.W_CTypeStructOrUnion):
+        ctype.check_complete(space.w_TypeError)
+        ctype.force_lazy_struct()
+        fields = ctype._fields_list
+        fldnames = [''] * len(fields)
+        for fname, field in ctype._fields_dict.iteritems():
+            fldnames[fields.index(field)] = fname
+        items_w = []
+        offsets = []
+        for i in range(len(fields)):
+            field = fields[i]
+            if field.is_bitfield():
+                raise oefmt(space.w_TypeError,
+                            "cannot make a dtype from '%s': field '%s' is "
+                            "a bit field", ctype.name, fldnames[i])
+            if field.bitshift == field.BS_EMPTY_ARRAY:
+                continue     # a variable-length array at the end
+            items_w.append(space.newtuple([
+                space.newtext(fldnames[i]),
+                dtype_from_ctype(space, field.ctype)]))
+            offsets.append(field.offset)
+        return dtype_from_list(space, space.newlist(items_w), False, -1,
+                               offsets=offsets, itemsize=ctype.size)
+    if isinstance(ctype, ctypearray.W_CTypeArray):
+        if ctype.length < 0:
+            raise oefmt(space.w_TypeError,
+                        "cannot make a dtype from '%s': the length of the "
+                        "array is not known", ctype.name)
+        subdtype = dtype_from_ctype(space, ctype.ctitem)
+        return make_new_dtype(space, w_subtype, subdtype, -1,
+                              w_shape=space.newint(ctype.length))
+    if isinstance(ctype, ctypeprim.W_CTypePrimitiveBool):
+        name = '?'
+    elif isinstance(ctype, ctypeprim.W_CTypePrimitiveSigned):
+        name = 'i%d' % ctype.size
+    elif isinstance(ctype, ctypeprim.W_CTypePrimitiveUnsigned):
+        name = 'u%d' % ctype.size
+    elif isinstance(ctype, ctypeprim.W_CTypePrimitiveLongDouble):
+        name = ''    # not the same size and layout on all platforms
+    elif isinstance(ctype, ctypeprim.W_CTypePrimitiveFloat):
+        name = 'f%d' % ctype.size
+    elif isinstance(ctype, ctypeprim.W_CTypePrimitiveComplex):
+        name = 'c%d' % ctype.size
+    elif isinstance(ctype, ctypeprim.W_CTypePrimitiveChar):
+        name = 'S1'
+    else:
+        name = ''
+    if not name:
+        raise oefmt(space.w_TypeError,
+                    "cannot make a dtype from the C type '%s'", ctype.name)
+    return make_new_dtype(space, w_subtype, space.newtext(name), -1)
+
 def dtype_from_spec(space, w_spec, alignment):
 
     w_lst = w_spec
@@ -1082,6 +1143,9 @@ def make_new_dtype(space, w_subtype, w_dtype, alignment, copy=False, w_shape=Non
     elif space.isinstance_w(w_dtype, space.w_dict):
         return _set_metadata_and_copy(space, w_metadata,
                 dtype_from_dict(space, w_dtype, alignment), copy)
+    elif isinstance(w_dtype, W_CType):
+        return _set_metadata_and_copy(space, w_metadata,
+                dtype_from_ctype(space, w_dtype), copy)
     for dtype in cache.builtin_dtypes:
         try:
             constructors = cache.alternate_constructors(dtype.num)
@@ -35,6 +35,8 @@ class MultiArrayModule(MixedModule):
         'broadcast': 'broadcast.W_Broadcast',
 
         'set_docstring': 'support.descr_set_docstring',
+        'set_ufunc_threads': 'parallel.set_ufunc_threads',
+        'get_ufunc_threads': 'parallel.get_ufunc_threads',
         'VisibleDeprecationWarning': 'support.W_VisibleDeprecationWarning',
     }
     for c in ['MAXDIMS', 'CLIP', 'WRAP', 'RAISE']:
@@ -4,6 +4,7 @@ from pypy.interpreter.gateway import interp2app, unwrap_spec, applevel, \
 from pypy.interpreter.typedef import TypeDef, GetSetProperty, \
     make_weakref_descr
 from pypy.interpreter.buffer import SimpleView
+from pypy.interpreter.signature import Signature
 from rpython.rlib import jit
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib.rawstorage import RAW_STORAGE_PTR
@@ -11,7 +12,7 @@ from rpython.rlib.rarithmetic import ovfcheck
 from rpython.rtyper.lltypesystem import rffi
 from rpython.tool.sourcetools import func_with_new_name
 from pypy.module.micronumpy import descriptor, ufuncs, boxes, arrayops, loop, \
-    support, constants as NPY
+    selection, support, constants as NPY
 from pypy.module.micronumpy.appbridge import get_appbridge_cache
 from pypy.module.micronumpy.arrayops import repeat, choose, put
 from pypy.module.micronumpy.base import W_NDimArray, convert_to_array, \
@@ -19,7 +20,7 @@ from pypy.module.micronumpy.base import W_NDimArray, convert_to_array, \
 from pypy.module.micronumpy.concrete import BaseConcreteArray, V_OBJECTSTORE
 from pypy.module.micronumpy.converters import (
     multi_axis_converter, order_converter, shape_converter,
-    searchside_converter, out_converter)
+    searchside_converter, sortkind_converter, out_converter)
 from pypy.module.micronumpy.flagsobj import W_FlagsObject
 from pypy.module.micronumpy.strides import (
     get_shape_from_iterable, shape_agreement, shape_agreement_multiple,
@@ -29,6 +30,9 @@ from pypy.module.micronumpy.casting import can_cast_array
 from pypy.module.micronumpy.descriptor import get_dtype_cache
 
 
+partition_signature = Signature(['kth', 'axis', 'kind', 'order'])
+partition_defaults = [None, None, None]
+
 
 def _match_dot_shapes(space, left, right):
     left_shape = left.get_shape()
@@ -704,7 +708,7 @@ class __extend__(W_NDimArray):
         return space.newfloat(self.__array_priority__)
 
     def descr_argsort(self, space, w_axis=None, w_kind=None, w_order=None):
-        # happily ignore the kind
+        kind = sortkind_converter(space, w_kind)
         # create a contiguous copy of the array
         # we must do that, because we need a working set. otherwise
         # we would modify the array in-place. Use this to our advantage
@@ -713,7 +717,7 @@ class __extend__(W_NDimArray):
             return space.newint(0)
         dtype = self.get_dtype().descr_newbyteorder(space, NPY.NATIVE)
         contig = self.implementation.astype(space, dtype, self.get_order())
-        return contig.argsort(space, w_axis)
+        return contig.argsort(space, w_axis, kind)
 
     @unwrap_spec(order='text', casting='text', subok=bool, copy=bool)
     def descr_astype(self, space, w_dtype, order='K', casting='unsafe', subok=True, copy=True):
@@ -933,18 +937,47 @@ class __extend__(W_NDimArray):
         raise oefmt(space.w_NotImplementedError,
                     "setflags not implemented yet")
 
-    @unwrap_spec(kind='text')
-    def descr_sort(self, space, w_axis=None, kind='quicksort', w_order=None):
-        # happily ignore the kind
+    def descr_sort(self, space, w_axis=None, w_kind=None, w_order=None):
+        kind = sortkind_converter(space, w_kind)
         # modify the array in-place
         if self.is_scalar():
             return
-        return self.implementation.sort(space, w_axis, w_order)
+        return self.implementation.sort(space, w_axis, w_order, kind)
+
+    def _parse_partition_args(self, space, fnname, __args__):
+        w_kth, w_axis, w_kind, w_order = __args__.parse_obj(
+            None, fnname, partition_signature, partition_defaults)
+        if not space.is_none(w_kind):
+            kind = space.text_w(w_kind)
+            if kind != 'introselect':
+                raise oefmt(space.w_ValueError,
+                            "'%s' is an invalid value for keyword 'kind'",
+                            kind)
+        return w_kth, w_axis, w_order
 
     def descr_partition(self, space, __args__):
+        w_kth, w_axis, w_order = self._parse_partition_args(
+            space, 'partition', __args__)
+        if (not self.is_scalar() and space.is_none(w_order) and
+                selection.can_partition(self.get_dtype())):
+            self.implementation.partition(space, w_kth, w_axis, False)
+            return
         return get_appbridge_cache(space).call_method(
             space, 'numpy.core._partition_use', 'partition', __args__.prepend(self))
 
+    def descr_argpartition(self, space, __args__):
+        w_kth, w_axis, w_order = self._parse_partition_args(
+            space, 'argpartition', __args__)
+        if self.is_scalar():
+            return space.newint(0)
+        # work on a native copy like argsort(); a full argsort is a valid
+        # partition for the dtypes that cannot be partitioned directly
+        dtype = self.get_dtype().descr_newbyteorder(space, NPY.NATIVE)
+        if not space.is_none(w_order) or not selection.can_partition(dtype):
+            return self.descr_argsort(space, w_axis, None, w_order)
+        contig = self.implementation.astype(space, dtype, self.get_order())
+        return contig.partition(space, w_kth, w_axis, True)
+
     def descr_squeeze(self, space, w_axis=None):
         cur_shape = self.get_shape()
         if not space.is_none(w_axis):
@@ -1671,6 +1704,7 @@ W_NDimArray.typedef = TypeDef("numpy.ndarray", None, None, 'read-write',
     argsort  = interp2app(W_NDimArray.descr_argsort),
     sort  = interp2app(W_NDimArray.descr_sort),
     partition  = interp2app(W_NDimArray.descr_partition),
+    argpartition  = interp2app(W_NDimArray.descr_argpartition),
     astype   = interp2app(W_NDimArray.descr_astype),
     base     = GetSetProperty(W_NDimArray.descr_get_base),
     byteswap = interp2app(W_NDimArray.descr_byteswap),
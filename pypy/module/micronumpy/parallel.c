@@ -0,0 +1,137 @@
+/* Element-wise loops of micronumpy ufuncs, split into chunks that run
+ * in several OS threads.  They are called with the GIL released, so
+ * they only touch the raw storage of the arrays.
+ *
+ * The arithmetic follows the interpreter-level loops exactly: integers
+ * wrap around (done here with unsigned arithmetic) and float32 values
+ * are computed as doubles and rounded back to float.
+ */
+
+#include <math.h>
+#include <stdint.h>
+#include "src/precommondefs.h"
+#include "parallel.h"
+
+#ifndef _WIN32
+#  include <pthread.h>
+#endif
+
+#define MAX_THREADS   64
+#define CHUNK_ALIGN   16    /* elements; keeps chunks on separate cache lines */
+
+struct chunk_s {
+    int op;
+    int type;
+    Signed start, stop;
+    char *a, *b, *out;
+    Signed astride, bstride;
+};
+
+#define BINARY_LOOP(T, EXPR)                                            \
+    for (i = c->start; i < c->stop; i++) {                              \
+        T x = *(T *)(c->a + i * c->astride);                            \
+        T y = *(T *)(c->b + i * c->bstride);                            \
+        ((T *)c->out)[i] = (EXPR);                                      \
+    }
+
+#define UNARY_LOOP(T, EXPR)                                             \
+    for (i = c->start; i < c->stop; i++) {                              \
+        T x = *(T *)(c->a + i * c->astride);                            \
+        ((T *)c->out)[i] = (EXPR);                                      \
+    }
+
+#define FLOAT_LOOPS(T)                                                  \
+    switch (c->op) {                                                    \
+    case PYPY_NUMPY_ADD: BINARY_LOOP(T, (T)((double)x + (double)y)); break; \
+    case PYPY_NUMPY_SUB: BINARY_LOOP(T, (T)((double)x - (double)y)); break; \
+    case PYPY_NUMPY_MUL: BINARY_LOOP(T, (T)((double)x * (double)y)); break; \
+    case PYPY_NUMPY_NEG: UNARY_LOOP(T, (T)(-(double)x)); break;         \
+    case PYPY_NUMPY_ABS: UNARY_LOOP(T, (T)fabs((double)x)); break;      \
+    }
+
+#define INT_LOOPS(T, UT, SIGNED)                                        \
+    switch (c->op) {                                                    \
+    case PYPY_NUMPY_ADD: BINARY_LOOP(T, (T)((UT)x + (UT)y)); break;     \
+    case PYPY_NUMPY_SUB: BINARY_LOOP(T, (T)((UT)x - (UT)y)); break;     \
+    case PYPY_NUMPY_MUL: BINARY_LOOP(T, (T)((UT)x * (UT)y)); break;     \
+    case PYPY_NUMPY_NEG: UNARY_LOOP(T, (T)((UT)0 - (UT)x)); break;      \
+    case PYPY_NUMPY_ABS:                                                \
+        UNARY_LOOP(T, (SIGNED && x < 0) ? (T)((UT)0 - (UT)x) : x); break; \
+    }
+
+static void run_chunk(struct chunk_s *c)
+{
+    Signed i;
+    switch (c->type) {
+    case PYPY_NUMPY_FLOAT64: FLOAT_LOOPS(double); break;
+    case PYPY_NUMPY_FLOAT32: FLOAT_LOOPS(float); break;
+    case PYPY_NUMPY_INT64:   INT_LOOPS(int64_t, uint64_t, 1); break;
+    case PYPY_NUMPY_INT32:   INT_LOOPS(int32_t, uint32_t, 1); break;
+    case PYPY_NUMPY_UINT64:  INT_LOOPS(uint64_t, uint64_t, 0); break;
+    case PYPY_NUMPY_UINT32:  INT_LOOPS(uint32_t, uint32_t, 0); break;
+    }
+}
+
+#ifndef _WIN32
+static void *thread_main(void *arg)
+{
+    run_chunk((struct chunk_s *)arg);
+    return NULL;
+}
+#endif
+
+/* out[i] = a[i] <op> b[i] for 0 <= i < n.  'out' is contiguous; the
+   strides of 'a' and 'b' are in bytes and are either the item size or 0
+   for a value broadcast to the whole array.  'b' is ignored by the unary
+   operations. */
+void pypy_numpy_parallel_op(int op, int type, Signed n,
+                            char *a, Signed astride, char *b, Signed bstride,
+                            char *out, int nthreads)
+{
+    struct chunk_s chunks[MAX_THREADS];
+    Signed step, start;
+    int i, count;
+#ifndef _WIN32
+    pthread_t threads[MAX_THREADS];
+    int started[MAX_THREADS];
+#endif
+
+    if (nthreads > MAX_THREADS)
+        nthreads = MAX_THREADS;
+    if (nthreads < 1)
+        nthreads = 1;
+    step = (n + nthreads - 1) / nthreads;
+    step = (step + CHUNK_ALIGN - 1) / CHUNK_ALIGN * CHUNK_ALIGN;
+
+    count = 0;
+    for (start = 0; start < n; start += step) {
+        struct chunk_s *c = &chunks[count++];
+        c->op = op;
+        c->type = type;
+        c->start = start;
+        c->stop = (n - start > step) ? start + step : n;
+        c->a = a;
+        c->b = b;
+        c->out = out;
+        c->astride = astride;
+        c->bstride = bstride;
+    }
+
+#ifndef _WIN32
+    /* the first chunk runs in the calling thread; if a thread cannot
+       be started, its chunk runs there too */
+    for (i = 1; i < count; i++)
+        started[i] = pthread_create(&threads[i], NULL, thread_main,
+                                    &chunks[i]) == 0;
+    run_chunk(&chunks[0]);
+    for (i = 1; i < count; i++) {
+        if (started[i])
+            pthread_join(threads[i], NULL);
+        else
+            run_chunk(&chunks[i]);
+    }
+#else
+    for (i = 0; i < count; i++)
+        run_chunk(&chunks[i]);
+#endif
+}
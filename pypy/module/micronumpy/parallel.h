@@ -0,0 +1,17 @@
+/* element types */
+#define PYPY_NUMPY_FLOAT64   0
+#define PYPY_NUMPY_FLOAT32   1
+#define PYPY_NUMPY_INT64     2
+#define PYPY_NUMPY_INT32     3
+#define PYPY_NUMPY_UINT64    4
+#define PYPY_NUMPY_UINT32    5
+
+/* operations */
+#define PYPY_NUMPY_ADD       0
+#define PYPY_NUMPY_SUB       1
+#define PYPY_NUMPY_MUL       2
+#define PYPY_NUMPY_NEG       3
+#define PYPY_NUMPY_ABS       4
+
+RPY_EXTERN void pypy_numpy_parallel_op(int, int, Signed, char *, Signed,
+                                       char *, Signed, char *, int);
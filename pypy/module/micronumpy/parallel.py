@@ -0,0 +1,191 @@
+"""
+Multithreaded execution of simple element-wise ufuncs on large arrays.
+
+When enabled with set_ufunc_threads(), add, subtract, multiply, negative
+and absolute on contiguous, native-endian arrays of at least 'min_size'
+elements are computed by the C loops in parallel.c, split into chunks
+that run in several OS threads with the GIL released.  The results are
+the same as the ones of the serial loops in loop.py.
+"""
+import py
+
+from rpython.rlib import jit
+from rpython.rlib.objectmodel import keepalive_until_here
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.translator import cdir
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
+
+from pypy.interpreter.error import oefmt
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.module.micronumpy import constants as NPY
+
+cwd = py.path.local(__file__).dirpath()
+eci = ExternalCompilationInfo(
+    includes=[cwd.join('parallel.h')],
+    include_dirs=[str(cwd), cdir],
+    separate_module_files=[cwd.join('parallel.c')])
+
+pypy_numpy_parallel_op = rffi.llexternal(
+    'pypy_numpy_parallel_op',
+    [rffi.INT, rffi.INT, lltype.Signed, rffi.CCHARP, lltype.Signed,
+     rffi.CCHARP, lltype.Signed, rffi.CCHARP, rffi.INT],
+    lltype.Void, compilation_info=eci, releasegil=True, sandboxsafe=True)
+
+# keep in sync with parallel.h
+FLOAT64, FLOAT32, INT64, INT32, UINT64, UINT32 = range(6)
+ADD, SUB, MUL, NEG, ABS = range(5)
+
+BINARY_OPS = {'add': ADD, 'subtract': SUB, 'multiply': MUL}
+UNARY_OPS = {'negative': NEG, 'absolute': ABS}
+
+MAX_THREADS = 64
+DEFAULT_MIN_SIZE = 1 << 20
+
+
+class ParallelSettings(object):
+    def __init__(self, space):
+        self.nthreads = 1
+        self.min_size = DEFAULT_MIN_SIZE
+
+def get_settings(space):
+    return space.fromcache(ParallelSettings)
+
+
+@unwrap_spec(nthreads=int, min_size=int)
+def set_ufunc_threads(space, nthreads, min_size=DEFAULT_MIN_SIZE):
+    """set_ufunc_threads(nthreads, min_size=1048576)
+
+    Compute add, subtract, multiply, negative and absolute on contiguous
+    integer and float arrays of at least min_size elements in nthreads
+    threads, with the GIL released.  nthreads=1 (the default) disables
+    this.
+    """
+    if not 1 <= nthreads <= MAX_THREADS:
+        raise oefmt(space.w_ValueError,
+                    "nthreads must be between 1 and %d", MAX_THREADS)
+    if min_size < 0:
+        raise oefmt(space.w_ValueError, "min_size must be >= 0")
+    settings = get_settings(space)
+    settings.nthreads = nthreads
+    settings.min_size = min_size
+
+def get_ufunc_threads(space):
+    """get_ufunc_threads() -> (nthreads, min_size)"""
+    settings = get_settings(space)
+    return space.newtuple([space.newint(settings.nthreads),
+                           space.newint(settings.min_size)])
+
+
+def _type_code(dtype):
+    if not dtype.is_native():
+        return -1
+    if dtype.kind == NPY.FLOATINGLTR:
+        if dtype.elsize == 8:
+            return FLOAT64
+        if dtype.elsize == 4:
+            return FLOAT32
+    elif dtype.kind == NPY.SIGNEDLTR:
+        if dtype.elsize == 8:
+            return INT64
+        if dtype.elsize == 4:
+            return INT32
+    elif dtype.kind == NPY.UNSIGNEDLTR:
+        if dtype.elsize == 8:
+            return UINT64
+        if dtype.elsize == 4:
+            return UINT32
+    return -1
+
+def _address(impl):
+    return rffi.cast(lltype.Signed, impl.storage) + impl.start
+
+def _stride(w_arr, shape, type_code):
+    """The stride to use for the operand 'w_arr', or -1 if it cannot be
+    handled by the C loops."""
+    impl = w_arr.implementation
+    if _type_code(impl.dtype) != type_code:
+        return -1
+    if w_arr.get_size() == 1:
+        return 0
+    if (impl.flags & NPY.ARRAY_C_CONTIGUOUS and
+            impl.get_shape() == shape):
+        return impl.dtype.elsize
+    return -1
+
+def _overlaps(w_out, out_stride, w_arr, stride, size):
+    # writing in place, element by element, is fine; any other overlap
+    # would make the result depend on the order in which the chunks run
+    out_start = _address(w_out.implementation)
+    start = _address(w_arr.implementation)
+    if start == out_start and stride == out_stride:
+        return False
+    elsize = w_out.get_dtype().elsize
+    out_stop = out_start + (size - 1) * out_stride + elsize
+    stop = start + (size - 1) * stride + elsize
+    return start < out_stop and out_start < stop
+
+@jit.dont_look_inside
+def _run(space, op, shape, calc_dtype, w_lhs, w_rhs, w_out):
+    settings = get_settings(space)
+    size = w_out.get_size()
+    if size < settings.min_size or size < 2:
+        return False
+    # no casts: the operands and the result all have the type in which
+    # the ufunc is computed
+    type_code = _type_code(calc_dtype)
+    if type_code < 0:
+        return False
+    out_stride = _stride(w_out, shape, type_code)
+    if out_stride <= 0:
+        return False
+    lstride = _stride(w_lhs, shape, type_code)
+    if lstride < 0:
+        return False
+    rstride = 0
+    if w_rhs is not None:
+        rstride = _stride(w_rhs, shape, type_code)
+        if rstride < 0:
+            return False
+    if _overlaps(w_out, out_stride, w_lhs, lstride, size):
+        return False
+    if w_rhs is not None and _overlaps(w_out, out_stride, w_rhs, rstride,
+                                       size):
+        return False
+    lhs_impl = w_lhs.implementation
+    rhs_impl = lhs_impl
+    if w_rhs is not None:
+        rhs_impl = w_rhs.implementation
+    out_impl = w_out.implementation
+    pypy_numpy_parallel_op(
+        rffi.cast(rffi.INT, op), rffi.cast(rffi.INT, type_code), size,
+        rffi.ptradd(rffi.cast(rffi.CCHARP, lhs_impl.storage), lhs_impl.start),
+        lstride,
+        rffi.ptradd(rffi.cast(rffi.CCHARP, rhs_impl.storage), rhs_impl.start),
+        rstride,
+        rffi.ptradd(rffi.cast(rffi.CCHARP, out_impl.storage), out_impl.start),
+        rffi.cast(rffi.INT, settings.nthreads))
+    keepalive_until_here(lhs_impl)
+    keepalive_until_here(rhs_impl)
+    keepalive_until_here(out_impl)
+    return True
+
+def call2(space, name, shape, calc_dtype, w_lhs, w_rhs, w_out):
+    """Compute the binary ufunc 'name' with the C loops if possible.
+    Returns False if the serial loop must be used instead."""
+    if get_settings(space).nthreads <= 1:
+        return False
+    try:
+        op = BINARY_OPS[name]
+    except KeyError:
+        return False
+    return _run(space, op, shape, calc_dtype, w_lhs, w_rhs, w_out)
+
+def call1(space, name, shape, calc_dtype, w_obj, w_out):
+    """Like call2() for the unary ufunc 'name'."""
+    if get_settings(space).nthreads <= 1:
+        return False
+    try:
+        op = UNARY_OPS[name]
+    except KeyError:
+        return False
+    return _run(space, op, shape, calc_dtype, w_obj, None, w_out)
@@ -1,7 +1,8 @@
-from pypy.interpreter.error import oefmt
+from pypy.interpreter.error import OperationError, oefmt
 from rpython.rlib.listsort import make_timsort_class
+from rpython.rlib.longlong2float import float2longlong
 from rpython.rlib.objectmodel import specialize
-from rpython.rlib.rarithmetic import widen
+from rpython.rlib.rarithmetic import widen, intmask, r_ulonglong
 from rpython.rlib.rawstorage import raw_storage_getitem, raw_storage_setitem, \
         free_raw_storage, alloc_raw_storage
 from rpython.rlib.unroll import unrolling_iterable
@@ -15,7 +16,271 @@ INT_SIZE = rffi.sizeof(lltype.Signed)
 all_types = (types.all_float_types + types.all_complex_types +
              types.all_int_types)
 all_types = [i for i in all_types if not issubclass(i[0], types.Float16)]
+# the numeric types that also have the list based sorts and partitions
+fast_types = [i for i in all_types if i[1] != 'complex']
 all_types = unrolling_iterable(all_types)
+fast_types = unrolling_iterable(fast_types)
+
+# below this size the stable kind uses timsort rather than a radix sort
+RADIX_MIN = 1024
+# slices of at most this size are finished with an insertion sort
+SMALL_SORT = 16
+
+
+def _depth_limit(n):
+    depth = 0
+    while n > 1:
+        depth += 2
+        n >>= 1
+    return depth
+
+def _radix_order(keys, nbytes):
+    """Stable LSD radix sort of the unsigned 'keys' on their low 'nbytes'
+    bytes.  Returns the permutation that sorts them."""
+    n = len(keys)
+    counts = [0] * (nbytes * 256)
+    for key in keys:
+        for b in range(nbytes):
+            counts[b * 256 + intmask((key >> (8 * b)) & 0xff)] += 1
+    order = range(n)
+    tmp_keys = [r_ulonglong(0)] * n
+    tmp_order = [0] * n
+    for b in range(nbytes):
+        base = b * 256
+        shift = 8 * b
+        # nothing to do if all keys have the same byte here
+        if counts[base + intmask((keys[0] >> shift) & 0xff)] == n:
+            continue
+        total = 0
+        for d in range(256):
+            c = counts[base + d]
+            counts[base + d] = total
+            total += c
+        for i in range(n):
+            key = keys[i]
+            d = base + intmask((key >> shift) & 0xff)
+            pos = counts[d]
+            counts[d] = pos + 1
+            tmp_keys[pos] = key
+            tmp_order[pos] = order[i]
+        keys, tmp_keys = tmp_keys, keys
+        order, tmp_order = tmp_order, order
+    return order
+
+SIGN_BIT = r_ulonglong(1) << 63
+
+def _float_radix_key(v):
+    # maps the order of arg_lt() on floats to the one of unsigned ints
+    if v != v:
+        return r_ulonglong(-1)
+    if v == 0.0:
+        return SIGN_BIT      # -0.0 == 0.0
+    bits = r_ulonglong(float2longlong(v))
+    if v < 0.0:
+        return ~bits
+    return bits | SIGN_BIT
+
+
+def make_list_sorts(radix_key, nbytes):
+    """Sorting and selection on RPython lists of widened values, with an
+    optional list of indexes that is permuted along.  The order is the one
+    of arg_lt() below: NaNs go to the end.  They are built once per item
+    type, so that each copy is annotated with lists of that type."""
+    def lt(a, b):
+        return a < b or b != b and a == a
+
+    @specialize.argtype(1)
+    def swap(values, indexes, i, j):
+        values[i], values[j] = values[j], values[i]
+        if indexes is not None:
+            indexes[i], indexes[j] = indexes[j], indexes[i]
+
+    @specialize.argtype(1)
+    def insertion_sort(values, indexes, lo, hi):
+        for i in range(lo + 1, hi):
+            v = values[i]
+            k = 0
+            if indexes is not None:
+                k = indexes[i]
+            j = i
+            while j > lo and lt(v, values[j - 1]):
+                values[j] = values[j - 1]
+                if indexes is not None:
+                    indexes[j] = indexes[j - 1]
+                j -= 1
+            values[j] = v
+            if indexes is not None:
+                indexes[j] = k
+
+    @specialize.argtype(1)
+    def sift_down(values, indexes, lo, root, n):
+        while True:
+            child = 2 * root + 1
+            if child >= n:
+                break
+            if (child + 1 < n and
+                    lt(values[lo + child], values[lo + child + 1])):
+                child += 1
+            if not lt(values[lo + root], values[lo + child]):
+                break
+            swap(values, indexes, lo + root, lo + child)
+            root = child
+
+    @specialize.argtype(1)
+    def heapsort(values, indexes, lo, hi):
+        n = hi - lo
+        root = n // 2 - 1
+        while root >= 0:
+            sift_down(values, indexes, lo, root, n)
+            root -= 1
+        end = n - 1
+        while end > 0:
+            swap(values, indexes, lo, lo + end)
+            sift_down(values, indexes, lo, 0, end)
+            end -= 1
+
+    @specialize.argtype(1)
+    def partition(values, indexes, lo, hi):
+        """Partition values[lo:hi] around a median of three and return the
+        final position of the pivot.  Needs at least 4 items."""
+        mid = lo + ((hi - lo) >> 1)
+        last = hi - 1
+        if lt(values[mid], values[lo]):
+            swap(values, indexes, mid, lo)
+        if lt(values[last], values[mid]):
+            swap(values, indexes, last, mid)
+        if lt(values[mid], values[lo]):
+            swap(values, indexes, mid, lo)
+        # values[lo] and values[last] now stop the scans below
+        swap(values, indexes, mid, last - 1)
+        pivot = values[last - 1]
+        i = lo
+        j = last - 1
+        while True:
+            i += 1
+            while lt(values[i], pivot):
+                i += 1
+            j -= 1
+            while lt(pivot, values[j]):
+                j -= 1
+            if i >= j:
+                break
+            swap(values, indexes, i, j)
+        swap(values, indexes, i, last - 1)
+        return i
+
+    @specialize.argtype(1)
+    def introsort(values, indexes, lo, hi, depth):
+        while hi - lo > SMALL_SORT:
+            if depth == 0:
+                heapsort(values, indexes, lo, hi)
+                return
+            depth -= 1
+            p = partition(values, indexes, lo, hi)
+            # recurse into the smaller half to bound the stack depth
+            if p - lo < hi - p:
+                introsort(values, indexes, lo, p, depth)
+                lo = p + 1
+            else:
+                introsort(values, indexes, p + 1, hi, depth)
+                hi = p
+        insertion_sort(values, indexes, lo, hi)
+
+    @specialize.argtype(1)
+    def introselect(values, indexes, lo, hi, kth):
+        """Move the kth item of values[lo:hi] in its sorted place, with
+        smaller items before it and larger ones after it."""
+        depth = _depth_limit(hi - lo)
+        while hi - lo > SMALL_SORT:
+            if depth == 0:
+                heapsort(values, indexes, lo, hi)
+                return
+            depth -= 1
+            p = partition(values, indexes, lo, hi)
+            if p == kth:
+                return
+            elif kth < p:
+                hi = p
+            else:
+                lo = p + 1
+        insertion_sort(values, indexes, lo, hi)
+
+    @specialize.argtype(2)
+    def sort_lists(kind, values, indexes):
+        """Sort the non-empty list 'values' (and 'indexes' along) with the
+        given kind.  Returns the sorted lists."""
+        n = len(values)
+        if kind == NPY.STABLESORT:
+            order = _radix_order([radix_key(v) for v in values], nbytes)
+            values = [values[i] for i in order]
+            if indexes is not None:
+                indexes = [indexes[i] for i in order]
+        elif kind == NPY.HEAPSORT:
+            heapsort(values, indexes, 0, n)
+        else:
+            introsort(values, indexes, 0, n, _depth_limit(n))
+        return values, indexes
+
+    return sort_lists, introselect
+
+
+def make_list_functions(itemtype, comp_type):
+    """Functions to copy a strided slice of raw storage to a list of
+    widened values and back, and to sort and partition these lists."""
+    TP = itemtype.T
+    step = rffi.sizeof(TP)
+    if comp_type == 'float':
+        nbytes = 8
+        radix_key = _float_radix_key
+    else:
+        nbytes = step
+        if itemtype.kind == NPY.SIGNEDLTR:
+            bias = r_ulonglong(1) << (8 * step - 1)
+        else:
+            bias = r_ulonglong(0)
+        # only the low 'nbytes' bytes of the key are looked at
+        def radix_key(v):
+            return r_ulonglong(v) ^ bias
+
+    def load(storage, start, stride, size):
+        if comp_type == 'int':
+            return [widen(raw_storage_getitem(TP, storage, start + i * stride))
+                    for i in range(size)]
+        else:
+            return [float(raw_storage_getitem(TP, storage, start + i * stride))
+                    for i in range(size)]
+
+    def store(values, storage, start, stride):
+        for i in range(len(values)):
+            raw_storage_setitem(storage, start + i * stride,
+                                rffi.cast(TP, values[i]))
+
+    def store_indexes(indexes, storage, start, stride):
+        for i in range(len(indexes)):
+            raw_storage_setitem(storage, start + i * stride, indexes[i])
+
+    sort_lists, introselect = make_list_sorts(radix_key, nbytes)
+    return load, store, store_indexes, sort_lists, introselect
+
+
+def get_axis(space, arr, w_axis):
+    """Returns the array to work on and the normalized axis."""
+    if w_axis is space.w_None:
+        # note that it's fine to pass None here as we're not going
+        # to pass the result around (None is the link to base in slices)
+        if arr.get_size() > 0:
+            arr = arr.reshape(None, [arr.get_size()])
+        axis = 0
+    elif w_axis is None:
+        axis = -1
+    else:
+        axis = space.int_w(w_axis)
+    shape = arr.get_shape()
+    if axis < 0:
+        axis = len(shape) + axis
+    if axis < 0 or axis >= len(shape):
+        raise oefmt(space.w_IndexError, "Wrong axis %d", axis)
+    return arr, axis
 
 
 def make_argsort_function(space, itemtype, comp_type, count=1):
@@ -120,33 +385,38 @@ def make_argsort_function(space, itemtype, comp_type, count=1):
     ArgSort = make_timsort_class(arg_getitem, arg_setitem, arg_length,
                                  arg_getitem_slice, arg_lt)
 
-    def argsort(arr, space, w_axis):
-        if w_axis is space.w_None:
-            # note that it's fine ot pass None here as we're not going
-            # to pass the result around (None is the link to base in slices)
-            if arr.get_size() > 0:
-                arr = arr.reshape(None, [arr.get_size()])
-            axis = 0
-        elif w_axis is None:
-            axis = -1
+    if count < 2:
+        load, store, store_indexes, sort_lists, _ = make_list_functions(
+            itemtype, comp_type)
+    else:
+        load = store = store_indexes = sort_lists = None
+
+    def argsort_slice(kind, storage, start, stride_size, size,
+                      index_storage, index_start, index_stride_size):
+        if count < 2 and size > 0 and (kind != NPY.STABLESORT or
+                                       size >= RADIX_MIN):
+            values = load(storage, start, stride_size, size)
+            values, indexes = sort_lists(kind, values, range(size))
+            store_indexes(indexes, index_storage, index_start,
+                          index_stride_size)
         else:
-            axis = space.int_w(w_axis)
+            for i in range(size):
+                raw_storage_setitem(index_storage, i * index_stride_size +
+                                    index_start, i)
+            r = Repr(index_stride_size, stride_size, size, storage,
+                     index_storage, index_start, start)
+            ArgSort(r).sort()
+
+    def argsort(arr, space, w_axis, kind):
+        arr, axis = get_axis(space, arr, w_axis)
         # create array of indexes
         dtype = descriptor.get_dtype_cache(space).w_longdtype
         index_arr = W_NDimArray.from_shape(space, arr.get_shape(), dtype)
         with index_arr.implementation as storage, arr as arr_storage:
             if len(arr.get_shape()) == 1:
-                for i in range(arr.get_size()):
-                    raw_storage_setitem(storage, i * INT_SIZE, i)
-                r = Repr(INT_SIZE, arr.strides[0], arr.get_size(), arr_storage,
-                         storage, 0, arr.start)
-                ArgSort(r).sort()
+                argsort_slice(kind, arr_storage, arr.start, arr.strides[0],
+                              arr.get_size(), storage, 0, INT_SIZE)
             else:
-                shape = arr.get_shape()
-                if axis < 0:
-                    axis = len(shape) + axis
-                if axis < 0 or axis >= len(shape):
-                    raise oefmt(space.w_IndexError, "Wrong axis %d", axis)
                 arr_iter = AllButAxisIter(arr, axis)
                 arr_state = arr_iter.reset()
                 index_impl = index_arr.implementation
@@ -156,12 +426,9 @@ def make_argsort_function(space, itemtype, comp_type, count=1):
                 index_stride_size = index_impl.strides[axis]
                 axis_size = arr.shape[axis]
                 while not arr_iter.done(arr_state):
-                    for i in range(axis_size):
-                        raw_storage_setitem(storage, i * index_stride_size +
-                                            index_state.offset, i)
-                    r = Repr(index_stride_size, stride_size, axis_size,
-                         arr_storage, storage, index_state.offset, arr_state.offset)
-                    ArgSort(r).sort()
+                    argsort_slice(kind, arr_storage, arr_state.offset,
+                                  stride_size, axis_size, storage,
+                                  index_state.offset, index_stride_size)
                     arr_state = arr_iter.next(arr_state)
                     index_state = index_iter.next(index_state)
             return index_arr
@@ -169,12 +436,12 @@ def make_argsort_function(space, itemtype, comp_type, count=1):
     return argsort
 
 
-def argsort_array(arr, space, w_axis):
+def argsort_array(arr, space, w_axis, kind):
     cache = space.fromcache(ArgSortCache) # that populates ArgSortClasses
     itemtype = arr.dtype.itemtype
     for tp in all_types:
         if isinstance(itemtype, tp[0]):
-            return cache._lookup(tp)(arr, space, w_axis)
+            return cache._lookup(tp)(arr, space, w_axis, kind)
     # XXX this should probably be changed
     raise oefmt(space.w_NotImplementedError,
                 "sorting of non-numeric types '%s' is not implemented",
@@ -271,40 +538,42 @@ def make_sort_function(space, itemtype, comp_type, count=1):
     ArgSort = make_timsort_class(arg_getitem, arg_setitem, arg_length,
                                  arg_getitem_slice, arg_lt)
 
-    def sort(arr, space, w_axis):
-        if w_axis is space.w_None:
-            # note that it's fine to pass None here as we're not going
-            # to pass the result around (None is the link to base in slices)
-            arr = arr.reshape(None, [arr.get_size()])
-            axis = 0
-        elif w_axis is None:
-            axis = -1
+    if count < 2:
+        load, store, store_indexes, sort_lists, _ = make_list_functions(
+            itemtype, comp_type)
+    else:
+        load = store = store_indexes = sort_lists = None
+
+    def sort_slice(kind, storage, start, stride_size, size):
+        if count < 2 and size > 0 and (kind != NPY.STABLESORT or
+                                       size >= RADIX_MIN):
+            values = load(storage, start, stride_size, size)
+            values, _ = sort_lists(kind, values, None)
+            store(values, storage, start, stride_size)
         else:
-            axis = space.int_w(w_axis)
+            r = Repr(stride_size, size, storage, start)
+            ArgSort(r).sort()
+
+    def sort(arr, space, w_axis, kind):
+        arr, axis = get_axis(space, arr, w_axis)
         with arr as storage:
             if len(arr.get_shape()) == 1:
-                r = Repr(arr.strides[0], arr.get_size(), storage,
-                         arr.start)
-                ArgSort(r).sort()
+                sort_slice(kind, storage, arr.start, arr.strides[0],
+                           arr.get_size())
             else:
-                shape = arr.get_shape()
-                if axis < 0:
-                    axis = len(shape) + axis
-                if axis < 0 or axis >= len(shape):
-                    raise oefmt(space.w_IndexError, "Wrong axis %d", axis)
                 arr_iter = AllButAxisIter(arr, axis)
                 arr_state = arr_iter.reset()
                 stride_size = arr.strides[axis]
                 axis_size = arr.shape[axis]
                 while not arr_iter.done(arr_state):
-                    r = Repr(stride_size, axis_size, storage, arr_state.offset)
-                    ArgSort(r).sort()
+                    sort_slice(kind, storage, arr_state.offset, stride_size,
+                               axis_size)
                     arr_state = arr_iter.next(arr_state)
 
     return sort
 
 
-def sort_array(arr, space, w_axis, w_order):
+def sort_array(arr, space, w_axis, w_order, kind):
     cache = space.fromcache(SortCache)  # that populates SortClasses
     itemtype = arr.dtype.itemtype
     if arr.dtype.byteorder == NPY.OPPBYTE:
@@ -312,13 +581,107 @@ def sort_array(arr, space, w_axis, w_order):
                     "sorting of non-native byteorder not supported yet")
     for tp in all_types:
         if isinstance(itemtype, tp[0]):
-            return cache._lookup(tp)(arr, space, w_axis)
+            return cache._lookup(tp)(arr, space, w_axis, kind)
     # XXX this should probably be changed
     raise oefmt(space.w_NotImplementedError,
                 "sorting of non-numeric types '%s' is not implemented",
                 arr.dtype.get_name())
 
 
+def make_partition_function(space, itemtype, comp_type):
+    load, store, store_indexes, _, introselect = make_list_functions(
+        itemtype, comp_type)
+
+    def partition_slice(kths, storage, start, stride_size, size,
+                        index_storage, index_start, index_stride_size, arg):
+        values = load(storage, start, stride_size, size)
+        indexes = None
+        if arg:
+            indexes = range(size)
+        # the kths are sorted, each one is selected among the items
+        # after the previous one
+        lo = 0
+        for kth in kths:
+            introselect(values, indexes, lo, size, kth)
+            lo = kth + 1
+        if arg:
+            store_indexes(indexes, index_storage, index_start,
+                          index_stride_size)
+        else:
+            store(values, storage, start, stride_size)
+
+    def partition(arr, space, w_kth, w_axis, arg):
+        arr, axis = get_axis(space, arr, w_axis)
+        axis_size = arr.get_shape()[axis]
+        kths = get_kths(space, w_kth, axis_size)
+        index_arr = None
+        if arg:
+            dtype = descriptor.get_dtype_cache(space).w_longdtype
+            index_arr = W_NDimArray.from_shape(space, arr.get_shape(), dtype)
+            index_impl = index_arr.implementation
+        else:
+            index_impl = arr
+        with index_impl as index_storage, arr as storage:
+            arr_iter = AllButAxisIter(arr, axis)
+            arr_state = arr_iter.reset()
+            index_iter = AllButAxisIter(index_impl, axis)
+            index_state = index_iter.reset()
+            stride_size = arr.strides[axis]
+            index_stride_size = index_impl.strides[axis]
+            while not arr_iter.done(arr_state):
+                partition_slice(kths, storage, arr_state.offset, stride_size,
+                                axis_size, index_storage, index_state.offset,
+                                index_stride_size, arg)
+                arr_state = arr_iter.next(arr_state)
+                index_state = index_iter.next(index_state)
+        return index_arr
+
+    return partition
+
+
+def get_kths(space, w_kth, size):
+    """The sorted list of the kth items to partition on."""
+    try:
+        kths_w = space.fixedview(w_kth)
+    except OperationError as e:
+        if not e.match(space, space.w_TypeError):
+            raise
+        kths_w = [w_kth]
+    kths = []
+    for w_k in kths_w:
+        k = space.int_w(space.index(w_k))
+        if k < 0:
+            k += size
+        if k < 0 or k >= size:
+            raise oefmt(space.w_ValueError, "kth(=%d) out of bounds (%d)",
+                        space.int_w(space.index(w_k)), size)
+        kths.append(k)
+    kths.sort()
+    return kths
+
+
+def can_partition(dtype):
+    if not dtype.is_native():
+        return False
+    for tp in fast_types:
+        if isinstance(dtype.itemtype, tp[0]):
+            return True
+    return False
+
+
+def partition_array(arr, space, w_kth, w_axis, arg):
+    """Partition 'arr' in-place, or return the array of indexes that
+    partitions it if 'arg' is True.  The dtype must pass can_partition()."""
+    cache = space.fromcache(PartitionCache)
+    itemtype = arr.dtype.itemtype
+    for tp in fast_types:
+        if isinstance(itemtype, tp[0]):
+            return cache._lookup(tp)(arr, space, w_kth, w_axis, arg)
+    raise oefmt(space.w_NotImplementedError,
+                "partition of '%s' is not implemented",
+                arr.dtype.get_name())
+
+
 class ArgSortCache(object):
     built = False
 
@@ -351,3 +714,17 @@ class SortCache(object):
                 cache[cls] = make_sort_function(space, cls, it)
         self.cache = cache
         self._lookup = specialize.memo()(lambda tp: cache[tp[0]])
+
+
+class PartitionCache(object):
+    built = False
+
+    def __init__(self, space):
+        if self.built:
+            return
+        self.built = True
+        cache = {}
+        for cls, it in fast_types._items:
+            cache[cls] = make_partition_function(space, cls, it)
+        self.cache = cache
+        self._lookup = specialize.memo()(lambda tp: cache[tp[0]])
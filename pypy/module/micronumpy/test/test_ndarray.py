@@ -4476,3 +4476,65 @@ class AppTestPyPy(BaseNumpyAppTest):
         a = ndarray._from_shape_and_storage((2,), addr, int, sz,
                                            strides=[2 * base.strides[0]])
         assert a[1] == 3
+
+
+class AppTestCffiStruct(BaseNumpyAppTest):
+    spaceconfig = dict(usemodules=["micronumpy", "_cffi_backend"])
+
+    def test_dtype_from_ctype(self):
+        import numpy as np
+        import _cffi_backend as B
+        BInt = B.new_primitive_type("int")
+        BDouble = B.new_primitive_type("double")
+        BCharArray = B.new_array_type(
+            B.new_pointer_type(B.new_primitive_type("char")), 3)
+        BStruct = B.new_struct_type("struct point")
+        B.complete_struct_or_union(BStruct, [('x', BInt, -1),
+                                             ('y', BDouble, -1),
+                                             ('tag', BCharArray, -1)])
+        dt = np.dtype(BStruct)
+        assert dt.names == ('x', 'y', 'tag')
+        assert dt.itemsize == B.sizeof(BStruct)
+        assert dt.fields['x'] == (np.dtype('i4'), 0)
+        assert dt.fields['y'] == (np.dtype('f8'), B.typeoffsetof(BStruct, 'y')[1])
+        assert dt.fields['tag'][0].shape == (3,)
+        assert np.dtype(BDouble) == np.dtype('f8')
+        #
+        BBits = B.new_struct_type("struct bits")
+        B.complete_struct_or_union(BBits, [('a', BInt, 3)])
+        raises(TypeError, np.dtype, BBits)
+        raises(TypeError, np.dtype, B.new_pointer_type(BInt))
+
+    def test_frombuffer_cdata(self):
+        import numpy as np
+        import _cffi_backend as B
+        BInt = B.new_primitive_type("int")
+        BDouble = B.new_primitive_type("double")
+        BStruct = B.new_struct_type("struct point")
+        B.complete_struct_or_union(BStruct, [('x', BInt, -1),
+                                             ('y', BDouble, -1)])
+        BStructPtr = B.new_pointer_type(BStruct)
+        p = B.newp(B.new_array_type(BStructPtr, 4), None)
+        p[2].x = 42
+        p[2].y = 1.5
+        a = np.frombuffer(p)
+        assert a.base is p
+        assert a.shape == (4,)
+        assert a.dtype == np.dtype(BStruct)
+        assert a[2]['x'] == 42
+        assert a[2]['y'] == 1.5
+        # no copy
+        a[1]['x'] = -7
+        assert p[1].x == -7
+        # a pointer gives a view of the single item it points to
+        q = B.newp(BStructPtr, [5, 2.5])
+        b = np.frombuffer(q)
+        assert b.shape == (1,)
+        assert b[0]['x'] == 5
+        assert np.frombuffer(p, 'i4', count=2)[0] == 0
+        # and the other way around, without copy either
+        r = B.from_buffer(B.new_array_type(BStructPtr, None), a)
+        assert len(r) == 4
+        assert r[2].x == 42
+        r[3].y = 4.25
+        assert a[3]['y'] == 4.25
@@ -0,0 +1,135 @@
+from pypy.module.micronumpy.test.test_base import BaseNumpyAppTest
+
+
+class AppTestParallel(BaseNumpyAppTest):
+    def setup_method(self, meth):
+        self.space.appexec([], """():
+            from _numpypy.multiarray import set_ufunc_threads
+            set_ufunc_threads(1)
+        """)
+
+    def test_settings(self):
+        from _numpypy.multiarray import set_ufunc_threads, get_ufunc_threads
+        assert get_ufunc_threads() == (1, 1 << 20)
+        set_ufunc_threads(4, 1000)
+        assert get_ufunc_threads() == (4, 1000)
+        raises(ValueError, set_ufunc_threads, 0)
+        raises(ValueError, set_ufunc_threads, 1000)
+        raises(ValueError, set_ufunc_threads, 2, -1)
+
+    def test_same_results(self):
+        import numpy as np
+        from _numpypy.multiarray import set_ufunc_threads
+        def compute(dtype):
+            a = np.arange(-500, 500, dtype=dtype) * 3
+            b = np.arange(1000, dtype=dtype)[::-1].copy()
+            c = a.copy()
+            c += b
+            return [a + b, a - b, a * b, a * 7, 7 - a, -a, abs(a),
+                    np.negative(b), c]
+        for dtype in ['float64', 'float32', 'int64', 'int32',
+                      'uint64', 'uint32']:
+            set_ufunc_threads(1)
+            expected = compute(dtype)
+            set_ufunc_threads(3, 10)
+            got = compute(dtype)
+            for x, y in zip(expected, got):
+                assert x.dtype == y.dtype
+                assert (x == y).all()
+        set_ufunc_threads(3, 10)
+        a = np.array([1e300, -0.0, float('nan'), 1.5] * 10)
+        b = a * a
+        assert b[0] == float('inf')
+        assert np.isnan(b[2])
+        assert b[3] == 2.25
+        x = np.array([-2**31] * 20, dtype='int32')
+        assert (abs(x) == x).all()
+        assert (-x == x).all()
+        y = np.array([2**62] * 20, dtype='int64')
+        assert ((y * 4) == 0).all()
+
+    def test_fallbacks(self):
+        import numpy as np
+        from _numpypy.multiarray import set_ufunc_threads
+        def compute():
+            res = []
+            # overlapping input and output
+            a = np.arange(50.0)
+            np.add(a[:-1], 1.0, out=a[1:])
+            res.append(a)
+            b = np.arange(50.0)
+            np.add(b[1:], b[:-1], out=b[:-1])
+            res.append(b)
+            # a broadcast operand at the start of the output
+            b = np.arange(50.0)
+            np.add(b[:1], b, out=b)
+            res.append(b)
+            # an operand at the start of an output with another stride
+            b = np.arange(100.0)
+            np.add(b[:50], 1.0, out=b[::2])
+            res.append(b)
+            # strided, mixed types, non-native byte order, booleans
+            c = np.arange(100.0)
+            res.append(c[::2] + c[::2])
+            res.append(np.arange(50) + np.arange(50.0))
+            d = np.arange(50, dtype='>i4')
+            res.append(d + d)
+            e = np.arange(50) % 3 == 0
+            res.append(e + e)
+            return res
+        set_ufunc_threads(1)
+        expected = compute()
+        set_ufunc_threads(3, 10)
+        got = compute()
+        for x, y in zip(expected, got):
+            assert x.dtype == y.dtype
+            assert (x == y).all()
+
+
+class TestParallel(object):
+    spaceconfig = dict(usemodules=['micronumpy'])
+
+    def test_call2_is_used(self):
+        from pypy.module.micronumpy import parallel
+        space = self.space
+        w_a, w_b, w_out, w_strided, w_big = space.fixedview(space.appexec(
+            [], """():
+            from _numpypy.multiarray import arange, empty
+            a = arange(100.0)
+            return a, a * 2, empty(100), arange(200.0)[::2], arange(200.0)
+        """))
+        dtype = w_a.get_dtype()
+        shape = w_a.get_shape()
+        settings = parallel.get_settings(space)
+        settings.nthreads, settings.min_size = 4, 10
+        try:
+            assert parallel.call2(space, 'add', shape, dtype,
+                                  w_a, w_b, w_out)
+            assert space.float_w(space.getitem(w_out, space.wrap(99))) == 297.0
+            assert not parallel.call2(space, 'divide', shape, dtype,
+                                      w_a, w_b, w_out)
+            assert not parallel.call2(space, 'add', shape, dtype,
+                                      w_a, w_strided, w_out)
+            # in place is fine
+            assert parallel.call2(space, 'add', shape, dtype,
+                                  w_a, w_b, w_a)
+            # a broadcast element of the output, or an operand that starts
+            # with the output but has another stride
+            w_first = space.getitem(w_a, space.newslice(
+                space.w_None, space.newint(1), space.w_None))
+            assert not parallel.call2(space, 'add', shape, dtype,
+                                      w_first, w_b, w_a)
+            w_head = space.getitem(w_big, space.newslice(
+                space.w_None, space.newint(100), space.w_None))
+            w_every_other = space.getitem(w_big, space.newslice(
+                space.w_None, space.w_None, space.newint(2)))
+            assert not parallel.call2(space, 'add', shape, dtype,
+                                      w_head, w_b, w_every_other)
+            assert not parallel.call2(space, 'add', shape, dtype,
+                                      w_every_other, w_b, w_head)
+            settings.min_size = 1000
+            assert not parallel.call2(space, 'add', shape, dtype,
+                                      w_a, w_b, w_out)
+        finally:
+            settings.nthreads = 1
+            settings.min_size = parallel.DEFAULT_MIN_SIZE
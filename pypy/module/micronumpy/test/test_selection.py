@@ -1,3 +1,5 @@
+from pypy.module.micronumpy import types, constants as NPY
+from pypy.module.micronumpy.selection import make_list_functions
 from pypy.module.micronumpy.test.test_base import BaseNumpyAppTest
 
 class AppTestSorting(BaseNumpyAppTest):
@@ -324,6 +326,117 @@ class AppTestSorting(BaseNumpyAppTest):
         assert (r == array([('a', 1), ('c', 3), ('b', 255), ('d', 258)],
                                  dtype=mydtype)).all()
 
+    def test_sort_kinds(self):
+        import numpy as np
+        from _random import Random
+        rnd = Random(42)
+        nan = float('nan')
+        inf = float('inf')
+        specials = [nan, -0.0, 0.0, inf, -inf, 1e-310, -1.5]
+        def same(x, y):
+            return (x == y) | (x != x) & (y != y)
+        def check(dtype, data, kinds):
+            a = np.array(data, dtype=dtype)
+            vals = a.tolist()
+            exp = np.array(sorted([x for x in vals if x == x]) +
+                           [x for x in vals if x != x], dtype=dtype)
+            for kind in kinds:
+                msg = '%s, %s, %d items' % (dtype, kind, len(vals))
+                c = a.copy()
+                c.sort(kind=kind)
+                assert same(c, exp).all(), msg
+                res = a.argsort(kind=kind)
+                c = a[res]
+                assert same(c, exp).all(), msg
+                if kind in ('mergesort', 'stable'):
+                    # equal items keep their order
+                    eq = same(c[1:], c[:-1])
+                    assert ((res[1:] > res[:-1]) | ~eq).all(), msg
+        ints = [int(rnd.random() * 200) - 100 for i in range(50)]
+        floats = [rnd.random() * 10 - 5 for i in range(50)]
+        floats[::7] = specials + [nan]
+        for dtype, data in [('int8', ints), ('int64', ints),
+                            ('uint64', [x * 2**56 + 2**63 for x in ints]),
+                            ('float32', floats), ('float64', floats)]:
+            check(dtype, data, ['quicksort', 'heapsort', 'mergesort',
+                                'stable'])
+        # the stable kind uses a radix sort on larger arrays, see also
+        # TestListSorts below
+        floats = [rnd.random() * 10 - 5 for i in range(1030)]
+        for i in range(0, 1030, 11):
+            floats[i] = specials[i // 11 % 7]
+        check('float64', floats, ['stable'])
+        # the sorts follow the axis
+        a = np.array([[5, 1, 4] * 20, [9, 2, 7] * 20])
+        for kind in ['q', 'h', 'm']:
+            b = a.copy()
+            b.sort(axis=0, kind=kind)
+            assert (b == a).all()
+            b.sort(axis=1, kind=kind)
+            assert (b[0] == [1] * 20 + [4] * 20 + [5] * 20).all()
+            assert (b[1] == [2] * 20 + [7] * 20 + [9] * 20).all()
+            res = a.argsort(axis=1, kind=kind)
+            assert (a[0][res[0]] == b[0]).all()
+            assert (a[1][res[1]] == b[1]).all()
+        exc = raises(ValueError, a.sort, kind='bogosort')
+        assert str(exc.value) == \
+            "'bogosort' is an invalid value for keyword 'kind'"
+        raises(ValueError, a.argsort, kind='')
+
+    def test_partition(self):
+        import numpy as np
+        from _random import Random
+        rnd = Random(3)
+        nan = float('nan')
+        for n in [10, 60]:
+            data = [int(rnd.random() * 20) for i in range(n)]
+            for dtype in ['int32', 'uint64', 'float32', 'float64', '>i4']:
+                a = np.array(data, dtype=dtype)
+                if dtype.startswith('float'):
+                    a[::7] = nan
+                s = a.astype(dtype.lstrip('>'))
+                s.sort()
+                for kth in [0, n // 3, n - 1, -1, [n // 4, 1, n - 2]]:
+                    msg = '%s, %d items, kth=%r' % (dtype, n, kth)
+                    idx = a.argpartition(kth)
+                    assert (sorted(idx) == np.arange(n)).all(), msg
+                    results = [a[idx]]
+                    if dtype[0] != '>':
+                        p = a.copy()
+                        p.partition(kth)
+                        results.append(p)
+                    kths = kth
+                    if not isinstance(kths, list):
+                        kths = [kths]
+                    for res in results:
+                        for k in kths:
+                            k %= n
+                            lo = res[:k]
+                            hi = res[k + 1:]
+                            if s[k] == s[k]:
+                                assert res[k] == s[k], msg
+                                assert (lo <= s[k]).all(), msg
+                                assert ((hi >= s[k]) | (hi != hi)).all(), msg
+                            else:
+                                assert res[k] != res[k], msg
+                                assert (hi != hi).all(), msg
+        # axis handling, including the argsort fallback of complex arrays
+        a = np.array([[3, 1, 2], [9, 8, 7]])
+        b = a.copy()
+        b.partition(1, axis=0)
+        assert (b == a).all()
+        b.partition(0)
+        assert (b[:, 0] == [1, 7]).all()
+        assert (a.argpartition(2, axis=1)[:, 2] == [0, 0]).all()
+        assert a.argpartition(0, axis=None)[0] == 1
+        c = np.array([3 + 1j, 1 + 2j, 2 - 1j])
+        assert (c.argpartition(1) == [1, 2, 0]).all()
+        exc = raises(ValueError, a.partition, 3)
+        assert str(exc.value) == "kth(=3) out of bounds (3)"
+        raises(ValueError, a.argpartition, -4)
+        raises(ValueError, a.partition, 1, kind='quicksort')
+        raises(TypeError, a.partition)
+
 # tests from numpy/core/tests/test_regression.py
     def test_sort_bigendian(self):
         from numpy import array, dtype
@@ -420,3 +533,79 @@ class AppTestSorting(BaseNumpyAppTest):
         import sys
         if '__pypy__' in sys.builtin_module_names:
             raises(NotImplementedError, "a.searchsorted(3, sorter=range(6))")
+
+
+class TestListSorts(object):
+    def setup_class(cls):
+        from random import Random
+        rnd = Random(7)
+        ints = [int(rnd.random() * 600) - 300 for i in range(3000)]
+        floats = [rnd.random() * 10 - 5 for i in range(3000)]
+        specials = [float('nan'), -0.0, 0.0, float('inf'), float('-inf'),
+                    1e-310, -1.5, 2.5]
+        for i in range(0, 3000, 11):
+            floats[i] = specials[i // 11 % len(specials)]
+        cls.cases = [(types.Int8, 'int', [x % 256 - 128 for x in ints]),
+                     (types.Int32, 'int', [x * 1000003 for x in ints]),
+                     (types.UInt16, 'int', [x + 300 for x in ints]),
+                     (types.UInt64, 'int', [x * 2**54 + 2**63 for x in ints]),
+                     (types.Int64, 'int', [x * 2**54 for x in ints]),
+                     (types.Float64, 'float', floats)]
+
+    def sorted_indexes(self, values):
+        keys = [(x != x, x) for x in values]
+        return sorted(range(len(values)), key=keys.__getitem__)
+
+    def same(self, x, y):
+        # nan == nan and -0.0 == 0.0
+        if len(x) != len(y):
+            return False
+        for a, b in zip(x, y):
+            if not (a == b or a != a and b != b):
+                return False
+        return True
+
+    def test_sort_lists(self):
+        for cls, comp_type, data in self.cases:
+            sort_lists = make_list_functions(cls, comp_type)[3]
+            for n in [1, 2, 17, 100, 3000]:
+                order = self.sorted_indexes(data[:n])
+                exp = [data[i] for i in order]
+                for kind in [NPY.QUICKSORT, NPY.HEAPSORT, NPY.STABLESORT]:
+                    values, indexes = sort_lists(kind, data[:n], range(n))
+                    assert self.same([data[i] for i in indexes], values)
+                    assert sorted(indexes) == range(n)
+                    assert self.same(values, exp)
+                    if kind == NPY.STABLESORT:
+                        assert indexes == order
+                    values, _ = sort_lists(kind, data[:n], None)
+                    assert self.same(values, exp)
+
+    def test_introsort_worst_cases(self):
+        sort_lists = make_list_functions(types.Int64, 'int')[3]
+        n = 2000
+        # median-of-3 killer sequence, sorted, reversed and all equal
+        killer = []
+        for i in range(n // 2):
+            killer.append(2 * i + 1)
+        for i in range(n // 2):
+            killer.append(2 * i + 2)
+        for data in [killer, range(n), range(n)[::-1], [5] * n]:
+            for kind in [NPY.QUICKSORT, NPY.HEAPSORT]:
+                values, indexes = sort_lists(kind, list(data), range(n))
+                assert values == sorted(data)
+                assert [data[i] for i in indexes] == values
+
+    def test_introselect(self):
+        for cls, comp_type, data in self.cases:
+            introselect = make_list_functions(cls, comp_type)[4]
+            exp = [data[i] for i in self.sorted_indexes(data)]
+            n = len(data)
+            for kth in [0, 1, 17, n // 2, n - 2, n - 1]:
+                values = list(data)
+                indexes = range(n)
+                introselect(values, indexes, 0, n, kth)
+                assert self.same([data[i] for i in indexes], values)
+                assert self.same([values[kth]], [exp[kth]])
+                lo = [values[i] for i in self.sorted_indexes(values[:kth])]
+                assert self.same(lo, exp[:kth])
@@ -374,7 +374,7 @@ class TestNumpyJit(LLJitMixin):
     def test_sum(self):
         result = self.run("sum")
         assert result == sum(range(30))
-        self.check_vectorized(1, 0)
+        self.check_vectorized(1, 1)
 
     def define_sum_int():
         return """
@@ -398,7 +398,7 @@ class TestNumpyJit(LLJitMixin):
     def test_sum_multi(self):
         result = self.run("sum_multi")
         assert result == sum(range(30)) + sum(range(60))
-        self.check_vectorized(1, 0)
+        self.check_vectorized(1, 1)
 
     def define_sum_float_to_int16():
         return """
@@ -471,6 +471,7 @@ class TestNumpyJit(LLJitMixin):
 
     def test_reduce_compile_only_once(self):
         self.compile_graph()
+        get_profiler().start()
         reset_jit()
         i = self.code_mapping['reduce']
         # run it twice
@@ -480,10 +481,11 @@ class TestNumpyJit(LLJitMixin):
         assert retval == sum(range(1,11))
         # check that we got only one loop
         assert len(get_stats().loops) == 1
-        self.check_vectorized(2, 0)
+        self.check_vectorized(1, 1)
 
     def test_reduce_axis_compile_only_once(self):
         self.compile_graph()
+        get_profiler().start()
         reset_jit()
         i = self.code_mapping['axissum']
         # run it twice
@@ -491,7 +493,7 @@ class TestNumpyJit(LLJitMixin):
         retval = self.interp.eval_graph(self.graph, [i])
         # check that we got only one loop
         assert len(get_stats().loops) == 1
-        self.check_vectorized(3, 0)
+        self.check_vectorized(1, 0)
 
     def define_prod():
         return """
@@ -910,6 +912,18 @@ class TestNumpyJit(LLJitMixin):
         assert int(result) == 86
         self.check_vectorized(1, 1)
 
+    def define_dot_vectors():
+        return """
+        a = |30|
+        b = |30|
+        dot(a, b)
+        """
+
+    def test_dot_vectors(self):
+        result = self.run("dot_vectors")
+        assert result == sum([i * i for i in range(30)])
+        self.check_vectorized(2, 2)
+
 
     # NOT WORKING
 
@@ -11,7 +11,7 @@ from rpython.rlib.rawstorage import (
 from rpython.rtyper.lltypesystem import rffi, lltype
 from rpython.rlib.objectmodel import keepalive_until_here, specialize
 
-from pypy.module.micronumpy import loop, constants as NPY
+from pypy.module.micronumpy import loop, parallel, constants as NPY
 from pypy.module.micronumpy.descriptor import (
     get_dtype_cache, decode_w_dtype, num2dtype)
 from pypy.module.micronumpy.base import convert_to_array, W_NDimArray
@@ -471,7 +471,9 @@ class W_Ufunc1(W_Ufunc):
                 space, shape, dt_out, w_instance=w_obj)
         else:
             w_res = out
-        w_res = loop.call1(space, shape, func, calc_dtype, w_obj, w_res)
+        if not parallel.call1(space, self.name, shape, calc_dtype, w_obj,
+                              w_res):
+            w_res = loop.call1(space, shape, func, calc_dtype, w_obj, w_res)
         if out is None:
             if w_res.is_scalar():
                 return w_res.get_scalar_value()
@@ -636,8 +638,10 @@ class W_Ufunc2(W_Ufunc):
                                            w_instance=out_subtype)
         else:
             w_res = out
-        w_res = loop.call2(space, new_shape, self.func, calc_dtype,
-                           w_lhs, w_rhs, w_res)
+        if not parallel.call2(space, self.name, new_shape, calc_dtype,
+                              w_lhs, w_rhs, w_res):
+            w_res = loop.call2(space, new_shape, self.func, calc_dtype,
+                               w_lhs, w_rhs, w_res)
         if out is None:
             if w_res.is_scalar():
                 return w_res.get_scalar_value()
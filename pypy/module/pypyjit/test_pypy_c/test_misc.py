@@ -540,3 +540,30 @@ class TestMisc(BaseTestPyPyC):
             # are gone, but only on 64-bit
             assert "call_r" not in opnames
         assert opnames.count('call_i') == 1 # _ll_1_gc_id__pypy_interpreter_baseobjspace_W_RootPtr
+
+    def test_line_coverage(self):
+        def main(n):
+            import __pypy__
+            first = main.__code__.co_firstlineno
+            __pypy__.start_line_coverage()
+            i = 0
+            total = 0
+            while i < n:
+                total += i         # ID: body
+                i += 1
+                if i == n - 1000:
+                    __pypy__.reset_line_coverage()
+            __pypy__.stop_line_coverage()
+            lines = __pypy__.get_line_coverage()[main.__code__.co_filename]
+            return [line - first for line in lines]
+        log = self.run(main, [3000])
+        # the lines of the loop ran in compiled code after the reset, and
+        # are recorded again
+        assert log.result == [6, 7, 8, 9, 10, 11]
+        loops = log.loops_by_id("body")
+        assert loops
+        for loop in loops:
+            # once recorded, the coverage leaves no calls in the loop
+            opnames = log.opnames(loop.allops())
+            assert [name for name in opnames if name.startswith('call')] \
+                == []
@@ -674,7 +674,9 @@ def setup_prebuilt(space):
 
 
 def wrapint(space, x):
-    if not space.config.objspace.std.withprebuiltint:
+    if not space.config.objspace.std.withprebuiltint or jit.we_are_jitted():
+        # in JIT-compiled code, a fresh W_IntObject is usually virtual and
+        # never allocated, whereas a prebuilt one would escape
         return W_IntObject(x)
     lower = space.config.objspace.std.prebuiltintfrom
     upper = space.config.objspace.std.prebuiltintto
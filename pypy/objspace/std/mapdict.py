@@ -1237,6 +1237,15 @@ class MapDictIteratorItems(BaseItemIterator):
 # ____________________________________________________________
 # Magic caching
 
+# the number of different maps that a cache entry records for the
+# statistics; a site that saw that many is reported as megamorphic
+MAX_RECORDED_MAPS = 8
+
+# the number of different maps that a site caches at the same time, in a
+# chain of CacheEntries.  A site that sees more maps than that is marked as
+# megamorphic, and from then on only caches the most recent map.
+POLYMORPHIC_CACHE_SIZE = 4
+
 class CacheEntry(object):
     version_tag = None
     w_method = None # for callmethod
@@ -1244,6 +1253,70 @@ class CacheEntry(object):
     failure_counter = 0
     valid_for_store = True
     attr_to_add = None
+    # the other maps of a polymorphic site.  Only the first entry of the
+    # chain, the one in pycode._mapdict_caches, has the megamorphic flag
+    # and the statistics
+    next_entry = None
+    megamorphic = False
+    # statistics that are always collected, while interpreting; see
+    # CacheSites
+    hits = 0
+    misses = 0
+    seen_maps = None    # list of weakrefs to the maps, at most
+                        # MAX_RECORDED_MAPS
+
+    def num_seen_maps(self):
+        if self.seen_maps is None:
+            return 0
+        return len(self.seen_maps)
+
+    def _record_map(self, pycode, nameindex, map):
+        seen_maps = self.seen_maps
+        if seen_maps is None:
+            self.seen_maps = [weakref.ref(map)]
+            return
+        if len(seen_maps) >= MAX_RECORDED_MAPS:
+            return
+        for wref in seen_maps:
+            if wref() is map:
+                return
+        seen_maps.append(weakref.ref(map))
+        if len(seen_maps) == 2:
+            pycode.space.fromcache(CacheSites).add(pycode, nameindex)
+
+    @objectmodel.specialize.arg(2)
+    def find_next_entry(self, map, store=False):
+        """Return the entry for 'map' among the entries that follow 'self'
+        in the chain of a polymorphic site, or None."""
+        entry = self.next_entry
+        while entry is not None:
+            if entry.is_valid_for_map(map, store):
+                return entry
+            entry = entry.next_entry
+        return None
+
+    def _entry_to_fill(self, map):
+        # reuse the entry of the same map (whose version_tag or attribute
+        # changed) or of a map that died; otherwise add a new entry at the
+        # end of the chain, unless the site sees too many maps
+        if self.megamorphic:
+            return self
+        entry = self
+        length = 1
+        while True:
+            mymap = entry.map_wref()
+            if mymap is None or mymap is map:
+                return entry
+            if entry.next_entry is None:
+                break
+            entry = entry.next_entry
+            length += 1
+        if length < POLYMORPHIC_CACHE_SIZE:
+            entry.next_entry = CacheEntry()
+            return entry.next_entry
+        self.megamorphic = True
+        self.next_entry = None
+        return self
 
     @objectmodel.specialize.arg(2)
     def is_valid_for_obj(self, w_obj, store=False):
@@ -1281,14 +1354,60 @@ def init_mapdict_cache(pycode):
     num_entries = len(pycode.co_names_w)
     pycode._mapdict_caches = [INVALID_CACHE_ENTRY] * num_entries
 
+
+class CacheSites(object):
+    """The cache entries that have seen more than one map, i.e. the
+    attribute accesses that are not monomorphic.  A site is a code object
+    and an attribute name in it (all the accesses to the same name in the
+    same code object share a cache entry).  Used by
+    __pypy__.mapdict_cache_report().
+    """
+    def __init__(self, space):
+        self.pycodes = []      # list of weakrefs to PyCode
+        self.nameindexes = []
+
+    def add(self, pycode, nameindex):
+        self.pycodes.append(weakref.ref(pycode))
+        self.nameindexes.append(nameindex)
+
+    def get_entries(self):
+        """Return a list of (pycode, nameindex, entry), after removing the
+        sites of code objects that died."""
+        result = []
+        pycodes = []
+        nameindexes = []
+        for i in range(len(self.pycodes)):
+            pycode = self.pycodes[i]()
+            if pycode is None:
+                continue
+            nameindex = self.nameindexes[i]
+            pycodes.append(self.pycodes[i])
+            nameindexes.append(nameindex)
+            entry = pycode._mapdict_caches[nameindex]
+            result.append((pycode, nameindex, entry))
+        self.pycodes = pycodes
+        self.nameindexes = nameindexes
+        return result
+
+    def reset(self):
+        for pycode, nameindex, entry in self.get_entries():
+            entry.hits = 0
+            entry.misses = 0
+            entry.seen_maps = None
+        self.pycodes = []
+        self.nameindexes = []
+
 @jit.dont_look_inside
 def _fill_cache(pycode, nameindex, map, version_tag, attr, w_method=None, valid_for_store=False, attr_to_add=None):
     if not pycode.space._side_effects_ok():
         return
-    entry = pycode._mapdict_caches[nameindex]
-    if entry is INVALID_CACHE_ENTRY:
-        entry = CacheEntry()
-        pycode._mapdict_caches[nameindex] = entry
+    head = pycode._mapdict_caches[nameindex]
+    if head is INVALID_CACHE_ENTRY:
+        head = CacheEntry()
+        pycode._mapdict_caches[nameindex] = head
+        entry = head
+    else:
+        entry = head._entry_to_fill(map)
     entry.map_wref = weakref.ref(map)
     if attr:
         entry.attr_wref = weakref.ref(attr)
@@ -1297,6 +1416,8 @@ def _fill_cache(pycode, nameindex, map, version_tag, attr, w_method=None, valid_
     entry.version_tag = version_tag
     entry.w_method = w_method
     entry.valid_for_store = valid_for_store
+    head.misses += 1
+    head._record_map(pycode, nameindex, map)
     if pycode.space.config.objspace.std.withmethodcachecounter:
         entry.failure_counter += 1
 
@@ -1310,12 +1431,21 @@ def LOAD_ATTR_caching(pycode, w_obj, nameindex):
         # everything matches, it's incredibly fast
         attr = entry.attr_wref()
         if attr is not None:
+            entry.hits += 1
             return attr._direct_read(w_obj)
     return LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map)
 
 @objectmodel.dont_inline
 def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
     space = pycode.space
+    head = pycode._mapdict_caches[nameindex]
+    entry = head.find_next_entry(map)
+    if entry is not None and entry.w_method is None:
+        # another map of a polymorphic site
+        attr = entry.attr_wref()
+        if attr is not None:
+            head.hits += 1
+            return attr._direct_read(w_obj)
     w_name = pycode.co_names_w[nameindex]
     if map is not None:
         w_type = map.terminator.w_cls
@@ -1366,10 +1496,16 @@ def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
 
 def LOOKUP_METHOD_mapdict(f, nameindex, w_obj):
     pycode = f.getcode()
-    entry = pycode._mapdict_caches[nameindex]
-    if entry.is_valid_for_obj(w_obj):
+    head = pycode._mapdict_caches[nameindex]
+    map = w_obj._get_mapdict_map()
+    if head.is_valid_for_map(map):
+        entry = head
+    else:
+        entry = head.find_next_entry(map)
+    if entry is not None:
         w_method = entry.w_method
         if w_method is not None:
+            head.hits += 1
             f.pushvalue(w_method)
             f.pushvalue(w_obj)
             return True
@@ -1403,35 +1539,50 @@ def STORE_ATTR_caching(pycode, w_obj, nameindex, w_value):
         if attr is not None:
             if not attr.ever_mutated:
                 attr.ever_mutated = True
+            entry.hits += 1
             attr._direct_write(w_obj, w_value)
             return
     return STORE_ATTR_slowpath(pycode, w_obj, nameindex, map, w_value, entry)
 
 def STORE_ATTR_slowpath(pycode, w_obj, nameindex, map, w_value, entry):
     space = pycode.space
+    other = entry.find_next_entry(map, store=True)
+    if other is not None and other.w_method is None:
+        # another map of a polymorphic site
+        attr = other.attr_wref()
+        if attr is not None:
+            if not attr.ever_mutated:
+                attr.ever_mutated = True
+            entry.hits += 1
+            attr._direct_write(w_obj, w_value)
+            return
 
     w_name = pycode.co_names_w[nameindex]
     if map is not None:
         w_type = map.terminator.w_cls
         version_tag = w_type.version_tag()
         # there is still a (not inlined) fast path for stores that add a new
-        # attribute
-        if entry.valid_for_store and version_tag is entry.version_tag:
-            entry_map = entry.map_wref()
-            attr_to_add = entry.attr_wref()
-            if (entry_map is not None and
-                    isinstance(entry_map, PlainAttribute) and
-                    attr_to_add is entry_map
-                    and entry_map.back is map):
-                if isinstance(attr_to_add, UnboxedPlainAttribute):
-                    typsafe = type(w_value) is attr_to_add.typ
-                else:
-                    typsafe = True
-                if typsafe:
-                    if space.config.objspace.std.withmethodcachecounter:
-                        entry.success_counter += 1
-                    attr_to_add._switch_map_and_write_storage(w_obj, w_value)
-                    return
+        # attribute, for all the entries of a polymorphic site
+        other = entry
+        while other is not None:
+            if other.valid_for_store and version_tag is other.version_tag:
+                entry_map = other.map_wref()
+                attr_to_add = other.attr_wref()
+                if (entry_map is not None and
+                        isinstance(entry_map, PlainAttribute) and
+                        attr_to_add is entry_map
+                        and entry_map.back is map):
+                    if isinstance(attr_to_add, UnboxedPlainAttribute):
+                        typsafe = type(w_value) is attr_to_add.typ
+                    else:
+                        typsafe = True
+                    if typsafe:
+                        entry.hits += 1
+                        if space.config.objspace.std.withmethodcachecounter:
+                            other.success_counter += 1
+                        attr_to_add._switch_map_and_write_storage(w_obj, w_value)
+                        return
+            other = other.next_entry
         w_descr = w_type.setattr_if_not_from_object()
         if w_descr:
             return space.get_and_call_function(w_descr, w_obj, w_name, w_value)
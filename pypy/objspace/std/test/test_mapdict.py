@@ -1326,19 +1326,23 @@ class AppTestWithMapDictAndCounters(object):
             w_code = space.getattr(w_func, space.wrap('func_code'))
             nameindex = map(space.str_w, w_code.co_names_w).index(name)
             entry = w_code._mapdict_caches[nameindex]
-            entry.failure_counter = 0
-            entry.success_counter = 0
+            while entry is not None:
+                entry.failure_counter = 0
+                entry.success_counter = 0
+                entry = entry.next_entry
             INVALID_CACHE_ENTRY.failure_counter = 0
             #
             w_res = space.call_function(w_func)
             assert space.eq_w(w_res, space.wrap(42))
             #
             entry = w_code._mapdict_caches[nameindex]
-            if entry is INVALID_CACHE_ENTRY:
-                failures = successes = 0
-            else:
-                failures = entry.failure_counter
-                successes = entry.success_counter
+            failures = successes = 0
+            if entry is not INVALID_CACHE_ENTRY:
+                # all the entries of a polymorphic site
+                while entry is not None:
+                    failures += entry.failure_counter
+                    successes += entry.success_counter
+                    entry = entry.next_entry
             globalfailures = INVALID_CACHE_ENTRY.failure_counter
             return space.wrap((failures, successes, globalfailures))
         check.unwrap_spec = [gateway.ObjSpace, gateway.W_Root, 'text']
@@ -1838,6 +1842,137 @@ class AppTestWithMapDictAndCounters(object):
         assert res == (2, 2, 0)
 
 
+class AppTestCacheReport(object):
+
+    def test_report(self):
+        import __pypy__
+        __pypy__.reset_mapdict_cache_report()
+        class A(object):
+            pass
+        class B(object):
+            pass
+        a = A()
+        a.x = 1
+        b1 = B()
+        b1.x = 2
+        b2 = B()
+        b2.x = 3
+        def f(objs):
+            total = 0
+            for obj in objs:
+                total += obj.x
+            return total
+        def g(objs):
+            for obj in objs:
+                obj.x = 5
+        assert f([a, b1, b2] * 10) == 60
+        g([a, b1, b2] * 5)
+        report = [item for item in __pypy__.mapdict_cache_report()
+                  if item[2] in ('f', 'g')]
+        assert len(report) == 2
+        # sorted by misses
+        filename, firstlineno, funcname, attrname, hits, misses, layouts = (
+            report[0])
+        assert (funcname, attrname) == ('f', 'x')
+        assert firstlineno == f.__code__.co_firstlineno
+        assert filename == f.__code__.co_filename
+        assert (hits, misses, layouts) == (28, 2, 2)
+        assert report[1][2:] == ('g', 'x', 13, 2, 2)
+        #
+        assert len(__pypy__.mapdict_cache_report(1)) == 1
+        __pypy__.reset_mapdict_cache_report()
+        assert [item for item in __pypy__.mapdict_cache_report()
+                if item[2] in ('f', 'g')] == []
+
+    def test_report_megamorphic(self):
+        import __pypy__
+        __pypy__.reset_mapdict_cache_report()
+        classes = []
+        for i in range(12):
+            class A(object):
+                pass
+            classes.append(A)
+        objs = [cls() for cls in classes]
+        for obj in objs:
+            obj.y = 1
+        def h(objs):
+            for obj in objs:
+                obj.y
+        h(objs)
+        [item] = [item for item in __pypy__.mapdict_cache_report()
+                  if item[2] == 'h']
+        assert item[4:] == (0, 12, 8)
+
+    def test_polymorphic(self):
+        import __pypy__
+        __pypy__.reset_mapdict_cache_report()
+        classes = []
+        for i in range(4):
+            class A(object):
+                def m(self):
+                    return 1
+            classes.append(A)
+        objs = [cls() for cls in classes]
+        for obj in objs:
+            obj.y = 1
+        def h(objs):
+            for obj in objs:
+                obj.y = obj.y + obj.m()
+        h(objs * 5)
+        assert [obj.y for obj in objs] == [6] * 4
+        [item] = [item for item in __pypy__.mapdict_cache_report()
+                  if item[2:4] == ('h', 'y')]
+        # the four maps are cached at the same time
+        assert item[4:] == (36, 4, 4)
+        [item] = [item for item in __pypy__.mapdict_cache_report()
+                  if item[2:4] == ('h', 'm')]
+        assert item[4:] == (16, 4, 4)
+
+    def test_polymorphic_add_attribute(self):
+        import __pypy__
+        __pypy__.reset_mapdict_cache_report()
+        class A(object):
+            def __init__(self):
+                self.x = 1
+        class B(object):
+            def __init__(self):
+                self.x = 2
+        objs = [A(), B(), B()] * 10
+        def g(objs):
+            for obj in objs:
+                obj.z = 5
+        g(objs)
+        [item] = [item for item in __pypy__.mapdict_cache_report()
+                  if item[2:4] == ('g', 'z')]
+        assert item[4:] == (28, 2, 2)
+
+    def test_megamorphic(self):
+        import __pypy__
+        __pypy__.reset_mapdict_cache_report()
+        classes = []
+        for i in range(5):
+            class A(object):
+                pass
+            classes.append(A)
+        objs = [cls() for cls in classes]
+        for obj in objs:
+            obj.y = 1
+        def h(objs):
+            for obj in objs:
+                obj.y
+        h(objs * 2)
+        # five maps: the site becomes megamorphic and only caches the
+        # most recent map, so every access in the loop misses
+        h(objs * 2)
+        [item] = [item for item in __pypy__.mapdict_cache_report()
+                  if item[2] == 'h']
+        assert item[4:] == (0, 20, 5)
+        h([objs[0]] * 5)
+        [item] = [item for item in __pypy__.mapdict_cache_report()
+                  if item[2] == 'h']
+        assert item[4:] == (4, 21, 5)
+
+
 class AppTestGlobalCaching(AppTestWithMapDict):
     spaceconfig = {"objspace.std.withmethodcachecounter": True}
 
@@ -1854,14 +1989,25 @@ class AppTestGlobalCaching(AppTestWithMapDict):
             class C(object):
                 def f(self):
                     return 44
-            l = [A(), B(), C()] * 10
+            class D(object):
+                def f(self):
+                    return 45
+            class E(object):
+                def f(self):
+                    return 46
+            class F(object):
+                def f(self):
+                    return 47
+            # more classes than POLYMORPHIC_CACHE_SIZE: the site is
+            # megamorphic and every lookup goes to the global cache
+            l = [A(), B(), C(), D(), E(), F()] * 10
             __pypy__.reset_method_cache_counter()
             # 'exec' to make sure that a.f() is compiled with CALL_METHOD
             exec """for i, a in enumerate(l):
-                        assert a.f() == 42 + i % 3
+                        assert a.f() == 42 + i % 6
             """ in locals()
             cache_counter = __pypy__.mapdict_cache_counter("f")
-            if cache_counter == (27, 3):
+            if cache_counter == (54, 6):
                 break
             # keep them alive, to make sure that on the
             # next try they have difference addresses
@@ -1882,12 +2028,23 @@ class AppTestGlobalCaching(AppTestWithMapDict):
             class C(object):
                 def __init__(self):
                     self.x = 44
-            l = [A(), B(), C()] * 10
+            class D(object):
+                def __init__(self):
+                    self.x = 45
+            class E(object):
+                def __init__(self):
+                    self.x = 46
+            class F(object):
+                def __init__(self):
+                    self.x = 47
+            # more classes than POLYMORPHIC_CACHE_SIZE: the site is
+            # megamorphic and every lookup goes to the global cache
+            l = [A(), B(), C(), D(), E(), F()] * 10
             __pypy__.reset_method_cache_counter()
             for i, a in enumerate(l):
-                assert a.x == 42 + i % 3
+                assert a.x == 42 + i % 6
             cache_counter = __pypy__.mapdict_cache_counter("x")
-            if cache_counter == (27, 3):
+            if cache_counter == (54, 6):
                 break
             # keep them alive, to make sure that on the
             # next try they have difference addresses
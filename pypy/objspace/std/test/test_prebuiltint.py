@@ -13,3 +13,24 @@ class AppTestInt(test_intobject.AppTestInt):
             assert x is (-(x + 3 - 3) * 5 // (-5))
         for i in range(self.start, self.stop):
             f(i)
+
+
+class TestPrebuiltInt:
+    spaceconfig = {"objspace.std.withprebuiltint": True}
+
+    def test_wrapint_prebuilt(self):
+        from pypy.objspace.std.intobject import wrapint
+        space = self.space
+        assert wrapint(space, 5) is wrapint(space, 5)
+        stop = space.config.objspace.std.prebuiltintto
+        assert wrapint(space, stop) is not wrapint(space, stop)
+
+    def test_wrapint_jitted(self, monkeypatch):
+        from rpython.rlib import jit
+        from pypy.objspace.std.intobject import wrapint
+        space = self.space
+        monkeypatch.setattr(jit, 'we_are_jitted', lambda: True)
+        w_a = wrapint(space, 5)
+        w_b = wrapint(space, 5)
+        assert w_a is not w_b
+        assert space.int_w(w_a) == space.int_w(w_b) == 5
@@ -3,12 +3,71 @@
 Prints a human-readable total out of a dumpfile produced
 by gc.dump_rpy_heap(), and optionally a typeids.txt.
 
-Syntax:  dump.py  <dumpfile>  [<typeids.txt>]
+Syntax:  gcdump.py [options] <dumpfile> [<typeids.txt>]
 
 By default, typeids.txt is loaded from the same dir as dumpfile.
+
+Options:
+    --retained=N    also compute the dominator tree of the heap and
+                    print the N objects that keep alive the most
+                    memory, with the path that retains each of them
+    --diff=OLDDUMP  print the per-type difference between OLDDUMP
+                    and dumpfile (both must come from the same
+                    executable), biggest growth first
+
+The dump files are read through mmap, one chunk at a time, so that
+the summary of a dump doesn't need more memory than the dump itself.
 """
 from __future__ import print_function
-import sys, array, struct, os
+import sys, array, struct, os, mmap
+
+WORD = struct.calcsize('l')
+CHUNK = 1 << 20     # words
+
+if hasattr(array.array, 'frombytes'):
+    _array_frombytes = array.array.frombytes
+else:
+    _array_frombytes = array.array.fromstring
+
+
+def iter_dump_file(filename, chunk=CHUNK):
+    """Yield (address, typenum, size, refs) for every object in the dump,
+    and an entry with address 0 for the marker that follows the GC roots.
+    'refs' is an array of addresses.  The file is mapped in memory and
+    decoded 'chunk' words at a time."""
+    f = open(filename, 'rb')
+    try:
+        end = os.fstat(f.fileno()).st_size // WORD
+        if end == 0:
+            return
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        f.close()
+    try:
+        tail = array.array('l')
+        _array_frombytes(tail, m[(end - 2) * WORD:end * WORD])
+        assert tail[-1] == -1, "invalid or truncated dump file (or 32/64-bit mix)"
+        assert tail[-2] != -1, "invalid or truncated dump file (or 32/64-bit mix)"
+        a = array.array('l')
+        pos = 0
+        while pos < end:
+            stop = min(pos + chunk, end)
+            _array_frombytes(a, m[pos * WORD:stop * WORD])
+            pos = stop
+            i = 0
+            n = len(a)
+            while True:
+                j = i + 3
+                while j < n and a[j] != -1:
+                    j += 1
+                if j >= n:
+                    break
+                yield (a[i], a[i+1], a[i+2], a[i+3:j])
+                i = j + 1
+            del a[:i]      # keep the incomplete object for the next chunk
+        assert len(a) == 0, "invalid or truncated dump file"
+    finally:
+        m.close()
 
 
 class Stat(object):
@@ -17,11 +76,13 @@ class Stat(object):
     BIGOBJ = 65536   # bytes
 
     def summarize(self, filename):
-        a = self.load_dump_file(filename)
         self.summary = {}     # {typenum: [count, totalsize]}
         self.bigobjs = []     # list of individual (size, typenum)
-        for obj in self.walk(a):
-            self.add_object_summary(obj[2], obj[3])
+        print('walking...', file=sys.stderr)
+        for addr, typenum, size, refs in iter_dump_file(filename):
+            if addr != 0:
+                self.add_object_summary(typenum, size)
+        print('done', file=sys.stderr)
 
     def load_typeids(self, filename_or_iter):
         self.typeids = Stat.typeids.copy()
@@ -53,7 +114,7 @@ class Stat(object):
             print('%8d %8.2fM  %s' % (stat[0], stat[1] / (1024.0*1024.0),
                                       self.get_type_name(typenum)))
         print('total %.1fM' % (totalsize / (1024.0*1024.0),))
-        print
+        print()
         lst = sorted(self.bigobjs)[-10:]
         if lst:
             if len(lst) == len(self.bigobjs):
@@ -66,6 +127,30 @@ class Stat(object):
         else:
             print('No object takes at least %d bytes on its own.' % (self.BIGOBJ,))
 
+    def print_diff(self, old, limit=40):
+        """Print the types whose total size changed the most between
+        the 'old' Stat and this one."""
+        diffs = []
+        for typenum in set(self.summary) | set(old.summary):
+            count, size = self.summary.get(typenum, (0, 0))
+            oldcount, oldsize = old.summary.get(typenum, (0, 0))
+            if count != oldcount or size != oldsize:
+                diffs.append((size - oldsize, count - oldcount, typenum))
+        diffs.sort(key=lambda element: (-element[0], -element[1]))
+        print('%9s %9s %9s  %s' % ('count', 'size', 'now', 'type'))
+        for dsize, dcount, typenum in diffs[:limit]:
+            print('%+9d %+8.2fM %8.2fM  %s' % (
+                dcount, dsize / (1024.0*1024.0),
+                self.summary.get(typenum, (0, 0))[1] / (1024.0*1024.0),
+                self.get_type_name(typenum)))
+        if len(diffs) > limit:
+            print('... and %d more types changed' % (len(diffs) - limit,))
+        total = sum([stat[1] for stat in self.summary.values()])
+        oldtotal = sum([stat[1] for stat in old.summary.values()])
+        print('total %+.1fM (%.1fM -> %.1fM)' % (
+            (total - oldtotal) / (1024.0*1024.0),
+            oldtotal / (1024.0*1024.0), total / (1024.0*1024.0)))
+
     def load_dump_file(self, filename):
         f = open(filename, 'rb')
         f.seek(0, 2)
@@ -102,21 +187,212 @@ class Stat(object):
         print('done', file=sys.stderr)
 
 
+class HeapGraph(object):
+    """The object graph of a dump, in flat arrays.  Object 0 is a fake
+    object whose references are the GC roots; the real objects are
+    numbered from 1 in the order of the dump."""
+
+    def __init__(self):
+        self.addrs = array.array('l', [0])
+        self.typenums = array.array('l', [0])
+        self.sizes = array.array('l', [0])
+        self.edges = array.array('l')             # refs of all objects
+        self.edge_start = array.array('l', [0])   # refs of i are in
+                                                  # edges[edge_start[i]:
+                                                  #       edge_start[i+1]]
+
+    def load(self, filename):
+        print('loading graph...', file=sys.stderr)
+        index = {}
+        roots = array.array('l')
+        refs_addr = array.array('l')
+        refs_end = array.array('l')
+        in_roots = True
+        for addr, typenum, size, refs in iter_dump_file(filename):
+            if addr == 0:
+                in_roots = False     # the end-of-roots marker
+                continue
+            num = len(self.addrs)
+            index[addr] = num
+            if in_roots:
+                roots.append(num)
+            self.addrs.append(addr)
+            self.typenums.append(typenum)
+            self.sizes.append(size)
+            refs_addr.extend(refs)
+            refs_end.append(len(refs_addr))
+        if in_roots:
+            raise ValueError("no end-of-roots marker in %r" % (filename,))
+        # translate the addresses into object numbers
+        nroots = len(roots)
+        self.edges = roots
+        self.edge_start.append(nroots)
+        for addr in refs_addr:
+            self.edges.append(index.get(addr, 0))
+        for end in refs_end:
+            self.edge_start.append(nroots + end)
+        print('done', file=sys.stderr)
+
+    def __len__(self):
+        return len(self.addrs)
+
+    def refs(self, num):
+        return self.edges[self.edge_start[num]:self.edge_start[num+1]]
+
+    def compute_dominators(self):
+        """Compute 'self.idom', the immediate dominator of every object,
+        and 'self.retained', the total size that would be freed if the
+        object died.  Uses the iterative algorithm of Cooper, Harvey and
+        Kennedy, "A Simple, Fast Dominance Algorithm"."""
+        print('computing dominators...', file=sys.stderr)
+        n = len(self)
+        edges = self.edges
+        edge_start = self.edge_start
+        #
+        # depth-first postorder from the fake root object
+        postorder = array.array('l')
+        ponum = array.array('l', [-1]) * n
+        seen = bytearray(n)
+        seen[0] = 1
+        stack_obj = [0]
+        stack_pos = [edge_start[0]]
+        while stack_obj:
+            obj = stack_obj[-1]
+            pos = stack_pos[-1]
+            if pos < edge_start[obj + 1]:
+                stack_pos[-1] = pos + 1
+                child = edges[pos]
+                if not seen[child]:
+                    seen[child] = 1
+                    stack_obj.append(child)
+                    stack_pos.append(edge_start[child])
+            else:
+                ponum[obj] = len(postorder)
+                postorder.append(obj)
+                stack_obj.pop()
+                stack_pos.pop()
+        #
+        # the predecessors of each object
+        pred_start = array.array('l', [0]) * (n + 1)
+        for child in edges:
+            pred_start[child + 1] += 1
+        for i in range(n):
+            pred_start[i + 1] += pred_start[i]
+        preds = array.array('l', [0]) * len(edges)
+        fill = pred_start[:]
+        for obj in range(n):
+            for pos in range(edge_start[obj], edge_start[obj + 1]):
+                child = edges[pos]
+                preds[fill[child]] = obj
+                fill[child] += 1
+        del fill
+        #
+        idom = array.array('l', [-1]) * n
+        idom[0] = 0
+        rpo = postorder[::-1]
+        changed = True
+        while changed:
+            changed = False
+            for obj in rpo[1:]:
+                new_idom = -1
+                for pos in range(pred_start[obj], pred_start[obj + 1]):
+                    p = preds[pos]
+                    if idom[p] == -1:
+                        continue
+                    if new_idom == -1:
+                        new_idom = p
+                        continue
+                    # intersect(p, new_idom)
+                    while p != new_idom:
+                        while ponum[p] < ponum[new_idom]:
+                            p = idom[p]
+                        while ponum[new_idom] < ponum[p]:
+                            new_idom = idom[new_idom]
+                if idom[obj] != new_idom:
+                    idom[obj] = new_idom
+                    changed = True
+        self.idom = idom
+        #
+        # an object comes after all the objects it dominates in postorder
+        retained = self.sizes[:]
+        for obj in postorder[:-1]:
+            retained[idom[obj]] += retained[obj]
+        self.retained = retained
+        print('done', file=sys.stderr)
+
+    def retainer_path(self, obj):
+        """The list of objects that keep 'obj' alive, from a GC root down
+        to 'obj' itself: each one dominates the next one."""
+        path = []
+        while obj != 0 and obj != -1:
+            path.append(obj)
+            obj = self.idom[obj]
+        path.reverse()
+        return path
+
+    def print_retained(self, stat, limit=20, maxpath=8):
+        """Print the 'limit' objects with the biggest retained size,
+        ignoring the ones that are the only retainer of their parent
+        in the dominator tree (they would repeat the same memory)."""
+        n = len(self)
+        retained = self.retained
+        idom = self.idom
+        candidates = [obj for obj in range(1, n)
+                      if idom[obj] != -1 and
+                         (idom[obj] == 0 or
+                          retained[obj] + self.sizes[idom[obj]] !=
+                              retained[idom[obj]])]
+        candidates.sort(key=lambda obj: -retained[obj])
+        print('%d objects retaining the most memory:' % (
+            min(limit, len(candidates)),))
+        for obj in candidates[:limit]:
+            print('%8.2fM  %s at 0x%x' % (
+                retained[obj] / (1024.0*1024.0),
+                stat.get_type_name(self.typenums[obj]), self.addrs[obj]))
+            path = self.retainer_path(obj)[:-1]
+            if len(path) > maxpath:
+                path = path[:1] + [None] + path[-(maxpath - 1):]
+            for step in path:
+                if step is None:
+                    print('%12s...' % ('',))
+                else:
+                    print('%12s<- %s' % (
+                        '', stat.get_type_name(self.typenums[step])))
+
+
 if __name__ == '__main__':
-    if len(sys.argv) <= 1:
+    import getopt
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], '', ['retained=', 'diff='])
+    except getopt.GetoptError as e:
+        print(e, file=sys.stderr)
+        args = []
+    if not args:
         print(__doc__, file=sys.stderr)
         sys.exit(2)
+    opts = dict(opts)
     stat = Stat()
-    stat.summarize(sys.argv[1])
+    stat.summarize(args[0])
     #
-    if len(sys.argv) > 2:
-        typeid_name = sys.argv[2]
+    if len(args) > 1:
+        typeid_name = args[1]
     else:
-        typeid_name = os.path.join(os.path.dirname(sys.argv[1]), 'typeids.txt')
+        typeid_name = os.path.join(os.path.dirname(args[0]), 'typeids.txt')
     if os.path.isfile(typeid_name):
         stat.load_typeids(typeid_name)
     else:
         import zlib, gc
         stat.load_typeids(zlib.decompress(gc.get_typeids_z()).split("\n"))
     #
-    stat.print_summary()
+    if '--diff' in opts:
+        old = Stat()
+        old.summarize(opts['--diff'])
+        stat.print_diff(old)
+    else:
+        stat.print_summary()
+    if '--retained' in opts:
+        graph = HeapGraph()
+        graph.load(args[0])
+        graph.compute_dominators()
+        print()
+        graph.print_retained(stat, int(opts['--retained']))
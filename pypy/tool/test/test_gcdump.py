@@ -0,0 +1,75 @@
+import array
+from pypy.tool.gcdump import iter_dump_file, Stat, HeapGraph
+
+
+def write_dump(tmpdir, name, roots, objects):
+    # 'roots' and 'objects' are lists of (addr, typenum, size, refs)
+    a = array.array('l')
+    for i, lst in enumerate([roots, objects]):
+        for addr, typenum, size, refs in lst:
+            a.extend([addr, typenum, size])
+            a.extend(refs)
+            a.append(-1)
+        if i == 0:
+            a.extend([0, 0, 0, -1])
+    fn = tmpdir.join(name)
+    with open(str(fn), 'wb') as f:
+        a.tofile(f)
+    return str(fn)
+
+# root 1000 -> 1100 -> 1200 -> 1300
+#      1000 -> 1400 -> 1300
+# root 2000 -> 1400
+ROOTS = [(1000, 1, 16, [1100, 1400]), (2000, 2, 8, [1400])]
+OBJECTS = [(1100, 3, 100, [1200]), (1400, 3, 50, [1300]),
+           (1200, 4, 1000, [1300]), (1300, 4, 7, [])]
+
+
+def test_iter_dump_file(tmpdir):
+    fn = write_dump(tmpdir, 'dump', ROOTS, OBJECTS)
+    expected = ROOTS + [(0, 0, 0, [])] + OBJECTS
+    for chunk in [1, 2, 3, 5, 1000]:
+        got = [(addr, typenum, size, list(refs)) for addr, typenum, size, refs
+               in iter_dump_file(fn, chunk=chunk)]
+        assert got == expected
+
+def test_summarize(tmpdir):
+    fn = write_dump(tmpdir, 'dump', ROOTS, OBJECTS)
+    stat = Stat()
+    stat.summarize(fn)
+    assert stat.summary == {1: [1, 16], 2: [1, 8], 3: [2, 150],
+                            4: [2, 1007]}
+
+def test_dominators(tmpdir):
+    fn = write_dump(tmpdir, 'dump', ROOTS, OBJECTS)
+    graph = HeapGraph()
+    graph.load(fn)
+    graph.compute_dominators()
+    num = dict([(addr, i) for i, addr in enumerate(graph.addrs)])
+    idom = dict([(addr, graph.addrs[graph.idom[num[addr]]])
+                 for addr in num])
+    assert idom == {0: 0, 1000: 0, 2000: 0, 1100: 1000, 1200: 1100,
+                    1400: 0, 1300: 0}
+    retained = dict([(addr, graph.retained[num[addr]]) for addr in num])
+    assert retained[1000] == 16 + 100 + 1000
+    assert retained[1100] == 100 + 1000
+    assert retained[1400] == 50
+    assert retained[0] == 16 + 8 + 100 + 50 + 1000 + 7
+    assert [graph.addrs[i] for i in graph.retainer_path(num[1200])] == [
+        1000, 1100, 1200]
+
+def test_print_diff(tmpdir, capsys):
+    fn1 = write_dump(tmpdir, 'dump1', ROOTS, OBJECTS)
+    fn2 = write_dump(tmpdir, 'dump2', ROOTS,
+                     OBJECTS + [(1500, 3, 60, []), (1600, 5, 10, [])])
+    old = Stat()
+    old.summarize(fn1)
+    new = Stat()
+    new.summarize(fn2)
+    new.print_diff(old)
+    out, err = capsys.readouterr()
+    lines = out.splitlines()
+    assert lines[1].split()[0] == '+1'
+    assert lines[1].endswith('<typenum 3>')
+    assert lines[2].endswith('<typenum 5>')
+    assert len(lines) == 4
@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import types
+import time
 from collections import defaultdict
 from contextlib import contextmanager
 
@@ -218,10 +219,17 @@ class RPythonAnnotator(object):
 
             # Process all blocks at this level
             # (if any gets re-inserted, it will be into the next level)
+            profiler = self.translator.profiler
             while pendingblocks:
                 block, graph = pendingblocks.popitem()
                 block.generation = gen
-                self.processblock(graph, block)
+                if profiler is None:
+                    self.processblock(graph, block)
+                else:
+                    t0 = time.time()
+                    self.processblock(graph, block)
+                    profiler.add_graph_time('annotate', graph,
+                                            time.time() - t0)
 
     def complete(self):
         """Process pending blocks until none is left."""
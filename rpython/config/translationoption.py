@@ -171,6 +171,17 @@ translation_optiondescription = OptionDescription(
     IntOption("make_jobs", "Specify -j argument to make for compilation"
               " (C backend only)",
               cmdline="--make-jobs", default=detect_number_of_processors()),
+    IntOption("source_jobs", "Number of processes that write the C source"
+              " files in parallel (C backend only)",
+              cmdline="--source-jobs", default=1),
+    BoolOption("objcache", "Reuse the object files of unchanged C sources"
+               " from a cache shared between translations (C backend only)",
+               cmdline="--objcache", default=False),
+    IntOption("objcache_maxsize", "Maximum size of the object file cache,"
+              " in megabytes", cmdline="--objcache-maxsize", default=2048),
+    StrOption("transprofile", "Write a profile of the translation itself to"
+              " this file: time and memory per task, time per graph and per"
+              " backendopt pass", cmdline="--transprofile"),
 
     # Flags of the TranslationContext:
     BoolOption("list_comprehension_operations",
@@ -227,12 +238,16 @@ translation_optiondescription = OptionDescription(
         StrOption("profile_based_inline",
                   "Use call count profiling to drive inlining"
                   ", specify arguments",
-                  default=None),   # cmdline="--prof-based-inline" fix me
+                  default=None, cmdline="--prof-based-inline"),
         FloatOption("profile_based_inline_threshold",
                     "Threshold when to inline functions "
                     "for profile based inlining",
                   default=DEFL_PROF_BASED_INLINE_THRESHOLD,
-                  ),   # cmdline="--prof-based-inline-threshold" fix me
+                  cmdline="--prof-based-inline-threshold"),
+        IntOption("profile_based_inline_min_count",
+                  "Number of calls during the profiling run from which "
+                  "a call site is inlined by profile based inlining",
+                  default=250, cmdline="--prof-based-inline-min-count"),
         StrOption("profile_based_inline_heuristic",
                   "Dotted name of an heuristic function "
                   "for profile based inlining",
@@ -51,9 +51,15 @@ op = _OpHolder()
 func2op = {}
 
 class HLOperationMeta(type):
+    def __new__(meta, name, bases, attrdict):
+        # no instance __dict__: there is one operation object per
+        # operation of every flow graph
+        attrdict.setdefault('__slots__', ())
+        return type.__new__(meta, name, bases, attrdict)
+
     def __init__(cls, name, bases, attrdict):
         type.__init__(cls, name, bases, attrdict)
-        if hasattr(cls, 'opname'):
+        if isinstance(cls.opname, str):   # not the slot of SpaceOperation
             setattr(op, cls.opname, cls)
         if cls.dispatch == 1:
             cls._registry = {}
@@ -200,6 +206,7 @@ class OverflowingOperation(PureOperation):
         return ovf
 
 class SingleDispatchMixin(object):
+    __slots__ = ()
     dispatch = 1
 
     @classmethod
@@ -256,6 +263,7 @@ class SingleDispatchMixin(object):
 
 
 class DoubleDispatchMixin(object):
+    __slots__ = ()
     dispatch = 2
 
     @classmethod
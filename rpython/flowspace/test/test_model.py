@@ -119,3 +119,11 @@ def test_variable():
     assert v2.renamed
     assert v2.name.startswith("foobar_") and v2.name != v.name
     assert v2.name.split('_', 1)[1].isdigit()
+
+def test_operations_have_no_dict():
+    from rpython.flowspace.operation import op
+    assert not hasattr(pieces.addop, '__dict__')
+    for hlop in [op.add(pieces.i0, Constant(1)), op.getattr(pieces.i0,
+                 Constant('x')), op.simple_call(pieces.i0), op.newlist()]:
+        assert not hasattr(hlop, '__dict__')
+        assert hlop.opname in ('add', 'getattr', 'simple_call', 'newlist')
@@ -846,8 +846,10 @@ class PackSet(object):
                 oplist.append(vecop)
                 opnum = rop.VEC_INT_XOR
                 if datatype == FLOAT:
-                    # see PRECISION loss below
-                    raise NotImplementedError
+                    # summing floats in several lanes reorders the
+                    # additions; like numpy's pairwise summation this
+                    # can change the last bits of the result
+                    opnum = rop.VEC_FLOAT_XOR
                 vecop = VecOperation(opnum, [vecop, vecop],
                                      vecop, count)
                 oplist.append(vecop)
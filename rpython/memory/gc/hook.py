@@ -21,6 +21,14 @@ class GcHooks(object):
     def is_gc_collect_enabled(self):
         return False
 
+    def get_alloc_sample_interval(self):
+        """
+        Return the number of bytes to allocate in the nursery between two
+        calls to on_gc_alloc_sample(), or 0 to disable allocation sampling.
+        The GC checks it again after every sample and minor collection.
+        """
+        return 0
+
     def on_gc_minor(self, duration, total_memory_used, pinned_objects):
         """
         Called after a minor collection
@@ -45,6 +53,21 @@ class GcHooks(object):
         Called after a major collection is fully done
         """
 
+    def on_gc_alloc_sample(self, size):
+        """
+        Called from the allocation slow path when a nursery allocation of
+        ``size`` bytes is sampled.  The object is not initialized yet, but
+        the caller's stack is still the one that allocates it.
+        """
+
+    def on_gc_alloc_sample_done(self, typeindex, size, survived):
+        """
+        Called during the next minor collection, once for each call to
+        on_gc_alloc_sample() and in the same order.  ``typeindex`` is as
+        returned by gc.get_rpy_type_index() and ``survived`` tells if the
+        object was moved out of the nursery (or pinned).
+        """
+
     # the fire_* methods are meant to be called from the GC and should NOT be
     # overridden
 
@@ -68,3 +91,14 @@ class GcHooks(object):
                                arenas_count_before, arenas_count_after,
                                arenas_bytes, rawmalloc_bytes_before,
                                rawmalloc_bytes_after, pinned_objects)
+
+    # the two methods below are called only if get_alloc_sample_interval()
+    # returned a positive value, and always in pairs
+
+    @rgc.no_collect
+    def fire_gc_alloc_sample(self, size):
+        self.on_gc_alloc_sample(size)
+
+    @rgc.no_collect
+    def fire_gc_alloc_sample_done(self, typeindex, size, survived):
+        self.on_gc_alloc_sample_done(typeindex, size, survived)
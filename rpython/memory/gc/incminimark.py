@@ -52,6 +52,13 @@ Environment variables can be used to fine-tune the following parameters:
                          in time.  Defaults to a conservative value depending
                          on nursery size and maximum object size inside the
                          nursery.  Useful for debugging by setting it to 0.
+
+ PYPY_GC_RELEASE_MAX     The max amount of memory, in free pages of arenas
+                         that are still partly in use, that is given back
+                         to the OS (with madvise()) at the end of each
+                         major collection.  Defaults to 4 times the
+                         increment step.  A value smaller than a page,
+                         like '1', disables it.
 """
 # XXX Should find a way to bound the major collection threshold by the
 # XXX total addressable size.  Maybe by keeping some minimarkpage arenas
@@ -324,6 +331,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.nursery_free = llmemory.NULL
         self.nursery_top  = llmemory.NULL
         self.debug_tiny_nursery = -1
+        #
+        # Allocation sampling: while a sample is pending, 'nursery_top'
+        # is lowered and the real value is saved in 'alloc_sample_top'.
+        self.alloc_sample_top = llmemory.NULL
         self.debug_rotating_nurseries = lltype.nullptr(NURSARRAY)
         self.extra_threshold = 0
         #
@@ -425,6 +436,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
         # objects. The addresses are used to set the next 'nursery_top'.
         self.nursery_barriers = self.AddressDeque()
         #
+        # The start of the nursery allocations that were sampled since
+        # the last minor collection, in order.  See hooks.on_gc_alloc_sample.
+        self.alloc_samples = self.AddressDeque()
+        #
         # Counter tracking how many pinned objects currently reside inside
         # the nursery.
         self.pinned_objects_in_nursery = 0
@@ -446,6 +461,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
         if not self.read_from_env:
             self.allocate_nursery()
             self.gc_increment_step = self.nursery_size * 4
+            self.gc_release_max = self.gc_increment_step * 4
             self.gc_nursery_debug = False
         else:
             #
@@ -503,6 +519,12 @@ class IncrementalMiniMarkGC(MovingGCBase):
             else:
                 self.gc_increment_step = newsize * 4
             #
+            gc_release_max = env.read_uint_from_env('PYPY_GC_RELEASE_MAX')
+            if gc_release_max > 0:
+                self.gc_release_max = gc_release_max
+            else:
+                self.gc_release_max = self.gc_increment_step * 4
+            #
             nursery_debug = env.read_uint_from_env('PYPY_GC_NURSERY_DEBUG')
             if nursery_debug > 0:
                 self.gc_nursery_debug = True
@@ -869,6 +891,11 @@ class IncrementalMiniMarkGC(MovingGCBase):
         Otherwise do a minor collection, and possibly some steps of a
         major collection, and finally reserve totalsize bytes.
         """
+        if self.alloc_sample_top:
+            # 'nursery_top' was only lowered to take an allocation sample
+            result = self.take_alloc_sample(totalsize)
+            if result:
+                return result
 
         minor_collection_count = 0
         while True:
@@ -932,6 +959,9 @@ class IncrementalMiniMarkGC(MovingGCBase):
                               "enough. Too many pinned objects?")
                     self._minor_collection()
             #
+            # The minor collection may have lowered 'nursery_top' again
+            self.disarm_alloc_sample()
+            #
             # Tried to do something about nursery_free overflowing
             # nursery_top before this point. Try to reserve totalsize now.
             # If this succeeds break out of loop.
@@ -947,9 +977,63 @@ class IncrementalMiniMarkGC(MovingGCBase):
             if self.nursery_top - self.nursery_free > self.debug_tiny_nursery:
                 self.nursery_free = self.nursery_top - self.debug_tiny_nursery
         #
+        self.arm_alloc_sample()
         return result
     collect_and_reserve._dont_inline_ = True
 
+    def arm_alloc_sample(self):
+        """If the hooks ask for allocation sampling, lower 'nursery_top'
+        so that collect_and_reserve() is called again after the given
+        number of bytes.
+        """
+        interval = self.hooks.get_alloc_sample_interval()
+        if interval > 0 and not self.alloc_sample_top:
+            if self.nursery_top - self.nursery_free > interval:
+                self.alloc_sample_top = self.nursery_top
+                self.nursery_top = self.nursery_free + interval
+
+    def disarm_alloc_sample(self):
+        if self.alloc_sample_top:
+            self.nursery_top = self.alloc_sample_top
+            self.alloc_sample_top = llmemory.NULL
+
+    def take_alloc_sample(self, totalsize):
+        """Called when 'nursery_free' overflows a 'nursery_top' lowered
+        by arm_alloc_sample().  Returns the reserved memory, or NULL if
+        it does not fit in the nursery anyway.
+        """
+        result = self.nursery_free - totalsize
+        self.disarm_alloc_sample()
+        if self.nursery_free > self.nursery_top:
+            self.nursery_free = result
+            return llmemory.NULL
+        # the object is not initialized yet: the type and survival of
+        # the sample are found in the next minor collection
+        self.alloc_samples.append(result)
+        self.hooks.fire_gc_alloc_sample(raw_malloc_usage(totalsize))
+        self.arm_alloc_sample()
+        return result
+    take_alloc_sample._dont_inline_ = True
+
+    def finish_alloc_samples(self):
+        """Called during a minor collection, after all surviving objects
+        have been moved out of the nursery or flagged as pinned."""
+        size_gc_header = self.gcheaderbuilder.size_gc_header
+        while self.alloc_samples.non_empty():
+            obj = self.alloc_samples.popleft() + size_gc_header
+            survived = False
+            if self.is_forwarded(obj):
+                obj = self.get_forwarding_address(obj)
+                survived = True
+            elif self.header(obj).tid & GCFLAG_VISITED:   # pinned
+                survived = True
+            typeid = self.get_type_id(obj)
+            totalsize = size_gc_header + self.get_size(obj)
+            self.hooks.fire_gc_alloc_sample_done(
+                self.get_member_index(typeid),
+                raw_malloc_usage(totalsize),
+                survived)
+
 
     # XXX kill alloc_young and make it always True
     def external_malloc(self, typeid, length, alloc_young):
@@ -1107,6 +1191,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
         if self.next_major_collection_threshold < 0:
             # cannot trigger a full collection now, but we can ensure
             # that one will occur very soon
+            self.disarm_alloc_sample()
             self.nursery_free = self.nursery_top
 
     def can_optimize_clean_setarrayitems(self):
@@ -1772,6 +1857,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
         # All nursery barriers are invalid from this point on.  They
         # are evaluated anew as part of the minor collection.
         self.nursery_barriers.delete()
+        self.alloc_sample_top = llmemory.NULL
         #
         # Keeps track of surviving pinned objects. See also '_trace_drag_out()'
         # where this stack is filled.  Pinning an object only prevents it from
@@ -1892,6 +1978,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
         if self.young_rawmalloced_objects:
             self.free_young_rawmalloced_objects()
         #
+        # Report the type and fate of the sampled allocations.
+        if self.alloc_samples.non_empty():
+            self.finish_alloc_samples()
+        #
         # All live nursery objects are out of the nursery or pinned inside
         # the nursery.  Create nursery barriers to protect the pinned objects,
         # fill the rest of the nursery with zeros and reset the current nursery
@@ -1945,6 +2035,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
         #
         self.nursery_free = self.nursery
         self.nursery_top = self.nursery_barriers.popleft()
+        self.arm_alloc_sample()
         #
         # clear GCFLAG_PINNED_OBJECT_PARENT_KNOWN from all parents in the list.
         self.old_objects_pointing_to_pinned.foreach(
@@ -2576,6 +2667,11 @@ class IncrementalMiniMarkGC(MovingGCBase):
                         total_memory_used + self.max_delta),
                     reserving_size)
                 #
+                # Give back to the OS some of the free pages that are
+                # left inside arenas which are not completely empty.
+                released = self.ac.release_free_pages(
+                    intmask(self.gc_release_max // self.ac.page_size))
+                #
                 # Print statistics
                 debug_start("gc-collect-done")
                 debug_print("arenas:               ",
@@ -2583,6 +2679,9 @@ class IncrementalMiniMarkGC(MovingGCBase):
                             self.ac.arenas_count)
                 debug_print("bytes used in arenas: ",
                             self.ac.total_memory_used)
+                debug_print("pages released to OS: ", released,
+                            " (total bytes: ",
+                            self.ac.total_memory_released, ")")
                 debug_print("bytes raw-malloced:   ",
                             self.stat_rawmalloced_total_size, " => ",
                             self.rawmalloced_total_size)
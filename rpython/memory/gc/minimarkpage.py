@@ -16,6 +16,7 @@ assert 1 << WORD_POWER_2 == WORD
 # into pages.  For each arena we allocate one of the following structures:
 
 ARENA_PTR = lltype.Ptr(lltype.ForwardReference())
+ADDRESS_ARRAY = lltype.Ptr(rffi.CArray(llmemory.Address))
 ARENA = lltype.Struct('ArenaReference',
     # -- The address of the arena, as returned by malloc()
     ('base', llmemory.Address),
@@ -24,6 +25,13 @@ ARENA = lltype.Struct('ArenaReference',
     ('totalpages', lltype.Signed),
     # -- A chained list of free pages in the arena.  Ends with NULL.
     ('freepages', llmemory.Address),
+    # -- The number of free pages whose memory was given back to the OS,
+    #    and the array (of length 'totalpages') listing their addresses.
+    #    These pages are counted in 'nfreepages' too, but they are not
+    #    in the 'freepages' chained list: we cannot store a pointer in
+    #    them without making the OS page resident again.
+    ('nreleasedpages', lltype.Signed),
+    ('releasedpages', ADDRESS_ARRAY),
     # -- A linked list of arenas.  See below.
     ('nextarena', ARENA_PTR),
     )
@@ -52,6 +60,11 @@ ARENA_NULL = lltype.nullptr(ARENA)
 #
 # - free: used to be partially full, and is now free again.  The page is
 #   on the chained list of free pages 'freepages' from its arena.
+#
+# - released: a free page whose memory was given back to the OS with
+#   madvise() by release_free_pages().  The page is listed in the
+#   'releasedpages' array of its arena.  We reuse such pages only after
+#   all the free pages of the arena, to avoid faulting them in again.
 
 # Each allocated page contains blocks of a given size, which can again be in
 # one of three states: allocated, free, or uninitialized.  The uninitialized
@@ -143,6 +156,10 @@ class ArenaCollection(object):
         self.peak_memory_used = r_uint(0)
         self.total_memory_alloced = r_uint(0)
         self.peak_memory_alloced = r_uint(0)
+        #
+        # the part of 'total_memory_alloced' that is in released pages,
+        # i.e. that the OS can reclaim.
+        self.total_memory_released = r_uint(0)
 
 
     def _new_page_ptr_list(self, length):
@@ -201,10 +218,10 @@ class ArenaCollection(object):
         if self.current_arena == ARENA_NULL:
             self.allocate_new_arena()
         #
-        # The result is simply 'current_arena.freepages'.
+        # The result is usually 'current_arena.freepages'.
         arena = self.current_arena
         result = arena.freepages
-        if arena.nfreepages > 0:
+        if arena.nfreepages > arena.nreleasedpages:
             #
             # The 'result' was part of the chained list; read the next.
             arena.nfreepages -= 1
@@ -213,6 +230,16 @@ class ArenaCollection(object):
                                 llmemory.sizeof(llmemory.Address),
                                 0)
             #
+        elif arena.nreleasedpages > 0:
+            #
+            # No more resident free page: reuse a released page.  It
+            # will be faulted in again by the OS when we touch it.
+            arena.nfreepages -= 1
+            arena.nreleasedpages -= 1
+            result = arena.releasedpages[arena.nreleasedpages]
+            self.total_memory_released -= r_uint(self.page_size)
+            freepages = arena.freepages
+            #
         else:
             # The 'result' is part of the uninitialized pages.
             ll_assert(self.num_uninitialized_pages > 0,
@@ -224,7 +251,7 @@ class ArenaCollection(object):
                 freepages = NULL
         #
         arena.freepages = freepages
-        if freepages == NULL:
+        if freepages == NULL and arena.nreleasedpages == 0:
             # This was the last page, so put the arena away into
             # arenas_lists[0].
             ll_assert(arena.nfreepages == 0, 
@@ -316,6 +343,10 @@ class ArenaCollection(object):
         arena.nfreepages = 0        # they are all uninitialized pages
         arena.totalpages = npages
         arena.freepages = firstpage
+        arena.nreleasedpages = 0
+        arena.releasedpages = lltype.malloc(ADDRESS_ARRAY.TO, npages,
+                                            flavor='raw',
+                                            track_allocation=False)
         self.num_uninitialized_pages = npages
         self.current_arena = arena
         self.arenas_count += 1
@@ -407,6 +438,10 @@ class ArenaCollection(object):
                     llarena.arena_reset(arena.base, self.arena_size, 4)
                     llarena.arena_free(arena.base)
                     self.total_memory_alloced -= self.arena_size
+                    self.total_memory_released -= r_uint(
+                        arena.nreleasedpages * self.page_size)
+                    lltype.free(arena.releasedpages, flavor='raw',
+                                track_allocation=False)
                     lltype.free(arena, flavor='raw', track_allocation=False)
                     self.arenas_count -= 1
                     #
@@ -424,6 +459,43 @@ class ArenaCollection(object):
         self.min_empty_nfreepages = 1
 
 
+    def release_free_pages(self, max_pages):
+        """Give back to the OS the memory of at most 'max_pages' free
+        pages, which stay in their arena for later reuse.  Only call
+        this when no mass_free_incremental() is in progress.  Returns
+        the number of pages released.
+        """
+        # Start with the arenas that have the most free pages: they are
+        # the last ones from which _pick_next_arena() allocates, so their
+        # free pages are the least likely to be needed again soon.
+        released = 0
+        i = self.max_pages_per_arena - 1
+        while i >= 1 and released < max_pages:
+            arena = self.arenas_lists[i]
+            while arena != ARENA_NULL and released < max_pages:
+                released += self._release_arena_pages(arena,
+                                                      max_pages - released)
+                arena = arena.nextarena
+            i -= 1
+        self.total_memory_released += r_uint(released * self.page_size)
+        return released
+
+
+    def _release_arena_pages(self, arena, max_pages):
+        # Move pages from the 'freepages' chained list of 'arena' to its
+        # 'releasedpages' array.  The arena is not 'current_arena', so
+        # the chained list is exactly 'nfreepages - nreleasedpages' long.
+        count = 0
+        while arena.nfreepages > arena.nreleasedpages and count < max_pages:
+            pageaddr = arena.freepages
+            arena.freepages = pageaddr.address[0]
+            llarena.arena_reset(pageaddr, self.page_size, 4)
+            arena.releasedpages[arena.nreleasedpages] = pageaddr
+            arena.nreleasedpages += 1
+            count += 1
+        return count
+
+
     def mass_free_in_pages(self, size_class, ok_to_free_func, max_pages):
         nblocks = self.nblocks_for_size[size_class]
         block_size = size_class * WORD
@@ -20,6 +20,7 @@ class SimpleArenaCollection(object):
         self.small_request_threshold = small_request_threshold
         self.all_objects = []
         self.total_memory_used = 0
+        self.total_memory_released = 0
         self.arenas_count = 0
 
     def malloc(self, size):
@@ -57,3 +58,6 @@ class SimpleArenaCollection(object):
         self.mass_free_prepare()
         res = self.mass_free_incremental(ok_to_free_func, sys.maxint)
         assert res
+
+    def release_free_pages(self, max_pages):
+        return 0
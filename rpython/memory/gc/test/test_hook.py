@@ -10,6 +10,7 @@ class MyGcHooks(GcHooks):
         self._gc_minor_enabled = False
         self._gc_collect_step_enabled = False
         self._gc_collect_enabled = False
+        self._alloc_sample_interval = 0
         self.reset()
 
     def is_gc_minor_enabled(self):
@@ -21,11 +22,16 @@ class MyGcHooks(GcHooks):
     def is_gc_collect_enabled(self):
         return self._gc_collect_enabled
 
+    def get_alloc_sample_interval(self):
+        return self._alloc_sample_interval
+
     def reset(self):
         self.minors = []
         self.steps = []
         self.collects = []
         self.durations = []
+        self.samples = []
+        self.samples_done = []
 
     def on_gc_minor(self, duration, total_memory_used, pinned_objects):
         self.durations.append(duration)
@@ -53,6 +59,12 @@ class MyGcHooks(GcHooks):
             'pinned_objects': pinned_objects,
         })
 
+    def on_gc_alloc_sample(self, size):
+        self.samples.append(size)
+
+    def on_gc_alloc_sample_done(self, typeindex, size, survived):
+        self.samples_done.append((typeindex, size, survived))
+
 
 class TestIncMiniMarkHooks(BaseDirectGCTest):
     from rpython.memory.gc.incminimark import IncrementalMiniMarkGC as GCClass
@@ -129,3 +141,37 @@ class TestIncMiniMarkHooks(BaseDirectGCTest):
         assert self.gc.hooks.minors == []
         assert self.gc.hooks.steps == []
         assert self.gc.hooks.collects == []
+
+
+    def test_on_gc_alloc_sample(self):
+        self.gc.hooks._alloc_sample_interval = self.size_of_S * 2
+        self.gc._minor_collection()    # arms the first sample
+        for i in range(6):
+            p = self.malloc(S)
+            if i == 2:
+                self.stackroots.append(p)
+        # the 3rd and the 6th objects are sampled
+        assert self.gc.hooks.samples == [self.size_of_S, self.size_of_S]
+        assert self.gc.hooks.samples_done == []
+        self.gc._minor_collection()
+        obj = llmemory.cast_ptr_to_adr(self.stackroots[0])
+        typeindex = self.gc.get_member_index(self.gc.get_type_id(obj))
+        assert self.gc.hooks.samples_done == [
+            (typeindex, self.size_of_S, True),
+            (typeindex, self.size_of_S, False),
+            ]
+        #
+        self.gc.hooks._alloc_sample_interval = 0
+        self.gc.hooks.reset()
+        for i in range(6):
+            self.malloc(S)
+        self.gc._minor_collection()
+        # the sample armed by the previous minor collection is still taken
+        assert len(self.gc.hooks.samples) == 1
+        assert len(self.gc.hooks.samples_done) == 1
+        self.gc.hooks.reset()
+        for i in range(6):
+            self.malloc(S)
+        self.gc._minor_collection()
+        assert self.gc.hooks.samples == []
+        assert self.gc.nursery_top == self.gc.nursery + self.gc.nursery_size
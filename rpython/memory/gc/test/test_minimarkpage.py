@@ -402,6 +402,63 @@ def test_mass_free_half_page_becomes_more_free():
     assert freepages(ac) == NULL
     assert ac.full_page_for_size[2] == PAGE_NULL
 
+def put_arena_away(ac):
+    # move the current arena to arenas_lists[], where release_free_pages()
+    # and _pick_next_arena() find it
+    arena = ac.current_arena
+    ac.current_arena = lltype.nullptr(arena._T)
+    arena.nextarena = ac.arenas_lists[arena.nfreepages]
+    ac.arenas_lists[arena.nfreepages] = arena
+    ac.min_empty_nfreepages = 1
+
+def test_release_free_pages():
+    pagesize = hdrsize + 7*WORD
+    ac = arena_collection_for_test(pagesize, "2..#.", fill_with_objects=2)
+    arena = ac.current_arena
+    assert arena.nfreepages == 3
+    put_arena_away(ac)
+    #
+    assert ac.release_free_pages(2) == 2
+    assert arena.nfreepages == 3
+    assert arena.nreleasedpages == 2
+    assert arena.releasedpages[0] == pagenum(ac, 1)
+    assert arena.releasedpages[1] == pagenum(ac, 2)
+    assert arena.freepages == pagenum(ac, 4)
+    assert ac.total_memory_released == 2 * pagesize
+    #
+    assert ac.release_free_pages(5) == 1
+    assert arena.nreleasedpages == 3
+    assert arena.freepages == NULL
+    assert ac.release_free_pages(5) == 0
+    assert ac.total_memory_released == 3 * pagesize
+    #
+    # the released pages are reused in the reverse order
+    ac._pick_next_arena()
+    assert ac.current_arena == arena
+    page = ac.allocate_new_page(1); checkpage(ac, page, 4)
+    page = ac.allocate_new_page(3); checkpage(ac, page, 2)
+    assert ac.total_memory_released == pagesize
+    page = ac.allocate_new_page(4); checkpage(ac, page, 1)
+    assert arena.nfreepages == arena.nreleasedpages == 0
+    assert ac.total_memory_released == 0
+    assert not ac.current_arena
+
+def test_release_free_pages_prefers_resident_pages():
+    pagesize = hdrsize + 7*WORD
+    ac = arena_collection_for_test(pagesize, "2...")
+    arena = ac.current_arena
+    put_arena_away(ac)
+    assert ac.release_free_pages(1) == 1
+    assert arena.releasedpages[0] == pagenum(ac, 1)
+    #
+    ac._pick_next_arena()
+    page = ac.allocate_new_page(1); checkpage(ac, page, 2)
+    page = ac.allocate_new_page(3); checkpage(ac, page, 3)
+    assert arena.freepages == NULL and arena.nreleasedpages == 1
+    assert ac.current_arena == arena
+    page = ac.allocate_new_page(4); checkpage(ac, page, 1)
+    assert not ac.current_arena
+
 # ____________________________________________________________
 
 class DoneTesting(Exception):
@@ -483,6 +540,12 @@ def randomize(random, incremental):
             assert not (set(live_objects) & set(live_objects_extra))
             live_objects.update(live_objects_extra)
             #
+            # Give some of the free pages back to the OS
+            released_before = ac.total_memory_released
+            released = ac.release_free_pages(random.randrange(0, 5))
+            assert (ac.total_memory_released - released_before ==
+                    released * ac.page_size)
+            #
     except DoneTesting:
         pass
 
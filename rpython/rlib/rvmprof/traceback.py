@@ -26,6 +26,21 @@ def traceback(estimate_number_of_entries):
     return (array_p, array_length)
 
 
+def traceback_into(array_p, size):
+    """Like traceback(), but fill the caller-provided raw array 'array_p'
+    of 'size' entries.  Returns the number of entries written.  This does
+    not allocate anything, so it can be called e.g. from GC hooks.
+    """
+    if not cintf.IS_SUPPORTED:
+        return 0
+    _cintf = rvmprof._get_vmprof().cintf
+    stack = cintf.get_rvmprof_stack()
+    voidpp = rffi.cast(rffi.VOIDPP, array_p)
+    array_length = _cintf.vmprof_get_traceback(stack, llmemory.NULL, voidpp,
+                                               size)
+    return widen(array_length)
+
+
 LOC_INTERPRETED    = 0
 LOC_JITTED         = 1
 LOC_JITTED_INLINED = 2
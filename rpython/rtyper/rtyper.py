@@ -12,6 +12,7 @@ fixpoint computation part.
 """
 
 import os
+import time
 
 import py, math
 
@@ -218,10 +219,18 @@ class RPythonTyper(object):
                 r.shuffle(pending)
 
             previous_percentage = 0
+            profiler = self.annotator.translator.profiler
             # specialize all blocks in the 'pending' list
             for block in pending:
                 blockcount += 1
-                self.specialize_block(block)
+                if profiler is None:
+                    self.specialize_block(block)
+                else:
+                    t0 = time.time()
+                    self.specialize_block(block)
+                    profiler.add_graph_time('rtype',
+                                            self.annotator.annotated[block],
+                                            time.time() - t0)
                 self.already_seen[block] = True
                 # progress bar
                 n = len(self.already_seen)
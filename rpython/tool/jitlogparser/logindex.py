@@ -0,0 +1,227 @@
+""" An on-disk index of the traces of a PYPYLOG file, for logs that are
+too large to be loaded with import_log().
+
+build_index() reads the log once, line by line, and records for every
+optimized loop and bridge the offsets of its text in the file, the guards
+it contains, the guard it is a bridge of, and the code objects that appear
+in its debug_merge_points.  LogIndex then answers queries from the index
+and parses single traces on demand, reading them through mmap.
+
+Syntax:
+    python logindex.py <logfilename> [--guard 0x...] [--file <filename>]
+"""
+
+from __future__ import print_function
+
+import os, sys, re, json, mmap
+
+from rpython.tool.jitlogparser.parser import SimpleParser, parse_code_data
+
+INDEX_VERSION = 1
+
+CATEGORIES = ('jit-log-opt-loop', 'jit-log-opt-bridge')
+
+r_start = re.compile(r"(?:\x1b.*?m)?\[[0-9a-fA-F]+\] \{([\w-]+)")
+r_stop = re.compile(r"(?:\x1b.*?m)?\[[0-9a-fA-F]+\] ([\w-]+)\}")
+r_guard = re.compile(r"descr=<Guard0x(-?[\da-f]+)>")
+r_bridge = re.compile(r"# bridge out of Guard 0x(-?[\da-f]+)")
+r_loop = re.compile(r"# Loop (\d+)")
+
+
+def default_index_name(logname):
+    return logname + '.index'
+
+def _parse_trace_header(comment):
+    m = r_bridge.match(comment)
+    if m is not None:
+        return 'bridge', int(m.group(1), 16)
+    m = r_loop.match(comment)
+    if m is not None:
+        return 'loop', int(m.group(1))
+    return 'loop', None
+
+def _scan_line(entry, line):
+    if not entry['comment'] and line.startswith('#'):
+        entry['comment'] = line.rstrip()
+        entry['kind'], entry['number'] = _parse_trace_header(entry['comment'])
+    elif 'descr=<Guard0x' in line:
+        m = r_guard.search(line)
+        if m is not None:
+            entry['guards'].append(int(m.group(1), 16))
+    elif line.startswith('debug_merge_point('):
+        arg = line.split(', ', 2)[-1].rstrip()
+        if arg.endswith(')'):
+            arg = arg[:-1]
+        name, _, filename, lineno, _ = parse_code_data(arg.strip("'"))
+        if filename is not None:
+            code = [name, filename, lineno]
+            if code not in entry['codes']:
+                entry['codes'].append(code)
+
+def scan_log(f):
+    """Read the log file 'f' and return the list of index entries of its
+    traces."""
+    traces = []
+    entry = None
+    pos = 0
+    for line in f:
+        nextpos = pos + len(line)
+        if line.startswith('[') or line.startswith('\x1b'):
+            m = r_start.match(line)
+            if m is not None and m.group(1) in CATEGORIES:
+                entry = {'category': m.group(1), 'start': nextpos,
+                         'stop': nextpos, 'comment': '', 'kind': 'loop',
+                         'number': None, 'guards': [], 'codes': []}
+                pos = nextpos
+                continue
+            m = r_stop.match(line)
+            if m is not None and entry is not None and (
+                    m.group(1) == entry['category']):
+                entry['stop'] = pos
+                traces.append(entry)
+                entry = None
+                pos = nextpos
+                continue
+        if entry is not None:
+            _scan_line(entry, line)
+        pos = nextpos
+    return traces
+
+def build_index(logname, indexname=None):
+    """Build the index of the log 'logname' and write it to 'indexname'.
+    Returns the index as a LogIndex."""
+    if indexname is None:
+        indexname = default_index_name(logname)
+    st = os.stat(logname)
+    with open(logname, 'rb') as f:
+        if f.read(2) == 'BZ':
+            raise ValueError("%s: compressed logs cannot be indexed"
+                             % (logname,))
+        f.seek(0)
+        traces = scan_log(f)
+    data = {'version': INDEX_VERSION,
+            'logsize': st.st_size,
+            'logmtime': st.st_mtime,
+            'traces': traces}
+    tmpname = '%s~%d' % (indexname, os.getpid())
+    with open(tmpname, 'w') as f:
+        json.dump(data, f)
+    os.rename(tmpname, indexname)
+    return LogIndex(logname, data)
+
+def open_index(logname, indexname=None):
+    """Return the LogIndex of 'logname', reusing the index file if it is
+    up-to-date and (re)building it otherwise."""
+    if indexname is None:
+        indexname = default_index_name(logname)
+    try:
+        with open(indexname) as f:
+            data = json.load(f)
+    except (IOError, ValueError):
+        return build_index(logname, indexname)
+    st = os.stat(logname)
+    if (data.get('version') != INDEX_VERSION or
+            data['logsize'] != st.st_size or
+            data['logmtime'] != st.st_mtime):
+        return build_index(logname, indexname)
+    return LogIndex(logname, data)
+
+
+class LogIndex(object):
+    def __init__(self, logname, data):
+        self.logname = logname
+        self.traces = data['traces']
+        self._mmap = None
+        self._parsed = {}
+        self.guard_owner = {}      # {guard_no: trace_no}
+        self.bridges_of = {}       # {guard_no: [trace_no]}
+        self.by_filename = {}      # {filename: [trace_no]}
+        for i, entry in enumerate(self.traces):
+            for guard_no in entry['guards']:
+                self.guard_owner[guard_no] = i
+            if entry['kind'] == 'bridge':
+                self.bridges_of.setdefault(entry['number'], []).append(i)
+            filenames = set([code[1] for code in entry['codes']])
+            for filename in filenames:
+                self.by_filename.setdefault(filename, []).append(i)
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def get_text(self, i):
+        """The text of the trace number 'i', read lazily from the log."""
+        if self._mmap is None:
+            with open(self.logname, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+        entry = self.traces[i]
+        return self._mmap[entry['start']:entry['stop']]
+
+    def get_trace(self, i, ParserCls=SimpleParser):
+        """The parsed trace number 'i'."""
+        try:
+            return self._parsed[i]
+        except KeyError:
+            pass
+        parser = ParserCls(self.get_text(i), None, {}, 'lltype', None,
+                           nonstrict=True)
+        loop = parser.parse()
+        self._parsed[i] = loop
+        return loop
+
+    def loops(self):
+        return [i for i, entry in enumerate(self.traces)
+                if entry['kind'] == 'loop']
+
+    def bridges(self):
+        return [i for i, entry in enumerate(self.traces)
+                if entry['kind'] == 'bridge']
+
+    def bridges_from_guard(self, guard_no):
+        """The bridges attached to the guard 'guard_no'."""
+        return self.bridges_of.get(guard_no, [])
+
+    def trace_of_guard(self, guard_no):
+        """The trace containing the guard 'guard_no', or None."""
+        return self.guard_owner.get(guard_no)
+
+    def traces_touching_file(self, filename):
+        """The traces that contain code from 'filename', which can be
+        given as the path used in the log or as its basename."""
+        if filename in self.by_filename:
+            return self.by_filename[filename]
+        result = set()
+        for key, traces in self.by_filename.items():
+            if os.path.basename(key) == filename:
+                result.update(traces)
+        return sorted(result)
+
+    def describe(self, i):
+        entry = self.traces[i]
+        return '%d: %s (%d guards, %d code objects)' % (
+            i, entry['comment'] or entry['category'], len(entry['guards']),
+            len(entry['codes']))
+
+
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Index the traces of a PYPYLOG file and query them")
+    parser.add_argument('logfile')
+    parser.add_argument('--guard', help="list the bridges from this guard")
+    parser.add_argument('--file', help="list the traces touching this file")
+    args = parser.parse_args(argv)
+    index = open_index(args.logfile)
+    if args.guard is not None:
+        selected = index.bridges_from_guard(int(args.guard, 16))
+    elif args.file is not None:
+        selected = index.traces_touching_file(args.file)
+    else:
+        selected = range(len(index.traces))
+    for i in selected:
+        print(index.describe(i))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,93 @@
+import py
+from rpython.tool.udir import udir
+from rpython.tool.jitlogparser.logindex import (build_index, open_index,
+                                                default_index_name)
+
+LOG = """\
+[1000] {jit-log-opt-loop
+# Loop 0 (<code object f, file 'x.py', line 2> #9 LOAD_FAST) : loop with 3 ops
+[p0, i1]
+debug_merge_point(0, 0, '<code object f. file 'x.py'. line 2> #9 LOAD_FAST')
++100: i2 = int_lt(i1, 10)
+guard_true(i2, descr=<Guard0x10>) [p0, i1]
+debug_merge_point(1, 1, '<code object g. file '/tmp/y.py'. line 5> #3 RETURN_VALUE')
++110: i3 = int_add(i1, 1)
+guard_no_overflow(descr=<Guard0x11>) [p0, i3]
++120: jump(p0, i3, descr=TargetToken(1234))
+[1010] jit-log-opt-loop}
+[1020] {jit-backend-counts
+entry 0:12
+[1030] jit-backend-counts}
+[1040] {jit-log-opt-bridge
+# bridge out of Guard 0x10 with 2 ops
+[p0, i1]
+debug_merge_point(0, 0, '<code object f. file 'x.py'. line 2> #20 RETURN_VALUE')
++30: guard_value(i1, 10, descr=<Guard0x12>) [p0, i1]
++40: finish(i1)
+[1050] jit-log-opt-bridge}
+[1060] {jit-log-opt-bridge
+# bridge out of Guard 0x10 with 1 ops
+[p0, i1]
++30: finish(i1)
+[1070] jit-log-opt-bridge}
+"""
+
+def make_log(name):
+    logfile = udir.join('test_logindex').ensure(dir=1).join(name)
+    logfile.write(LOG)
+    return str(logfile)
+
+def test_build_index():
+    logname = make_log('build.log')
+    index = build_index(logname)
+    assert py.path.local(default_index_name(logname)).check()
+    assert len(index.traces) == 3
+    assert index.loops() == [0]
+    assert index.bridges() == [1, 2]
+    assert index.traces[0]['guards'] == [0x10, 0x11]
+    assert index.traces[0]['codes'] == [['f', 'x.py', 2],
+                                        ['g', '/tmp/y.py', 5]]
+    assert index.bridges_from_guard(0x10) == [1, 2]
+    assert index.bridges_from_guard(0x11) == []
+    assert index.trace_of_guard(0x12) == 1
+    assert index.trace_of_guard(0x99) is None
+    assert index.traces_touching_file('x.py') == [0, 1]
+    assert index.traces_touching_file('y.py') == [0]
+    assert index.traces_touching_file('/tmp/y.py') == [0]
+
+def test_lazy_traces():
+    logname = make_log('lazy.log')
+    index = build_index(logname)
+    text = index.get_text(1)
+    assert text.startswith('# bridge out of Guard 0x10')
+    assert text.endswith('+40: finish(i1)\n')
+    loop = index.get_trace(0)
+    assert [op.name for op in loop.operations] == [
+        'debug_merge_point', 'int_lt', 'guard_true', 'debug_merge_point',
+        'int_add', 'guard_no_overflow', 'jump']
+    assert index.get_trace(0) is loop
+    bridge = index.get_trace(1)
+    assert bridge.operations[-1].name == 'finish'
+    index.close()
+
+def test_open_index_reuses_or_rebuilds():
+    logname = make_log('reuse.log')
+    indexfile = py.path.local(default_index_name(logname))
+    index = open_index(logname)
+    assert len(index.traces) == 3
+    # an up-to-date index is reused
+    indexfile.write(indexfile.read().replace('"x.py"', '"z.py"'))
+    assert open_index(logname).traces_touching_file('z.py') == [0, 1]
+    # a changed log is indexed again
+    py.path.local(logname).write(LOG.split('[1040]')[0])
+    index = open_index(logname)
+    assert len(index.traces) == 1
+    assert index.traces_touching_file('x.py') == [0]
+
+def test_logtest2():
+    logname = str(py.path.local(__file__).join('..', 'logtest2.log'))
+    index = build_index(logname, str(udir.join('logtest2.index')))
+    assert len(index.loops()) == 2
+    assert index.traces_touching_file('x.py') == [0, 1]
+    loop = index.get_trace(1)
+    assert loop.comment.startswith('# Loop 1 ')
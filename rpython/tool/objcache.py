@@ -0,0 +1,142 @@
+"""
+A content-addressed cache of object files, used by the Makefiles that
+the C backend generates when translating with --objcache.
+
+The compilation rule for the '.c' files is prefixed with
+
+    python objcache.py CACHEDIR
+
+which runs the compiler itself with the '-E' flag, and hashes the
+preprocessed source together with the compiler and the command line
+arguments.  If an object file with this hash is already in CACHEDIR, it
+is copied instead of compiling the source again.  Otherwise the real
+command is run and its result stored in the cache.  The size of the
+cache is bounded by cleanup(), which removes the least recently used
+entries.
+"""
+
+import sys, os, subprocess
+from hashlib import md5
+
+
+def find_executable(name):
+    if os.sep in name:
+        return name
+    for dir in os.environ.get('PATH', '').split(os.pathsep):
+        fn = os.path.join(dir, name)
+        if os.path.isfile(fn):
+            return fn
+    return name
+
+def split_args(args):
+    """Return (outputfile, preprocess_args, key_args) for the compiler
+    command line 'args', which must have the form 'CC ... -o OUT -c ...'.
+    Returns None if the command line is not understood."""
+    if '-c' not in args or '-o' not in args:
+        return None
+    i = args.index('-o')
+    if i + 1 >= len(args):
+        return None
+    outputfile = args[i + 1]
+    args = args[:i] + args[i + 2:]
+    preprocess_args = [(arg if arg != '-c' else '-E') for arg in args]
+    return outputfile, preprocess_args, args
+
+def compute_key(args):
+    """Hash the preprocessed source, the compiler and the arguments of the
+    command line 'args'.  Returns (outputfile, key), or (None, None) if
+    the command line is not understood or the preprocessing failed."""
+    split = split_args(args)
+    if split is None:
+        return None, None
+    outputfile, preprocess_args, key_args = split
+    p = subprocess.Popen(preprocess_args, stdout=subprocess.PIPE,
+                         stderr=subprocess.PIPE)
+    source, _ = p.communicate()
+    if p.returncode != 0:
+        return None, None
+    h = md5()
+    compiler = find_executable(key_args[0])
+    try:
+        st = os.stat(compiler)
+        h.update(repr((compiler, st.st_size, st.st_mtime)))
+    except OSError:
+        h.update(repr(compiler))
+    h.update(repr(key_args))
+    if '-g' in key_args or [arg for arg in key_args if arg.startswith('-g')]:
+        # the debugging information contains the current directory
+        h.update(os.getcwd())
+    h.update(source)
+    return outputfile, h.hexdigest()
+
+def cache_path(cachedir, key):
+    return os.path.join(cachedir, key[:2], key[2:] + '.o')
+
+def copy_file(src, dst):
+    tmpdst = '%s~%d' % (dst, os.getpid())
+    with open(src, 'rb') as fsrc:
+        data = fsrc.read()
+    with open(tmpdst, 'wb') as fdst:
+        fdst.write(data)
+    os.rename(tmpdst, dst)
+
+def run_cached(cachedir, args):
+    """Run the compiler command line 'args', going through the cache.
+    Returns the exit status of the compiler."""
+    outputfile, key = compute_key(args)
+    if key is None:
+        return subprocess.call(args)
+    path = cache_path(cachedir, key)
+    if os.path.exists(path):
+        try:
+            copy_file(path, outputfile)
+            os.utime(path, None)    # mark as recently used
+            return 0
+        except (IOError, OSError):
+            pass
+    status = subprocess.call(args)
+    if status == 0:
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            copy_file(outputfile, path)
+        except (IOError, OSError):
+            pass    # e.g. several processes creating the same directory
+    return status
+
+def cleanup(cachedir, maxsize):
+    """Remove the least recently used entries from 'cachedir' until their
+    total size is at most 'maxsize' bytes.  Returns the remaining size."""
+    entries = []
+    total = 0
+    if not os.path.isdir(cachedir):
+        return 0
+    for subdir in os.listdir(cachedir):
+        subdir = os.path.join(cachedir, subdir)
+        if not os.path.isdir(subdir):
+            continue
+        for name in os.listdir(subdir):
+            fn = os.path.join(subdir, name)
+            try:
+                st = os.stat(fn)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, fn, st.st_size))
+            total += st.st_size
+    entries.sort()
+    for _, fn, size in entries:
+        if total <= maxsize:
+            break
+        try:
+            os.unlink(fn)
+        except OSError:
+            continue
+        total -= size
+    return total
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print >> sys.stderr, "usage: %s CACHEDIR CC ARGS..." % (sys.argv[0],)
+        sys.exit(2)
+    sys.exit(run_cached(sys.argv[1], sys.argv[2:]))
@@ -0,0 +1,53 @@
+import os
+from rpython.tool.udir import udir
+from rpython.tool import objcache
+
+localudir = udir.join('test_objcache').ensure(dir=1)
+
+def entries(cachedir):
+    return sorted(f.basename for f in cachedir.visit('*.o'))
+
+def test_split_args():
+    assert objcache.split_args(['gcc', '-O2', '-o', 'x.o', '-c', 'x.c']) == (
+        'x.o', ['gcc', '-O2', '-E', 'x.c'], ['gcc', '-O2', '-c', 'x.c'])
+    assert objcache.split_args(['gcc', '-o', 'x', 'x.c']) is None
+
+def test_run_cached():
+    tmpdir = localudir.join('run_cached').ensure(dir=1)
+    cachedir = tmpdir.join('cache')
+    tmpdir.join('answer.h').write('#define ANSWER 42\n')
+    cfile = tmpdir.join('x.c')
+    cfile.write('#include "answer.h"\nint answer(void) { return ANSWER; }\n')
+    ofile = tmpdir.join('x.o')
+    args = ['gcc', '-O2', '-I', str(tmpdir), '-o', str(ofile),
+            '-c', str(cfile)]
+    assert objcache.run_cached(str(cachedir), args) == 0
+    assert len(entries(cachedir)) == 1
+    data = ofile.read('rb')
+    ofile.remove()
+    # a hit: the object file is copied from the cache
+    assert objcache.run_cached(str(cachedir), args) == 0
+    assert ofile.read('rb') == data
+    assert len(entries(cachedir)) == 1
+    # changing a header or the flags gives a different entry
+    tmpdir.join('answer.h').write('#define ANSWER 43\n')
+    assert objcache.run_cached(str(cachedir), args) == 0
+    assert len(entries(cachedir)) == 2
+    args[1] = '-O1'
+    assert objcache.run_cached(str(cachedir), args) == 0
+    assert len(entries(cachedir)) == 3
+    # compilation errors are not cached
+    cfile.write('#error BOOM\n')
+    assert objcache.run_cached(str(cachedir), args) != 0
+    assert len(entries(cachedir)) == 3
+
+def test_cleanup():
+    cachedir = localudir.join('cleanup').ensure(dir=1)
+    for i in range(5):
+        f = cachedir.join('%02d' % i, 'entry.o')
+        f.write('x' * 100, ensure=True)
+        os.utime(str(f), (1000 + i, 1000 + i))
+    assert objcache.cleanup(str(cachedir), 250) == 200
+    assert sorted(f.dirpath().basename for f in cachedir.visit('*.o')) == [
+        '03', '04']
+    assert objcache.cleanup(str(cachedir.join('missing')), 0) == 0
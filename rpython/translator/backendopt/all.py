@@ -12,6 +12,7 @@ from rpython.translator.backendopt.removeassert import remove_asserts
 from rpython.translator.backendopt.support import log
 from rpython.translator.backendopt.storesink import storesink_graph
 from rpython.translator.backendopt import gilanalysis
+from rpython.translator.transprofile import measure_pass
 from rpython.flowspace.model import checkgraph
 
 INLINE_THRESHOLD_FOR_TEST = 33
@@ -53,25 +54,29 @@ def backend_optimizations(translator, graphs=None, secondary=False,
         print_statistics(translator.graphs[0], translator, "per-graph.txt")
 
     if config.replace_we_are_jitted:
-        for graph in graphs:
-            replace_we_are_jitted(graph)
+        with measure_pass(translator, 'replace_we_are_jitted', graphs):
+            for graph in graphs:
+                replace_we_are_jitted(graph)
 
     if config.remove_asserts:
-        constfold(config, graphs)
-        remove_asserts(translator, graphs)
+        constfold(config, graphs, translator)
+        with measure_pass(translator, 'remove_asserts', graphs):
+            remove_asserts(translator, graphs)
 
     if config.really_remove_asserts:
-        for graph in graphs:
-            removenoops.remove_debug_assert(graph)
+        with measure_pass(translator, 'remove_debug_assert', graphs):
+            for graph in graphs:
+                removenoops.remove_debug_assert(graph)
         # the dead operations will be killed by the remove_obvious_noops below
 
     # remove obvious no-ops
     def remove_obvious_noops():
-        for graph in graphs:
-            removenoops.remove_same_as(graph)
-            simplify.eliminate_empty_blocks(graph)
-            simplify.transform_dead_op_vars(graph, translator)
-            removenoops.remove_duplicate_casts(graph, translator)
+        with measure_pass(translator, 'remove_obvious_noops', graphs):
+            for graph in graphs:
+                removenoops.remove_same_as(graph)
+                simplify.eliminate_empty_blocks(graph)
+                simplify.transform_dead_op_vars(graph, translator)
+                removenoops.remove_duplicate_casts(graph, translator)
 
         if config.print_statistics:
             print("after no-op removal:")
@@ -89,34 +94,40 @@ def backend_optimizations(translator, graphs=None, secondary=False,
                                     threshold,
                                     inline_heuristic=heuristic,
                          inline_graph_from_anywhere=inline_graph_from_anywhere)
-        constfold(config, graphs)
+        constfold(config, graphs, translator)
 
     if config.storesink:
         remove_obvious_noops()
-        for graph in graphs:
-            storesink_graph(graph)
+        with measure_pass(translator, 'storesink', graphs):
+            for graph in graphs:
+                storesink_graph(graph)
 
     if config.profile_based_inline and not secondary:
         threshold = config.profile_based_inline_threshold
         heuristic = get_function(config.profile_based_inline_heuristic)
+        min_count = config.profile_based_inline_min_count
         inline.instrument_inline_candidates(graphs, threshold)
         counters = translator.driver_instrument_result(
             config.profile_based_inline)
         n = len(counters)
+        log.inlining("%d of %d instrumented call sites are hot" % (
+            len([c for c in counters if c >= min_count]), n))
         def call_count_pred(label):
             if label >= n:
                 return False
-            return counters[label] > 250 # xxx introduce an option for this
+            return counters[label] >= min_count
         inline_malloc_removal_phase(config, translator, graphs,
                                     threshold,
                                     inline_heuristic=heuristic,
                                     call_count_pred=call_count_pred)
-    constfold(config, graphs)
+        inline.remove_instrument_counts(graphs)
+    constfold(config, graphs, translator)
 
     if config.merge_if_blocks:
         log.mergeifblocks("starting to merge if blocks")
-        for graph in graphs:
-            merge_if_blocks(graph, translator.config.translation.verbose)
+        with measure_pass(translator, 'merge_if_blocks', graphs):
+            for graph in graphs:
+                merge_if_blocks(graph, translator.config.translation.verbose)
 
     if config.print_statistics:
         print("after if-to-switch:")
@@ -127,13 +138,15 @@ def backend_optimizations(translator, graphs=None, secondary=False,
     for graph in graphs:
         checkgraph(graph)
 
-    gilanalysis.analyze(graphs, translator)
+    with measure_pass(translator, 'gilanalysis', graphs):
+        gilanalysis.analyze(graphs, translator)
 
 
-def constfold(config, graphs):
+def constfold(config, graphs, translator=None):
     if config.constfold:
-        for graph in graphs:
-            constant_fold_graph(graph)
+        with measure_pass(translator, 'constfold', graphs):
+            for graph in graphs:
+                constant_fold_graph(graph)
 
 def inline_malloc_removal_phase(config, translator, graphs, inline_threshold,
                                 inline_heuristic,
@@ -145,9 +158,10 @@ def inline_malloc_removal_phase(config, translator, graphs, inline_threshold,
         log.inlining("heuristic: %s.%s" % (inline_heuristic.__module__,
                                            inline_heuristic.__name__))
 
-        inline.auto_inline_graphs(translator, graphs, inline_threshold,
-                                  heuristic=inline_heuristic,
-                                  call_count_pred=call_count_pred,
+        with measure_pass(translator, 'inline', graphs):
+            inline.auto_inline_graphs(translator, graphs, inline_threshold,
+                                      heuristic=inline_heuristic,
+                                      call_count_pred=call_count_pred,
                          inline_graph_from_anywhere=inline_graph_from_anywhere)
 
         if config.print_statistics:
@@ -157,7 +171,8 @@ def inline_malloc_removal_phase(config, translator, graphs, inline_threshold,
     # vaporize mallocs
     if config.mallocs:
         log.malloc("starting malloc removal")
-        remove_mallocs(translator, graphs)
+        with measure_pass(translator, 'remove_mallocs', graphs):
+            remove_mallocs(translator, graphs)
 
         if config.print_statistics:
             print("after malloc removal:")
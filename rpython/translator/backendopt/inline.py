@@ -601,6 +601,17 @@ def instrument_inline_candidates(graphs, threshold):
                         n += 1
     log.inlining("%d call sites instrumented" % n)
 
+def remove_instrument_counts(graphs):
+    """Remove the operations inserted by instrument_inline_candidates(),
+    including the copies made by inlining."""
+    for graph in graphs:
+        for block in graph.iterblocks():
+            for op in block.operations:
+                if op.opname == 'instrument_count':
+                    block.operations = [op for op in block.operations
+                                        if op.opname != 'instrument_count']
+                    break
+
 def always_inline(graph):
     return (hasattr(graph, 'func') and
             getattr(graph.func, '_always_inline_', None))
@@ -103,7 +103,9 @@ def find_inner_loops(graph, check_exitswitch_type=None):
                len(cycle))            # minimize len(cycle)
         loops.append((key, loop))
 
-    loops.sort()
+    # sort on the keys only: comparing the Loop instances of equal keys
+    # would depend on their addresses
+    loops.sort(key=lambda item: item[0])
 
     # returns 'loops' without overlapping blocks
     result = []
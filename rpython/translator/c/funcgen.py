@@ -50,6 +50,7 @@ class FunctionCodeGenerator(object):
             db.gettype(T)  # force the type to be considered by the database
 
         self.illtypes = None
+        self.reset_localnames()
 
     def collect_var_and_types(self):
         #
@@ -85,6 +86,11 @@ class FunctionCodeGenerator(object):
     def implementation_begin(self):
         SSI_to_SSA(self.graph)
         self.collect_var_and_types()
+        self.reset_localnames()
+        for v in self.graph.getargs():
+            self.localname(v)
+        for v in self.allvariables():
+            self.localname(v)
         self.blocknum = {}
         for block in self.graph.iterblocks():
             self.blocknum[block] = len(self.blocknum)
@@ -108,9 +114,32 @@ class FunctionCodeGenerator(object):
         self.vars = None
         self.blocknum = None
         self.innerloops = None
+        self.localnames = None
+        self.localcounters = None
+
+    def reset_localnames(self):
+        self.localnames = {}      # {Variable name: C name}
+        self.localcounters = {}   # {Variable prefix: next number}
+
+    def localname(self, v):
+        # The C names of the local variables are numbered per function and
+        # not globally like the names of the Variables, which are assigned
+        # lazily.  So the source of a function does not depend on what was
+        # rendered before it, e.g. in the same process with --source-jobs.
+        # Variables that SSI_to_SSA() gave the same name share the C name.
+        name = v.name
+        try:
+            return self.localnames[name]
+        except KeyError:
+            prefix = v._name
+            nr = self.localcounters.get(prefix, 0)
+            self.localcounters[prefix] = nr + 1
+            result = LOCALVAR % ('%s%d' % (prefix, nr))
+            self.localnames[name] = result
+            return result
 
     def argnames(self):
-        return [LOCALVAR % v.name for v in self.graph.getargs()]
+        return [self.localname(v) for v in self.graph.getargs()]
 
     def allvariables(self):
         return [v for v in self.vars if isinstance(v, Variable)]
@@ -138,7 +167,7 @@ class FunctionCodeGenerator(object):
             if self.lltypemap(v) is Void and special_case_void:
                 return '/* nothing */'
             else:
-                return LOCALVAR % v.name
+                return self.localname(v)
         elif isinstance(v, Constant):
             value = llvalue_from_constant(v)
             if value is None and not special_case_void:
@@ -154,14 +183,14 @@ class FunctionCodeGenerator(object):
         # declare the local variables, excluding the function arguments
         seen = set()
         for a in self.graph.getargs():
-            seen.add(a.name)
+            seen.add(self.localname(a))
 
         result_by_name = []
         for v in self.allvariables():
-            name = v.name
+            name = self.localname(v)
             if name not in seen:
                 seen.add(name)
-                result = cdecl(self.lltypename(v), LOCALVAR % name) + ';'
+                result = cdecl(self.lltypename(v), name) + ';'
                 if self.lltypemap(v) is Void:
                     continue  #result = '/*%s*/' % result
                 result_by_name.append((v._name, result))
@@ -294,7 +323,7 @@ class FunctionCodeGenerator(object):
             if a2type is Void:
                 continue
             src = self.expr(a1)
-            dest = LOCALVAR % a2.name
+            dest = self.localname(a2)
             assignments.append((a2typename, dest, src))
         for line in gen_assignments(assignments):
             yield line
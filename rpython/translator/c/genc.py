@@ -2,7 +2,7 @@ from __future__ import print_function
 
 import contextlib
 import py
-import sys, os
+import sys, os, time
 from rpython.rlib import exports
 from rpython.rtyper.lltypesystem.lltype import getfunctionptr
 from rpython.rtyper.lltypesystem import lltype
@@ -211,7 +211,8 @@ class CBuilder(object):
                 defines['PYPY_MAIN_FUNCTION'] = "pypy_main_startup"
         self.eci, cfile, extra, headers_to_precompile = \
                 gen_source(db, modulename, targetdir,
-                           self.eci, defines=defines, split=self.split)
+                           self.eci, defines=defines, split=self.split,
+                           jobs=self.config.translation.source_jobs)
         self.c_source_filename = py.path.local(cfile)
         self.extrafiles = self.eventually_copy(extra)
         self.gen_makefile(targetdir, exe_name=exe_name,
@@ -339,9 +340,18 @@ class CStandaloneBuilder(CBuilder):
             extra_opts += ["lldebug0"]
         self.translator.platform.execute_makefile(self.targetdir,
                                                   extra_opts)
+        if self.config.translation.objcache:
+            self.cleanup_objcache()
         self._compiled = True
         return self.executable_name
 
+    def cleanup_objcache(self):
+        from rpython.config.translationoption import CACHE_DIR
+        from rpython.tool import objcache
+        maxsize = self.config.translation.objcache_maxsize * 1024 * 1024
+        size = objcache.cleanup(os.path.join(CACHE_DIR, 'objcache'), maxsize)
+        log.objcache("object file cache size: %.1f MB" % (size / 1048576.0,))
+
     def gen_makefile(self, targetdir, exe_name=None, headers_to_precompile=[]):
         module_files = self.eventually_copy(self.eci.separate_module_files)
         self.eci.separate_module_files = []
@@ -530,7 +540,7 @@ class SourceGenerator:
         self.path = None
         self.namespace = NameManager()
 
-    def set_strategy(self, path, split=True):
+    def set_strategy(self, path, split=True, jobs=1):
         all_nodes = list(self.database.globalcontainers())
         # split off non-function nodes. We don't try to optimize these, yet.
         funcnodes = []
@@ -545,6 +555,7 @@ class SourceGenerator:
         self.funcnodes = funcnodes
         self.othernodes = othernodes
         self.path = path
+        self.jobs = jobs
 
     def uniquecname(self, name):
         assert name.endswith('.c')
@@ -599,8 +610,7 @@ class SourceGenerator:
                 return "data_" + name
         return basecname
 
-    def splitnodesimpl(self, basecname, nodes, nextra, nbetween,
-                       split_criteria=SPLIT_CRITERIA):
+    def groupnodes(self, basecname, nodes):
         # Gather nodes by some criteria:
         nodes_by_base_cfile = {}
         for node in nodes:
@@ -609,28 +619,134 @@ class SourceGenerator:
                 nodes_by_base_cfile[c_filename].append(node)
             else:
                 nodes_by_base_cfile[c_filename] = [node]
+        return [(basecname, nodes_by_base_cfile[basecname])
+                for basecname in sorted(nodes_by_base_cfile)]
 
+    def splitgroup(self, nodes, nextra, nbetween, split_criteria):
         # produce a sequence of nodes, grouped into files
         # which have no more than SPLIT_CRITERIA lines
-        for basecname in sorted(nodes_by_base_cfile):
-            iternodes = iter(nodes_by_base_cfile[basecname])
-            done = [False]
-            def subiter():
-                used = nextra
-                for node in iternodes:
-                    impl = '\n'.join(list(node.implementation())).split('\n')
-                    if not impl:
-                        continue
-                    cost = len(impl) + nbetween
-                    yield node, impl
-                    del impl
-                    if used + cost > split_criteria:
-                        # split if criteria met, unless we would produce nothing.
-                        raise StopIteration
-                    used += cost
-                done[0] = True
-            while not done[0]:
-                yield self.uniquecname(basecname), subiter()
+        iternodes = iter(nodes)
+        done = [False]
+        def subiter():
+            used = nextra
+            for node in iternodes:
+                impl = '\n'.join(list(node.implementation())).split('\n')
+                if not impl:
+                    continue
+                cost = len(impl) + nbetween
+                yield node, impl
+                del impl
+                if used + cost > split_criteria:
+                    # split if criteria met, unless we would produce nothing.
+                    raise StopIteration
+                used += cost
+            done[0] = True
+        while not done[0]:
+            yield subiter()
+
+    def splitnodesimpl(self, basecname, nodes, nextra, nbetween,
+                       split_criteria=SPLIT_CRITERIA):
+        for basecname, groupnodes in self.groupnodes(basecname, nodes):
+            for nodeiter in self.splitgroup(groupnodes, nextra, nbetween,
+                                            split_criteria):
+                yield self.uniquecname(basecname), nodeiter
+
+    def can_write_in_parallel(self):
+        # the generation of the implementations must not update the
+        # database, because the changes would be lost in the worker
+        # processes
+        db = self.database
+        return (self.jobs > 1 and not self.one_source_file and
+                hasattr(os, 'fork') and
+                not isinstance(self.path, NullPyPathLocal) and
+                not db.translator.config.translation.instrument and
+                not db.reverse_debugger and
+                db.all_field_names is None)
+
+    def splitnodesimpl_parallel(self, basecname, nodes, nextra, nbetween,
+                                split_criteria=SPLIT_CRITERIA):
+        """Like splitnodesimpl(), but the implementations are generated by
+        forked processes, each one handling some of the groups of nodes.
+        Every process writes the content of its files to a temporary
+        directory; the files themselves are named and written here, in the
+        same order as splitnodesimpl(), so that the result is the same.
+        """
+        import marshal
+        groups = self.groupnodes(basecname, nodes)
+        tmpdir = self.path.join('_parts_' + basecname[:-2])
+        tmpdir.ensure(dir=1)
+        pids = []
+        try:
+            for job in range(self.jobs):
+                pid = os.fork()
+                if pid == 0:
+                    try:
+                        numparts = {}
+                        for i in range(job, len(groups), self.jobs):
+                            j = 0
+                            for nodeiter in self.splitgroup(groups[i][1],
+                                                            nextra, nbetween,
+                                                            split_criteria):
+                                with tmpdir.join('%d_%d.c' % (i, j)).open(
+                                        'w') as fc:
+                                    for node, impl in nodeiter:
+                                        print('\n'.join(impl), file=fc)
+                                        print(MARKER, file=fc)
+                                j += 1
+                            numparts[i] = j
+                        with tmpdir.join('job_%d' % job).open('wb') as fr:
+                            marshal.dump(numparts, fr)
+                    except:
+                        import traceback
+                        traceback.print_exc()
+                        os._exit(1)
+                    os._exit(0)
+                pids.append(pid)
+            numparts = {}
+            failed = []
+            for job in range(len(pids)):
+                _, status = os.waitpid(pids[job], 0)
+                pids[job] = 0
+                if not os.WIFEXITED(status) or os.WEXITSTATUS(status) != 0:
+                    failed.append(job)
+                    continue
+                with tmpdir.join('job_%d' % job).open('rb') as fr:
+                    numparts.update(marshal.load(fr))
+            if failed:
+                raise Exception("process %d writing the C sources failed"
+                                % (failed[0],))
+            for i in range(len(groups)):
+                for j in range(numparts[i]):
+                    yield (self.uniquecname(groups[i][0]),
+                           tmpdir.join('%d_%d.c' % (i, j)))
+        finally:
+            # also when the caller stops early or an error occurs: don't
+            # leave processes or the temporary directory behind
+            for pid in pids:
+                if pid:
+                    os.waitpid(pid, 0)
+            tmpdir.remove()
+
+    def write_implementations(self, f, basecname, nodes, nextra,
+                              split_criteria, write_header):
+        if self.can_write_in_parallel():
+            parts = self.splitnodesimpl_parallel(basecname, nodes, nextra,
+                                                 1, split_criteria)
+        else:
+            parts = self.splitnodesimpl(basecname, nodes, nextra, 1,
+                                        split_criteria)
+        for name, content in parts:
+            with self.write_on_maybe_separate_source(f, name) as fc:
+                if fc is not f:
+                    write_header(fc, name)
+                print(MARKER, file=fc)
+                if isinstance(content, py.path.local):
+                    fc.write(content.read())
+                else:
+                    for node, impl in content:
+                        print('\n'.join(impl), file=fc)
+                        print(MARKER, file=fc)
+                print('/***********************************************************/', file=fc)
 
     @contextlib.contextmanager
     def write_on_included_file(self, f, name):
@@ -681,45 +797,40 @@ class SourceGenerator:
             print('#include "revdb_def.h"', file=f)
         print(file=f)
 
+        def write_nonfunc_header(fc, name):
+            print('/***********************************************************/', file=fc)
+            print('/***  Non-function Implementations                       ***/', file=fc)
+            print(file=fc)
+            print('#include "singleheader.h"', file=fc)
+            print('#include "src/g_include.h"', file=fc)
+            print(file=fc)
+
+        def write_func_header(fc, name):
+            print('/***********************************************************/', file=fc)
+            print('/***  Implementations                                    ***/', file=fc)
+            print(file=fc)
+            print('#include "singleheader.h"', file=fc)
+            print('#define PYPY_FILE_NAME "%s"' % name, file=fc)
+            print('#include "src/g_include.h"', file=fc)
+            if self.database.reverse_debugger:
+                print('#include "revdb_def.h"', file=fc)
+            print(file=fc)
+
+        t_start = time.time()
         nextralines = 11 + 1
-        for name, nodeiter in self.splitnodesimpl('nonfuncnodes.c',
-                                                   self.othernodes,
-                                                   nextralines, 1):
-            with self.write_on_maybe_separate_source(f, name) as fc:
-                if fc is not f:
-                    print('/***********************************************************/', file=fc)
-                    print('/***  Non-function Implementations                       ***/', file=fc)
-                    print(file=fc)
-                    print('#include "singleheader.h"', file=fc)
-                    print('#include "src/g_include.h"', file=fc)
-                    print(file=fc)
-                print(MARKER, file=fc)
-                for node, impl in nodeiter:
-                    print('\n'.join(impl), file=fc)
-                    print(MARKER, file=fc)
-                print('/***********************************************************/', file=fc)
-
+        self.write_implementations(f, 'nonfuncnodes.c', self.othernodes,
+                                   nextralines, SPLIT_CRITERIA,
+                                   write_nonfunc_header)
         nextralines = 12
-        for name, nodeiter in self.splitnodesimpl('implement.c',
-                                                   self.funcnodes,
-                                                   nextralines, 1,
-                                                   split_criteria_big):
-            with self.write_on_maybe_separate_source(f, name) as fc:
-                if fc is not f:
-                    print('/***********************************************************/', file=fc)
-                    print('/***  Implementations                                    ***/', file=fc)
-                    print(file=fc)
-                    print('#include "singleheader.h"', file=fc)
-                    print('#define PYPY_FILE_NAME "%s"' % name, file=fc)
-                    print('#include "src/g_include.h"', file=fc)
-                    if self.database.reverse_debugger:
-                        print('#include "revdb_def.h"', file=fc)
-                    print(file=fc)
-                print(MARKER, file=fc)
-                for node, impl in nodeiter:
-                    print('\n'.join(impl), file=fc)
-                    print(MARKER, file=fc)
-                print('/***********************************************************/', file=fc)
+        self.write_implementations(f, 'implement.c', self.funcnodes,
+                                   nextralines, split_criteria_big,
+                                   write_func_header)
+        if self.can_write_in_parallel():
+            njobs = self.jobs
+        else:
+            njobs = 1
+        log.timing("wrote the implementations in %.1f seconds, with %d "
+                   "process(es)" % (time.time() - t_start, njobs))
         print(file=f)
         if self.database.all_field_names is not None:
             gen_fieldstats(f, self)
@@ -845,7 +956,7 @@ def add_extra_files(database, eci):
 
 
 def gen_source(database, modulename, targetdir,
-               eci, defines={}, split=False):
+               eci, defines={}, split=False, jobs=1):
     if isinstance(targetdir, str):
         targetdir = py.path.local(targetdir)
 
@@ -875,7 +986,7 @@ def gen_source(database, modulename, targetdir,
     # 2) Implementation of functions and global structures and arrays
     #
     sg = SourceGenerator(database)
-    sg.set_strategy(targetdir, split)
+    sg.set_strategy(targetdir, split, jobs)
     sg.gen_readable_parts_of_source(f)
     headers_to_precompile = sg.headers_to_precompile[:]
     headers_to_precompile.insert(0, incfilename)
@@ -356,6 +356,121 @@ class TestStandalone(StandaloneTestsVerified):
         assert "  ll_strtod.c" in makefile
         assert "  ll_strtod.o" in makefile
 
+    def test_source_jobs(self, monkeypatch):
+        from rpython.translator.c.genc import gen_source, SourceGenerator
+        def entry_point(argv):
+            print len(argv), str(12.5)
+            return 0
+        t = TranslationContext(self.config)
+        t.buildannotator().build_types(entry_point, [s_list_of_strings])
+        t.buildrtyper().specialize()
+        cbuilder = CStandaloneBuilder(t, entry_point, t.config)
+        db = cbuilder.build_database()
+
+        def generate(name, jobs):
+            # in a forked process, so that each run starts from the same
+            # database: writing the sources adds nodes to it
+            targetdir = udir.join('test_source_jobs', name)
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    targetdir.ensure(dir=1)
+                    gen_source(db, 'testing', targetdir, cbuilder.eci,
+                               split=True, jobs=jobs)
+                except:
+                    import traceback
+                    traceback.print_exc()
+                    os._exit(1)
+                os._exit(0)
+            _, status = os.waitpid(pid, 0)
+            assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+            assert not targetdir.listdir('_parts_*')
+            return dict([(f.basename, f.read())
+                         for f in targetdir.listdir('*.[ch]')])
+
+        files1 = generate('one', 1)
+        assert len(files1) > 3
+        # exactly the same files, whatever the number of processes
+        # writing them
+        for name, jobs in [('three', 3), ('eight', 8)]:
+            files = generate(name, jobs)
+            assert sorted(files) == sorted(files1)
+            assert [basename for basename in sorted(files)
+                    if files[basename] != files1[basename]] == []
+        funcnames = []
+        for content in files1.values():
+            funcnames += re.findall(r'^\w.*\b(pypy_g_\w+)\(', content, re.M)
+        assert 'pypy_g_entry_point' in funcnames
+        # a process fails: the error is reported and the temporary files
+        # are removed
+        def splitgroup(*args):
+            raise ValueError
+        monkeypatch.setattr(SourceGenerator, 'splitgroup', splitgroup)
+        targetdir = udir.ensure('test_source_jobs', 'failing', dir=1)
+        excinfo = py.test.raises(Exception, gen_source, db, 'testing',
+                                 targetdir, cbuilder.eci, split=True, jobs=3)
+        assert 'writing the C sources failed' in str(excinfo.value)
+        assert not targetdir.listdir('_parts_*')
+
+    def test_objcache(self, monkeypatch):
+        from rpython.config import translationoption
+        cachedir = udir.ensure('test_objcache', dir=1)
+        monkeypatch.setattr(translationoption, 'CACHE_DIR', str(cachedir))
+        def entry_point(argv):
+            print 'hello', len(argv)
+            return 0
+        t = TranslationContext(self.config)
+        t.config.translation.objcache = True
+        t.buildannotator().build_types(entry_point, [s_list_of_strings])
+        t.buildrtyper().specialize()
+        cbuilder = CStandaloneBuilder(t, entry_point, t.config)
+        cbuilder.generate_source()
+        cbuilder.compile()
+        assert cbuilder.cmdexec('a b') == 'hello 3\n'
+        entries = sorted(cachedir.visit('*.o'))
+        assert entries
+        # rebuilding from scratch only reuses the cached object files
+        for ofile in cbuilder.targetdir.listdir('*.o'):
+            ofile.remove()
+        cbuilder.executable_name.remove()
+        cbuilder._compiled = False
+        cbuilder.compile()
+        assert cbuilder.cmdexec('a b') == 'hello 3\n'
+        assert sorted(cachedir.visit('*.o')) == entries
+
+    def test_profile_based_inline(self):
+        from rpython.translator.driver import TranslationDriver
+        from rpython.translator.translator import graphof
+        def hot(x):
+            return x * 3 + 1
+        def cold(x):
+            return x * 5 - 1
+        def entry_point(argv):
+            n = int(argv[1])
+            total = 0
+            for i in range(n):
+                total += hot(i)
+            if n < 0:
+                total += cold(n)
+            print total
+            return 0
+        driver = TranslationDriver(overrides={
+            'translation.backendopt.inline': False,
+            'translation.backendopt.profile_based_inline': '1000',
+            'translation.backendopt.profile_based_inline_min_count': 500})
+        driver.setup(entry_point, None)
+        driver.proceed(['backendopt'])
+        t = driver.translator
+        graph = graphof(t, entry_point)
+        callees = set()
+        for block in graph.iterblocks():
+            for op in block.operations:
+                assert op.opname != 'instrument_count'
+                if op.opname == 'direct_call':
+                    callees.add(op.args[0].value._obj._name)
+        assert not [name for name in callees if 'hot' in name]
+        assert [name for name in callees if 'cold' in name]
+
     def test_debug_print_start_stop(self):
         import sys
         from rpython.rtyper.lltypesystem import rffi
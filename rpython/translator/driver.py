@@ -47,13 +47,13 @@ class ProfInstrument(object):
         self.datafile = datafile
         self.compiler = compiler
 
-    def first(self):
-        return self.compiler._build()
-
     def probe(self, exe, args):
         env = os.environ.copy()
         env['PYPY_INSTRUMENT_COUNTERS'] = str(self.datafile)
-        self.compiler.platform.execute(exe, args, env=env)
+        res = self.compiler.translator.platform.execute(exe, args, env=env)
+        if res.returncode != 0:
+            log.WARNING("instrumented run exited with status %d"
+                        % (res.returncode,))
 
     def after(self):
         # xxx
@@ -208,6 +208,10 @@ class TranslationDriver(SimpleTaskEngine):
                 self.secondary_entrypoints.extend(points)
 
         self.translator.driver_instrument_result = self.instrument_result
+        if self.config.translation.transprofile:
+            from rpython.translator.transprofile import TranslationProfiler
+            self.translator.profiler = TranslationProfiler(
+                self.config.translation.transprofile)
 
     def setup_library(self, libdef, policy=None, extra={}, empty_translator=None):
         """ Used by carbon python only. """
@@ -223,13 +227,17 @@ class TranslationDriver(SimpleTaskEngine):
 
         datafile = udir.join('_instrument_counters')
         makeProfInstrument = lambda compiler: ProfInstrument(datafile, compiler)
+        # the name of the directory in udir where the child builds, reserved
+        # here so that the later builds of this process don't reuse it
+        from rpython.translator.gensupp import uniquemodulename
+        modulename = uniquemodulename('testing')
 
         pid = os.fork()
         if pid == 0:
             # child compiling and running with instrumentation
             self.config.translation.instrument = True
             self.config.translation.instrumentctl = (makeProfInstrument,
-                                                     args)
+                                                     args, modulename)
             raise Instrument
         else:
             pid, status = os.waitpid(pid, 0)
@@ -269,6 +277,9 @@ class TranslationDriver(SimpleTaskEngine):
         debug_start('translation-task')
         debug_print('starting', goal)
         self.timer.start_event(goal)
+        profiler = self.translator.profiler
+        if profiler is not None:
+            profiler.start_task(goal)
         try:
             instrument = False
             try:
@@ -287,6 +298,9 @@ class TranslationDriver(SimpleTaskEngine):
             try:
                 debug_stop('translation-task')
                 self.timer.end_event(goal)
+                if profiler is not None:
+                    profiler.end_task(goal)
+                    profiler.write()
             except (KeyboardInterrupt, SystemExit):
                 raise
             except:
@@ -432,6 +446,8 @@ class TranslationDriver(SimpleTaskEngine):
                                        gchooks=gchooks)
         if not standalone:     # xxx more messy
             cbuilder.modulename = self.extmod_name
+        if self.config.translation.instrument:
+            cbuilder.modulename = self.config.translation.instrumentctl[2]
         database = cbuilder.build_database()
         self.log.info("database for generating C source was created")
         self.cbuilder = cbuilder
@@ -534,6 +550,14 @@ class TranslationDriver(SimpleTaskEngine):
             kwds['exe_name'] = self.compute_exe_name().basename
         cbuilder.compile(**kwds)
 
+        if self.config.translation.instrument:
+            # we are the child forked by instrument_result(): run the
+            # training workload and exit
+            makeProfInstrument, args, _ = self.config.translation.instrumentctl
+            instrument = makeProfInstrument(cbuilder)
+            instrument.probe(cbuilder.executable_name, args)
+            instrument.after()
+
         if self.standalone:
             self.c_entryp = cbuilder.executable_name
             self.create_exe()
@@ -218,6 +218,14 @@ class BasePosix(Platform):
             ]
         if profopt==True and shared==True:
             definitions.append(('PROFOPT_TARGET', exe_name.basename))
+        if config and config.translation.objcache:
+            from rpython.config.translationoption import CACHE_DIR
+            objcache = py.path.local(CACHE_DIR).join('objcache')
+            definitions.append(('OBJCACHE', '"%s" "%s" "%s"' % (
+                sys.executable, os.path.join(rpydir, 'tool', 'objcache.py'),
+                objcache)))
+        else:
+            definitions.append(('OBJCACHE', ''))
 
         for args in definitions:
             m.definition(*args)
@@ -243,7 +251,7 @@ class BasePosix(Platform):
         rules = [
             ('all', '$(DEFAULT_TARGET)', []),
             ('$(TARGET)', '$(OBJECTS)', ['$(CC_LINK) $(LDFLAGSEXTRA) -o $@ $(OBJECTS) $(LIBDIRS) $(LIBS) $(LINKFILES) $(LDFLAGS)', '$(MAKE) postcompile BIN=$(TARGET)']),
-            ('%.o', o_dependency, '$(CC) $(CFLAGS) $(CFLAGSEXTRA) -o $@ -c $< $(INCLUDEDIRS)'),
+            ('%.o', o_dependency, '$(OBJCACHE) $(CC) $(CFLAGS) $(CFLAGSEXTRA) -o $@ -c $< $(INCLUDEDIRS)'),
             ('%.o', '%.s', '$(CC) $(CFLAGS) $(CFLAGSEXTRA) -o $@ -c $< $(INCLUDEDIRS)'),
             ('%.o', '%.cxx', '$(CXX) $(CFLAGS) $(CFLAGSEXTRA) -o $@ -c $< $(INCLUDEDIRS)'),
         ] + extra_rules
@@ -46,6 +46,18 @@ class TestMakefile(object):
         mk.write()
         assert 'LINKFILES = /foo/bar.a' in tmpdir.join('Makefile').read()
 
+    def test_objcache(self):
+        from rpython.config.translationoption import get_combined_translation_config
+        tmpdir = udir.join('objcache' + self.__class__.__name__).ensure(dir=1)
+        config = get_combined_translation_config(translating=True)
+        config.translation.objcache = True
+        mk = self.platform.gen_makefile(['blip.c'], ExternalCompilationInfo(),
+                                        path=tmpdir, config=config)
+        mk.write()
+        makefile = tmpdir.join('Makefile').read()
+        assert 'objcache.py' in makefile
+        assert '$(OBJCACHE) $(CC)' in makefile
+
     def test_preprocess_localbase(self):
         tmpdir = udir.join('test_preprocess_localbase').ensure(dir=1)
         eci = ExternalCompilationInfo()
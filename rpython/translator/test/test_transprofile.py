@@ -0,0 +1,62 @@
+from rpython.translator.driver import TranslationDriver
+from rpython.translator.transprofile import load, report
+from rpython.tool.udir import udir
+
+
+def test_profile_translation():
+    def g(n):
+        return n * 2 + 1
+    def f(n):
+        total = 0
+        for i in range(n):
+            total += g(i)
+        return total
+
+    filename = str(udir.join('test_transprofile.json'))
+    td = TranslationDriver(overrides={'translation.transprofile': filename})
+    td.setup(f, [int])
+    td.annotate()
+    td.rtype()
+    td.backendopt()
+
+    data = load(filename)
+    assert [task['name'] for task in data['tasks']] == [
+        'annotate', 'rtype_lltype', 'backendopt_lltype']
+    for task in data['tasks']:
+        assert task['wall'] >= 0.0
+        assert task['peak_rss_kb'] > 0
+    for phase in ['annotate', 'rtype']:
+        names = [key.split('.')[-1] for key in data['graphs'][phase]]
+        assert 'f' in names and 'g' in names
+    passes = [p['name'] for p in data['passes']]
+    assert 'inline' in passes
+    assert 'remove_mallocs' in passes
+    [inline] = [p for p in data['passes'] if p['name'] == 'inline']
+    assert inline['blocks_before'] > 0
+    assert inline['ops_before'] > 0
+
+    lines = report(data, top=5)
+    assert 'Tasks:' in lines
+    assert 'Heaviest backendopt passes:' in lines
+    assert [line for line in lines if 'rtype_lltype' in line]
+
+def test_report_ranking():
+    data = {'tasks': [],
+            'graphs': {'annotate': {'a': [0.5, 2], 'b': [1.5, 3],
+                                    'c': [0.1, 1]}},
+            'passes': [{'name': 'fast', 'wall': 0.1, 'cpu': 0.1,
+                        'graphs': 3, 'blocks_before': 10,
+                        'blocks_after': 8, 'ops_before': 30,
+                        'ops_after': 20},
+                       {'name': 'slow', 'wall': 2.0, 'cpu': 1.9,
+                        'graphs': 3, 'blocks_before': 10,
+                        'blocks_after': 10, 'ops_before': 30,
+                        'ops_after': 30}]}
+    lines = report(data, top=2)
+    i = lines.index('Heaviest graphs for annotate (3 graphs, 2.1 s in total):')
+    assert lines[i + 1].endswith(' b')
+    assert lines[i + 2].endswith(' a')
+    assert not lines[i + 3]
+    i = lines.index('Heaviest backendopt passes:')
+    assert lines[i + 2].split()[0] == 'slow'
+    assert lines[i + 3].split()[0] == 'fast'
@@ -0,0 +1,96 @@
+""" Measure the memory used by the flow graphs of a translation.
+
+    python graphmemory.py [--backendopt] path/to/targetxxx.py [target args]
+
+Annotates and rtypes the target (and optionally runs the backend
+optimizations), then walks all the graphs and reports the number and the
+approximate size of the blocks, links, operations, variables and
+constants, including their lists and instance dictionaries.
+"""
+
+from __future__ import print_function
+
+import sys, gc
+from rpython.flowspace.model import Constant
+
+
+def _sizeof(obj):
+    size = sys.getsizeof(obj)
+    d = getattr(obj, '__dict__', None)
+    if d is not None:
+        size += sys.getsizeof(d)
+    return size
+
+def measure_graphs(graphs):
+    """Return {kind: [count, bytes]} for the objects of the flow 'graphs'."""
+    result = {}
+    seen = set()
+    def add(kind, obj, extra=()):
+        if id(obj) in seen:
+            return
+        seen.add(id(obj))
+        entry = result.setdefault(kind, [0, 0])
+        entry[0] += 1
+        entry[1] += _sizeof(obj) + sum([sys.getsizeof(x) for x in extra])
+    def addarg(arg):
+        if isinstance(arg, Constant):
+            add('Constant', arg)
+        else:
+            add('Variable', arg)
+    for graph in graphs:
+        add('FunctionGraph', graph)
+        for block in graph.iterblocks():
+            add('Block', block, [block.inputargs, block.operations,
+                                 block.exits])
+            for v in block.inputargs:
+                addarg(v)
+            for op in block.operations:
+                add('SpaceOperation', op, [op.args])
+                for arg in op.args:
+                    addarg(arg)
+                addarg(op.result)
+            if block.exitswitch is not None:
+                addarg(block.exitswitch)
+            for link in block.exits:
+                add('Link', link, [link.args])
+                for arg in link.args:
+                    if arg is not None:
+                        addarg(arg)
+    return result
+
+def report(result):
+    lines = ['%-16s %10s %10s %8s' % ('kind', 'count', 'MB', 'bytes/obj')]
+    total = 0
+    for kind, (count, size) in sorted(result.items(),
+                                      key=lambda item: -item[1][1]):
+        lines.append('%-16s %10d %10.1f %8d' % (
+            kind, count, size / 1048576.0, size // max(count, 1)))
+        total += size
+    lines.append('%-16s %10s %10.1f' % ('total', '', total / 1048576.0))
+    return lines
+
+
+def main(argv):
+    from rpython.translator.driver import TranslationDriver
+    from rpython.translator.goal.translate import load_target
+    backendopt = '--backendopt' in argv
+    if backendopt:
+        argv.remove('--backendopt')
+    if not argv:
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    targetspec_dic = load_target(argv[0])
+    driver = TranslationDriver.from_targetspec(targetspec_dic,
+                                               args=argv[1:])
+    driver.annotate()
+    driver.rtype()
+    if backendopt:
+        driver.backendopt()
+    gc.collect()
+    graphs = driver.translator.graphs
+    print('%d graphs' % len(graphs))
+    for line in report(measure_graphs(graphs)):
+        print(line)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,21 @@
+from rpython.translator.translator import TranslationContext
+from rpython.translator.tool.graphmemory import measure_graphs, report
+
+
+def test_measure_graphs():
+    def f(n):
+        total = 0
+        while n > 0:
+            total += n
+            n -= 1
+        return total
+    t = TranslationContext()
+    t.buildannotator().build_types(f, [int])
+    t.buildrtyper().specialize()
+    result = measure_graphs(t.graphs)
+    assert result['FunctionGraph'][0] == len(t.graphs)
+    for kind in ['Block', 'Link', 'SpaceOperation', 'Variable', 'Constant']:
+        count, size = result[kind]
+        assert count > 0 and size > 0
+    lines = report(result)
+    assert lines[-1].startswith('total')
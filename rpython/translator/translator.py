@@ -41,6 +41,7 @@ class TranslationContext(object):
         self.callgraph = {}   # {opaque_tag: (caller-graph, callee-graph)}
         self._prebuilt_graphs = {}   # only used by the pygame viewer
         self._call_at_startup = []
+        self.profiler = None   # a TranslationProfiler, see transprofile.py
 
     def buildflowgraph(self, func, mute_dot=False):
         """Get the flow graph for a function."""
@@ -0,0 +1,177 @@
+""" Optional profiling of the translation itself (--transprofile).
+
+Records the wall time, CPU time and peak RSS of every driver task, the
+time spent annotating and rtyping every graph, and the time of every
+backendopt pass together with the number of blocks and operations before
+and after it.  The result is written as a JSON file; run this module as
+a script to get a report of the heaviest tasks, graphs and passes:
+
+    python rpython/translator/transprofile.py profile.json [--top N]
+"""
+
+from __future__ import print_function
+
+import os, sys, time, json
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def cpu_time():
+    t = os.times()
+    return t[0] + t[1]
+
+def peak_rss():
+    """Peak resident set size of the process, in kilobytes."""
+    if resource is None:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        maxrss //= 1024     # reported in bytes
+    return maxrss
+
+def graph_key(graph):
+    func = getattr(graph, 'func', None)
+    if func is not None and hasattr(func, '__module__'):
+        return '%s.%s' % (func.__module__, graph.name)
+    return graph.name
+
+def count_graphs(graphs):
+    nblocks = nops = 0
+    for graph in graphs:
+        for block in graph.iterblocks():
+            nblocks += 1
+            nops += len(block.operations)
+    return nblocks, nops
+
+
+class TranslationProfiler(object):
+    def __init__(self, filename):
+        self.filename = filename
+        self.tasks = []
+        self.graphs = {}       # {phase: {graph_key: [time, count]}}
+        self.passes = []
+        self._task_start = None
+
+    def start_task(self, name):
+        self._task_start = (name, time.time(), cpu_time(), peak_rss())
+
+    def end_task(self, name):
+        start_name, wall0, cpu0, rss0 = self._task_start
+        assert start_name == name
+        self._task_start = None
+        rss = peak_rss()
+        self.tasks.append({'name': name,
+                           'wall': time.time() - wall0,
+                           'cpu': cpu_time() - cpu0,
+                           'peak_rss_kb': rss,
+                           'peak_rss_growth_kb': rss - rss0})
+
+    def add_graph_time(self, phase, graph, duration):
+        d = self.graphs.setdefault(phase, {})
+        key = graph_key(graph)
+        try:
+            entry = d[key]
+        except KeyError:
+            entry = d[key] = [0.0, 0]
+        entry[0] += duration
+        entry[1] += 1
+
+    @contextmanager
+    def measure_pass(self, name, graphs):
+        blocks0, ops0 = count_graphs(graphs)
+        wall0 = time.time()
+        cpu0 = cpu_time()
+        yield
+        wall = time.time() - wall0
+        cpu = cpu_time() - cpu0
+        blocks1, ops1 = count_graphs(graphs)
+        self.passes.append({'name': name,
+                            'wall': wall,
+                            'cpu': cpu,
+                            'graphs': len(graphs),
+                            'blocks_before': blocks0,
+                            'blocks_after': blocks1,
+                            'ops_before': ops0,
+                            'ops_after': ops1})
+
+    def as_dict(self):
+        return {'tasks': self.tasks,
+                'graphs': self.graphs,
+                'passes': self.passes}
+
+    def write(self):
+        tmpname = self.filename + '~'
+        with open(tmpname, 'w') as f:
+            json.dump(self.as_dict(), f, indent=1, sort_keys=True)
+        os.rename(tmpname, self.filename)
+
+
+@contextmanager
+def _no_measure():
+    yield
+
+def measure_pass(translator, name, graphs):
+    """Context manager recording the backendopt pass 'name' if the
+    translation is profiled, and doing nothing otherwise."""
+    profiler = getattr(translator, 'profiler', None)
+    if profiler is None:
+        return _no_measure()
+    return profiler.measure_pass(name, graphs)
+
+
+# ____________________________________________________________
+# report
+
+def load(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+def report(data, top=20):
+    """Return the report of the profile 'data' as a list of lines."""
+    lines = []
+    lines.append('Tasks:')
+    lines.append('  %-30s %10s %10s %12s %12s' % (
+        'task', 'wall (s)', 'cpu (s)', 'peak RSS', 'RSS growth'))
+    for task in data['tasks']:
+        lines.append('  %-30s %10.1f %10.1f %9d MB %9d MB' % (
+            task['name'], task['wall'], task['cpu'],
+            task['peak_rss_kb'] // 1024, task['peak_rss_growth_kb'] // 1024))
+    for phase in sorted(data['graphs']):
+        entries = sorted(data['graphs'][phase].items(),
+                         key=lambda item: (-item[1][0], item[0]))
+        total = sum([t for key, (t, count) in entries])
+        lines.append('')
+        lines.append('Heaviest graphs for %s (%d graphs, %.1f s in total):' % (
+            phase, len(entries), total))
+        for key, (t, count) in entries[:top]:
+            lines.append('  %8.3f s %6d blocks  %s' % (t, count, key))
+    passes = sorted(data['passes'], key=lambda p: -p['wall'])
+    lines.append('')
+    lines.append('Heaviest backendopt passes:')
+    lines.append('  %-30s %10s %10s %21s %21s' % (
+        'pass', 'wall (s)', 'cpu (s)', 'blocks', 'operations'))
+    for p in passes[:top]:
+        lines.append('  %-30s %10.2f %10.2f %10d->%-10d %10d->%-10d' % (
+            p['name'], p['wall'], p['cpu'], p['blocks_before'],
+            p['blocks_after'], p['ops_before'], p['ops_after']))
+    return lines
+
+
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Report the heaviest tasks, graphs and passes "
+                    "of a translation profiled with --transprofile")
+    parser.add_argument('filename')
+    parser.add_argument('--top', type=int, default=20,
+                        help="number of graphs and passes to show")
+    args = parser.parse_args(argv)
+    for line in report(load(args.filename), args.top):
+        print(line)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])